@@ -6,8 +6,10 @@ Optimized for Google Cloud Run 2024 deployment
 import os
 import logging
 from flask import Flask, jsonify, request
+from flask_compress import Compress
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug.exceptions import HTTPException
 from werkzeug.middleware.proxy_fix import ProxyFix
 import google.cloud.logging
 
@@ -21,6 +23,7 @@ from routes.kual_api import kual_api_bp
 
 # Import models to ensure they're registered
 from models import db
+from utils.responses import OrjsonProvider
 from config.settings import Config
 
 def create_app(config_class=Config):
@@ -30,6 +33,7 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
     
     # Configure logging for Cloud Run
     if os.getenv('GOOGLE_CLOUD_PROJECT'):
@@ -44,6 +48,7 @@ def create_app(config_class=Config):
     # Initialize extensions
     db.init_app(app)
     CORS(app, origins=os.getenv('ALLOWED_ORIGINS', '*').split(','))
+    Compress(app)
     
     # Register blueprints
     app.register_blueprint(sync_bp, url_prefix='/api/sync')
@@ -84,6 +89,15 @@ def create_app(config_class=Config):
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
     
+    @app.errorhandler(Exception)
+    def unhandled_exception(error):
+        # HTTP errors (404 from get_or_404, 415, ...) keep their own response
+        if isinstance(error, HTTPException):
+            return error
+        db.session.rollback()
+        logging.exception("Unhandled exception")
+        return jsonify({'error': 'Internal server error'}), 500
+    
     # Create database tables
     with app.app_context():
         try:
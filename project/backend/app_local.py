@@ -11,6 +11,7 @@ from flask_sqlalchemy import SQLAlchemy
 
 # Import configuration
 from config.settings import DevelopmentConfig
+from utils.responses import OrjsonProvider
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +25,7 @@ def create_app(config_class=DevelopmentConfig):
     """Create Flask application with simplified configuration"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
     
     # Initialize extensions
     db = SQLAlchemy()
@@ -223,7 +225,7 @@ def create_app(config_class=DevelopmentConfig):
             logger.info(f"RSS feed validation passed: {metadata}")
             
             import uuid
-            from datetime import datetime
+            from datetime import datetime, timezone
             
             # Create news source record
             news_source = {
@@ -233,11 +235,11 @@ def create_app(config_class=DevelopmentConfig):
                 'category': data.get('category', ''),
                 'syncFrequency': data.get('syncFrequency', 'daily'),
                 'isActive': data.get('isActive', True),
-                'createdAt': datetime.now().isoformat(),
+                'createdAt': datetime.now(timezone.utc).isoformat(),
                 'lastSync': None,
                 'syncStatus': 'pending',
                 'validationMetadata': metadata,  # Store validation metadata
-                'nextSyncDue': datetime.now().isoformat()  # Due for first sync
+                'nextSyncDue': datetime.now(timezone.utc).isoformat()  # Due for first sync
             }
             
             logger.info(f"Created news source object: {news_source}")
@@ -699,11 +701,11 @@ def create_app(config_class=DevelopmentConfig):
             
             # Simulate article sync
             from services.article_sync_manager import ArticleSyncManager
-            from datetime import datetime, timedelta
+            from datetime import datetime, timedelta, timezone
             sync_manager = ArticleSyncManager()
             
             # For local dev, just update the sync status
-            current_time = datetime.now().isoformat()
+            current_time = datetime.now(timezone.utc).isoformat()
             
             # Update the source
             for i, s in enumerate(news_sources):
@@ -713,13 +715,13 @@ def create_app(config_class=DevelopmentConfig):
                     # Calculate next sync time based on frequency
                     frequency = s.get('syncFrequency', 'daily')
                     if frequency == 'hourly':
-                        next_sync = datetime.now() + timedelta(hours=1)
+                        next_sync = datetime.now(timezone.utc) + timedelta(hours=1)
                     elif frequency == 'weekly':
-                        next_sync = datetime.now() + timedelta(weeks=1)
+                        next_sync = datetime.now(timezone.utc) + timedelta(weeks=1)
                     elif frequency == 'monthly':
-                        next_sync = datetime.now() + timedelta(days=30)
+                        next_sync = datetime.now(timezone.utc) + timedelta(days=30)
                     else:  # daily
-                        next_sync = datetime.now() + timedelta(days=1)
+                        next_sync = datetime.now(timezone.utc) + timedelta(days=1)
                     
                     news_sources[i]['nextSyncDue'] = next_sync.isoformat()
                     break
@@ -760,7 +762,7 @@ def create_app(config_class=DevelopmentConfig):
             return response
         
         try:
-            from datetime import datetime, timedelta
+            from datetime import datetime, timedelta, timezone
             
             active_sources = [s for s in news_sources if s.get('isActive', True)]
             
@@ -770,7 +772,7 @@ def create_app(config_class=DevelopmentConfig):
                     'error': 'No active news sources to sync'
                 }), 400
             
-            current_time = datetime.now()
+            current_time = datetime.now(timezone.utc)
             synced_sources = 0
             total_articles = 0
             
@@ -6,8 +6,10 @@ Optimized for Google Cloud deployment with security and performance
 import os
 import logging
 from flask import Flask, jsonify, request
+from flask_compress import Compress
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug.exceptions import HTTPException
 from werkzeug.middleware.proxy_fix import ProxyFix
 import google.cloud.logging
 
@@ -21,6 +23,7 @@ from routes.kual_api import kual_api_bp
 
 # Import models to ensure they're registered
 from models import db
+from utils.responses import OrjsonProvider
 from config.settings import ProductionConfig
 
 def create_app():
@@ -29,6 +32,7 @@ def create_app():
     """
     app = Flask(__name__)
     app.config.from_object(ProductionConfig)
+    app.json = OrjsonProvider(app)
     
     # Configure logging for Google Cloud
     if os.getenv('GOOGLE_CLOUD_PROJECT'):
@@ -62,6 +66,9 @@ def create_app():
          allow_headers=['Content-Type', 'Authorization', 'X-Server-Passcode', 'X-Device-ID', 'X-API-Key'],
          supports_credentials=True)
     
+    # Brotli/gzip for JSON responses; settings in Config.COMPRESS_*
+    Compress(app)
+    
     # Security middleware
     @app.before_request
     def security_headers():
@@ -174,6 +181,15 @@ def create_app():
         logging.error(f"Internal server error: {error}")
         return jsonify({'error': 'Internal server error'}), 500
     
+    @app.errorhandler(Exception)
+    def unhandled_exception(error):
+        # HTTP errors (404 from get_or_404, 415, ...) keep their own response
+        if isinstance(error, HTTPException):
+            return error
+        db.session.rollback()
+        logging.exception("Unhandled exception")
+        return jsonify({'error': 'Internal server error'}), 500
+    
     @app.errorhandler(401)
     def unauthorized(error):
         return jsonify({'error': 'Unauthorized access'}), 401
@@ -4,6 +4,7 @@ Optimized for Google Cloud deployment
 """
 
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -21,7 +22,10 @@ class Config:
         'pool_recycle': 3600,  # 1 hour
         'pool_timeout': 30,
         'max_overflow': 0,
-        'pool_size': 5
+        'pool_size': 5,
+        # Compiled-statement cache; the default 500 is crowded out by the
+        # many filter combinations of the listing endpoints
+        'query_cache_size': 1200
     }
     
     # Google Cloud Storage settings
@@ -30,6 +34,7 @@ class Config:
     
     # Kindle sync settings
     KINDLE_EMAIL_DOMAIN = '@kindle.com'
+    KINDLE_EMAIL_DOMAINS = ('@kindle.com', '@free.kindle.com', '@iq.amazon.com')
     KINDLE_SEND_TO_EMAIL = os.environ.get('KINDLE_SEND_TO_EMAIL')
     KINDLE_MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB limit
     
@@ -43,6 +48,7 @@ class Config:
     ]
     RSS_UPDATE_INTERVAL = timedelta(hours=6)
     RSS_MAX_ARTICLES_PER_FEED = 10
+    RSS_SYNC_MAX_WORKERS = int(os.environ.get('RSS_SYNC_MAX_WORKERS', 8))
     
     # Email settings for Kindle delivery
     SMTP_SERVER = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
@@ -54,11 +60,24 @@ class Config:
     EPUB_AUTHOR = 'Kindle Content Server'
     EPUB_PUBLISHER = 'Personal Library'
     EPUB_MAX_CHAPTERS = 50
+    DIGEST_CACHE_DIR = os.environ.get('DIGEST_CACHE_DIR') or \
+        os.path.join(tempfile.gettempdir(), 'kindle-digests')
+    DIGEST_CACHE_MAX_AGE_HOURS = 48
+    DIGEST_BUILD_MAX_WORKERS = int(os.environ.get('DIGEST_BUILD_MAX_WORKERS', 2))
+    DIGEST_BUILD_WAIT_SECONDS = int(os.environ.get('DIGEST_BUILD_WAIT_SECONDS', 30))
+    DIGEST_BUILD_FAILURE_TTL = 60  # seconds a failed build is reported before retrying
+    SYNC_TASK_MAX_WORKERS = int(os.environ.get('SYNC_TASK_MAX_WORKERS', 4))
     
     # Caching settings
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     CACHE_DEFAULT_TIMEOUT = 3600  # 1 hour
     
+    # Response compression (Flask-Compress); JSON listings repeat the same keys per row
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 4
+    
     # Security settings
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None
@@ -89,6 +108,14 @@ class ProductionConfig(Config):
     """Production configuration for Cloud Run"""
     DEBUG = False
     
+    # psycopg2 only: batch executemany UPDATEs too, not just the multi-row INSERTs
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        'executemany_mode': 'values_plus_batch',
+        'insertmanyvalues_page_size': 1000,
+        'executemany_batch_page_size': 500
+    }
+    
     # Use Cloud SQL connection
     if os.environ.get('CLOUD_SQL_CONNECTION_NAME'):
         SQLALCHEMY_DATABASE_URI = (
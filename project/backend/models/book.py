@@ -5,11 +5,20 @@ Book model for storing ebook metadata and content
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import JSON
-from sqlalchemy import func
+from sqlalchemy import DDL, event, func, Index, literal_column, update
 import uuid
 
 from . import db
 
+def _search_document(title, author, description):
+    """Full-text document over the searchable columns (indexed as idx_books_search)"""
+    # Literal SQL, not bound parameters, so queries match the index expression exactly
+    empty, space = literal_column("''"), literal_column("' '")
+    return func.to_tsvector(
+        literal_column("'english'"),
+        func.coalesce(title, empty) + space + func.coalesce(author, empty) + space + func.coalesce(description, empty)
+    )
+
 class Book(db.Model):
     """Book model for storing ebook information"""
     
@@ -55,35 +64,70 @@ class Book(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    sync_logs = db.relationship('SyncLog', backref='book', lazy='dynamic', cascade='all, delete-orphan')
+    sync_logs = db.relationship('SyncLog', back_populates='book', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # Indexes for the list sort options, upload duplicate checks, orphan cleanup and, on PostgreSQL, search
+    __table_args__ = (
+        Index('idx_books_created_at', 'created_at'),
+        Index('idx_books_updated_at', 'updated_at'),
+        Index('idx_books_file_size', 'file_size'),
+        Index('idx_books_file_hash', 'file_hash'),
+        Index('idx_books_gcs_path', 'gcs_path'),
+        Index('idx_books_available', 'created_at', postgresql_where=(status == 'available')),
+        Index('idx_books_search', _search_document(title, author, description),
+              postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_books_title_trgm', 'title', postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_books_author_trgm', 'author', postgresql_using='gin',
+              postgresql_ops={'author': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_books_description_trgm', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     def __repr__(self):
         return f'<Book {self.title} by {self.author}>'
     
     def to_dict(self):
         """Convert book to dictionary for API responses"""
+        return self.row_to_dict(self)
+    
+    @classmethod
+    def list_columns(cls):
+        """Columns read by row_to_dict, for column-only list queries"""
+        return (
+            cls.id, cls.title, cls.author, cls.description, cls.isbn,
+            cls.format, cls.file_size, cls.page_count, cls.word_count,
+            cls.language, cls.publisher, cls.publication_date, cls.genre,
+            cls.tags, cls.reading_progress, cls.last_read_position,
+            cls.status, cls.sync_status, cls.last_synced_at,
+            cls.created_at, cls.updated_at
+        )
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Build the API dictionary from a Book instance or a list_columns() row"""
         return {
-            'id': str(self.id),
-            'title': self.title,
-            'author': self.author,
-            'description': self.description,
-            'isbn': self.isbn,
-            'format': self.format,
-            'file_size': self.file_size,
-            'page_count': self.page_count,
-            'word_count': self.word_count,
-            'language': self.language,
-            'publisher': self.publisher,
-            'publication_date': self.publication_date.isoformat() if self.publication_date else None,
-            'genre': self.genre,
-            'tags': self.tags,
-            'reading_progress': self.reading_progress,
-            'last_read_position': self.last_read_position,
-            'status': self.status,
-            'sync_status': self.sync_status,
-            'last_synced_at': self.last_synced_at.isoformat() if self.last_synced_at else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'id': str(row.id),
+            'title': row.title,
+            'author': row.author,
+            'description': row.description,
+            'isbn': row.isbn,
+            'format': row.format,
+            'file_size': row.file_size,
+            'page_count': row.page_count,
+            'word_count': row.word_count,
+            'language': row.language,
+            'publisher': row.publisher,
+            'publication_date': row.publication_date.isoformat() if row.publication_date else None,
+            'genre': row.genre,
+            'tags': row.tags,
+            'reading_progress': row.reading_progress,
+            'last_read_position': row.last_read_position,
+            'status': row.status,
+            'sync_status': row.sync_status,
+            'last_synced_at': row.last_synced_at.isoformat() if row.last_synced_at else None,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat()
         }
     
     def update_reading_progress(self, progress, position=None):
@@ -113,6 +157,40 @@ class Book(db.Model):
         self.updated_at = datetime.utcnow()
         db.session.commit()
     
+    @classmethod
+    def mark_synced_by_id(cls, book_id):
+        """
+        Mark a book as synced without loading it first
+        
+        One UPDATE ... RETURNING title; the caller commits.
+        
+        Returns:
+            The book's title, or None if no book has that id
+        """
+        now = datetime.utcnow()
+        stmt = update(cls).where(cls.id == book_id).values(
+            sync_status='synced', last_synced_at=now, updated_at=now
+        ).returning(cls.title)
+        return db.session.execute(
+            stmt, execution_options={'synchronize_session': False}
+        ).scalar_one_or_none()
+    
+    @classmethod
+    def mark_synced_many(cls, book_ids):
+        """
+        Mark several books as synced in one UPDATE; the caller commits
+        
+        Returns:
+            Number of books updated
+        """
+        now = datetime.utcnow()
+        stmt = update(cls).where(cls.id.in_(book_ids)).values(
+            sync_status='synced', last_synced_at=now, updated_at=now
+        )
+        return db.session.execute(
+            stmt, execution_options={'synchronize_session': False}
+        ).rowcount
+    
     @classmethod
     def get_pending_sync(cls):
         """Get books pending sync to Kindle"""
@@ -121,14 +199,38 @@ class Book(db.Model):
     @classmethod
     def search(cls, query, limit=50):
         """Search books by title, author, or description"""
+        return cls.apply_search(cls.query, query).limit(limit).all()
+    
+    @classmethod
+    def apply_search(cls, base_query, query):
+        """
+        Filter and rank a book query by a search term
+        
+        On PostgreSQL this matches the full-text and trigram GIN indexes,
+        ranking word matches first; substrings of title, author and
+        description still match, as they do elsewhere.
+        """
         search_term = f'%{query}%'
-        return cls.query.filter(
+        
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return base_query.filter(
+                db.or_(
+                    cls.title.ilike(search_term),
+                    cls.author.ilike(search_term),
+                    cls.description.ilike(search_term)
+                )
+            )
+        
+        document = _search_document(cls.title, cls.author, cls.description)
+        ts_query = func.plainto_tsquery(literal_column("'english'"), query)
+        return base_query.filter(
             db.or_(
+                document.op('@@')(ts_query),
                 cls.title.ilike(search_term),
                 cls.author.ilike(search_term),
                 cls.description.ilike(search_term)
             )
-        ).limit(limit).all()
+        ).order_by(func.ts_rank(document, ts_query).desc(), cls.created_at.desc())
     
     @classmethod
     def get_by_genre(cls, genre, limit=50):
@@ -138,4 +240,11 @@ class Book(db.Model):
     @classmethod
     def get_recent(cls, limit=20):
         """Get recently added books"""
-        return cls.query.order_by(cls.created_at.desc()).limit(limit).all()
\ No newline at end of file
+        return cls.query.order_by(cls.created_at.desc()).limit(limit).all()
+
+# The trigram indexes need pg_trgm; create it alongside the table
+event.listen(
+    Book.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
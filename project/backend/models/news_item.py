@@ -5,7 +5,8 @@ News item model for RSS aggregated content
 from datetime import datetime, timedelta
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import JSON
-from sqlalchemy import func, Index
+from sqlalchemy import case, delete, func, Index, null, select, update
+from sqlalchemy.orm import defer, load_only
 import uuid
 
 from . import db
@@ -24,7 +25,7 @@ class NewsItem(db.Model):
     summary = db.Column(db.Text)
     
     # Source information
-    source_name = db.Column(db.String(100), nullable=False, index=True)
+    source_name = db.Column(db.String(100), nullable=False)
     source_url = db.Column(db.String(1000), nullable=False)
     feed_url = db.Column(db.String(1000), nullable=False)
     
@@ -34,7 +35,7 @@ class NewsItem(db.Model):
     tags = db.Column(JSON)  # Flexible tagging system
     
     # Publishing information
-    published_at = db.Column(db.DateTime, nullable=False, index=True)
+    published_at = db.Column(db.DateTime, nullable=False)
     original_id = db.Column(db.String(200))  # Original RSS item ID
     guid = db.Column(db.String(500), unique=True)  # RSS GUID for deduplication
     
@@ -52,22 +53,45 @@ class NewsItem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Indexes for performance
+    # Indexes for performance. This is an insert-heavy table, so each index
+    # must serve a query the others cannot; source_name and published_at are
+    # covered by the composites below rather than indexed on their own.
     __table_args__ = (
+        # Recent news across all sources (list_news hours window, stats)
         Index('idx_news_published_source', 'published_at', 'source_name'),
+        # Status filters: list_news?status= and process_pending
         Index('idx_news_status_created', 'status', 'created_at'),
-        Index('idx_news_epub_included', 'epub_included', 'published_at'),
+        # Age-based cleanup, and marking recent unincluded articles for Kindle
+        # (include_recent_from_sources filters epub_included = false by created_at)
+        Index('idx_news_epub_created', 'epub_included', 'created_at'),
+        # Digest content IDs address sources by slug
+        Index('idx_news_source_slug', func.lower(func.replace(source_name, ' ', '_'))),
+        # Partial index matching the Kindle sync listing: only eligible rows,
+        # already in the (source_name, published_at DESC) order it returns
+        Index('idx_news_kindle_sync', source_name, published_at.desc(),
+              postgresql_where=(epub_included == True) & (quality_score >= 0.3)),
+        # Digest selection across sources with a caller-chosen quality floor,
+        # and the EPUB-included counts
+        Index('idx_news_epub_published_quality', published_at.desc(), quality_score,
+              postgresql_where=(epub_included == True)),
+        # Per-source listings with any status, newest first (list_news?source=,
+        # get_by_source)
+        Index('idx_news_source_published', source_name, published_at.desc()),
     )
     
     def __repr__(self):
         return f'<NewsItem {self.title} from {self.source_name}>'
     
-    def to_dict(self):
-        """Convert news item to dictionary for API responses"""
-        return {
+    def to_dict(self, include_content=True):
+        """
+        Convert news item to dictionary for API responses
+
+        Pass include_content=False for rows loaded with ``content`` deferred,
+        so serializing them does not lazy-load it one row at a time.
+        """
+        data = {
             'id': str(self.id),
             'title': self.title,
-            'content': self.content,
             'summary': self.summary,
             'source_name': self.source_name,
             'source_url': self.source_url,
@@ -87,39 +111,51 @@ class NewsItem(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+        if include_content:
+            data['content'] = self.content
+        return data
     
-    def calculate_reading_time(self):
-        """Calculate estimated reading time based on word count"""
-        if self.word_count:
+    @staticmethod
+    def _reading_time(word_count):
+        """Estimated reading time in minutes for a word count"""
+        if word_count:
             # Average reading speed: 200 words per minute
-            self.reading_time = max(1, self.word_count // 200)
-        else:
-            self.reading_time = 1
+            return max(1, word_count // 200)
+        return 1
     
-    def calculate_quality_score(self):
-        """Calculate content quality score based on various factors"""
+    @staticmethod
+    def _quality_score(title, word_count, summary, author):
+        """Content quality score based on various factors"""
         score = 0.5  # Base score
         
         # Title quality
-        if self.title and len(self.title.strip()) > 10:
+        if title and len(title.strip()) > 10:
             score += 0.1
         
         # Content length
-        if self.word_count:
-            if 100 <= self.word_count <= 2000:  # Optimal range
+        if word_count:
+            if 100 <= word_count <= 2000:  # Optimal range
                 score += 0.2
-            elif self.word_count > 2000:
+            elif word_count > 2000:
                 score += 0.1
         
         # Has summary
-        if self.summary and len(self.summary.strip()) > 20:
+        if summary and len(summary.strip()) > 20:
             score += 0.1
         
         # Has author
-        if self.author and len(self.author.strip()) > 0:
+        if author and len(author.strip()) > 0:
             score += 0.1
         
-        self.quality_score = min(1.0, score)
+        return min(1.0, score)
+    
+    def calculate_reading_time(self):
+        """Calculate estimated reading time based on word count"""
+        self.reading_time = self._reading_time(self.word_count)
+    
+    def calculate_quality_score(self):
+        """Calculate content quality score based on various factors"""
+        self.quality_score = self._quality_score(self.title, self.word_count, self.summary, self.author)
     
     def process_content(self):
         """Process the news item content"""
@@ -146,9 +182,164 @@ class NewsItem(db.Model):
         self.updated_at = datetime.utcnow()
     
     @classmethod
-    def get_for_epub(cls, limit=50, min_quality=0.5):
-        """Get news items for EPUB generation"""
-        return cls.query.filter(
+    def bulk_include_in_epub(cls, ids):
+        """Mark many items for EPUB inclusion with one UPDATE, returning the affected ids"""
+        return cls._bulk_update(ids, {
+            cls.epub_included: True,
+            cls.status: 'included',
+            cls.updated_at: datetime.utcnow()
+        })
+    
+    @classmethod
+    def bulk_exclude_from_epub(cls, ids, reason=None):
+        """Exclude many items from EPUB with one UPDATE, returning the affected ids"""
+        values = {
+            cls.epub_included: False,
+            cls.status: 'excluded',
+            cls.updated_at: datetime.utcnow()
+        }
+        if reason:
+            values[cls.processing_notes] = reason
+        return cls._bulk_update(ids, values)
+    
+    @classmethod
+    def include_recent_from_sources(cls, source_names, since, min_quality=0.3):
+        """
+        Mark recent, good-quality items from the given sources for EPUB inclusion
+        
+        One UPDATE ... RETURNING id; the caller commits.
+        
+        Returns:
+            Ids of the items marked
+        """
+        stmt = update(cls).where(
+            cls.source_name.in_(source_names),
+            cls.created_at >= since,
+            cls.quality_score >= min_quality,
+            cls.epub_included == False
+        ).values({
+            cls.epub_included: True,
+            cls.status: 'included',
+            cls.updated_at: datetime.utcnow()
+        }).returning(cls.id)
+        return db.session.execute(
+            stmt, execution_options={'synchronize_session': False}
+        ).scalars().all()
+    
+    @classmethod
+    def bulk_delete(cls, ids):
+        """Delete many items with one DELETE, returning the affected ids"""
+        stmt = delete(cls).where(cls.id.in_(ids)).returning(cls.id)
+        return db.session.execute(
+            stmt, execution_options={'synchronize_session': False}
+        ).scalars().all()
+    
+    @classmethod
+    def delete_older_than(cls, cutoff, keep_epub_included=True, batch_size=5000):
+        """
+        Delete items created before cutoff in batches, committing after each
+        
+        Each batch is one DELETE ... WHERE id IN (SELECT id ... LIMIT n), so
+        row locks and transaction size stay bounded however much is removed.
+        
+        Args:
+            cutoff: Items created before this time are deleted
+            keep_epub_included: If True, keep items marked for EPUB
+            batch_size: Maximum rows deleted per transaction
+            
+        Returns:
+            Number of items deleted
+        """
+        conditions = [cls.created_at < cutoff]
+        if keep_epub_included:
+            conditions.append(cls.epub_included == False)
+        
+        batch = select(cls.id).where(*conditions).limit(batch_size).scalar_subquery()
+        stmt = delete(cls).where(cls.id.in_(batch))
+        
+        deleted = 0
+        while True:
+            count = db.session.execute(
+                stmt, execution_options={'synchronize_session': False}
+            ).rowcount
+            db.session.commit()
+            deleted += count
+            if count < batch_size:
+                return deleted
+    
+    @classmethod
+    def _bulk_update(cls, ids, values):
+        """Run one UPDATE ... RETURNING id over the given ids"""
+        stmt = update(cls).where(cls.id.in_(ids)).values(values).returning(cls.id)
+        return db.session.execute(
+            stmt, execution_options={'synchronize_session': False}
+        ).scalars().all()
+    
+    @classmethod
+    def process_pending(cls, batch_size=500, auto_review=False):
+        """
+        Process every pending item with batched primary-key UPDATEs
+        
+        Same result as process_content() on each item, but rows are read as
+        plain columns in keyset batches of batch_size (id > last id), and
+        content is only fetched for items that still need a word count. Each
+        batch is fully read before it is updated, so no cursor stays open over
+        the rows being changed.
+        
+        Args:
+            batch_size: Rows read and updated per round trip
+            auto_review: Also include items scoring 0.7 or more in EPUBs and
+                exclude those under 0.3
+        
+        Returns:
+            Number of items processed
+        """
+        needs_word_count = db.or_(cls.word_count.is_(None), cls.word_count == 0)
+        stmt = select(
+            cls.id, cls.title, cls.summary, cls.author, cls.word_count,
+            case((needs_word_count, cls.content), else_=null()).label('content')
+        ).where(cls.status == 'pending').order_by(cls.id).limit(batch_size)
+        
+        processed = 0
+        last_id = None
+        while True:
+            batch = stmt if last_id is None else stmt.where(cls.id > last_id)
+            rows = db.session.execute(batch).all()
+            if not rows:
+                return processed
+            last_id = rows[-1].id
+            
+            now = datetime.utcnow()
+            mappings = []
+            for row in rows:
+                word_count = row.word_count
+                if not word_count and row.content:
+                    word_count = len(row.content.split())
+                quality_score = cls._quality_score(row.title, word_count, row.summary, row.author)
+                mapping = {
+                    'id': row.id,
+                    'word_count': word_count,
+                    'reading_time': cls._reading_time(word_count),
+                    'quality_score': quality_score,
+                    'status': 'processed',
+                    'updated_at': now
+                }
+                if auto_review and quality_score >= 0.7:
+                    mapping.update(epub_included=True, status='included')
+                elif auto_review and quality_score < 0.3:
+                    mapping.update(epub_included=False, status='excluded',
+                                   processing_notes='Low quality score')
+                mappings.append(mapping)
+            db.session.execute(update(cls), mappings)
+            processed += len(mappings)
+    
+    @classmethod
+    def get_for_epub(cls, limit=50, min_quality=0.5, columns=None):
+        """Get news items for EPUB generation, optionally loading only the given columns"""
+        query = cls.query
+        if columns:
+            query = query.options(load_only(*columns))
+        return query.filter(
             cls.epub_included == True,
             cls.quality_score >= min_quality
         ).order_by(cls.published_at.desc()).limit(limit).all()
@@ -171,16 +362,26 @@ class NewsItem(db.Model):
         """Get items pending processing"""
         return cls.query.filter_by(status='pending').all()
     
+    @classmethod
+    def find_source_name(cls, slug):
+        """Return the source name whose slug (lowercase, spaces as underscores) matches, if any"""
+        return db.session.query(cls.source_name).filter(
+            func.lower(func.replace(cls.source_name, ' ', '_')) == slug
+        ).limit(1).scalar()
+    
     @classmethod
     def exists_by_guid(cls, guid):
         """Check if item exists by GUID to prevent duplicates"""
         return cls.query.filter_by(guid=guid).first() is not None
     
     @classmethod
-    def search(cls, query, limit=50):
+    def search(cls, query, limit=50, include_content=True):
         """Search news items by title or content"""
         search_term = f'%{query}%'
-        return cls.query.filter(
+        base_query = cls.query
+        if not include_content:
+            base_query = base_query.options(defer(cls.content))
+        return base_query.filter(
             db.or_(
                 cls.title.ilike(search_term),
                 cls.content.ilike(search_term),
@@ -5,7 +5,8 @@ Sync log model for tracking Kindle sync operations
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import JSON
-from sqlalchemy import func
+from sqlalchemy import func, Index
+from sqlalchemy.orm import joinedload
 import uuid
 
 from . import db
@@ -19,11 +20,12 @@ class SyncLog(db.Model):
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Sync operation details
-    operation_type = db.Column(db.String(50), nullable=False, index=True)  # book_sync, news_digest, etc.
-    status = db.Column(db.String(20), nullable=False, index=True)  # pending, success, failed, retrying
+    operation_type = db.Column(db.String(50), nullable=False)  # book_sync, news_digest, etc.
+    status = db.Column(db.String(20), nullable=False)  # pending, success, failed, retrying
     
     # Related entities
     book_id = db.Column(UUID(as_uuid=True), db.ForeignKey('books.id'), nullable=True, index=True)
+    book = db.relationship('Book', back_populates='sync_logs')
     news_digest_id = db.Column(db.String(100), nullable=True)  # For news digest operations
     
     # Sync details
@@ -51,6 +53,14 @@ class SyncLog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Log listings filter on one column and page newest first by (created_at, id)
+    __table_args__ = (
+        Index('idx_sync_logs_email_created', kindle_email, created_at.desc(), id.desc()),
+        Index('idx_sync_logs_operation_created', operation_type, created_at.desc(), id.desc()),
+        Index('idx_sync_logs_status_created', status, created_at.desc(), id.desc()),
+        Index('idx_sync_logs_created', created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f'<SyncLog {self.operation_type} - {self.status}>'
     
@@ -77,14 +87,15 @@ class SyncLog(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
-    def start_operation(self):
+    def start_operation(self, commit=True):
         """Mark operation as started"""
         self.status = 'pending'
         self.started_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
-    def complete_success(self, metadata=None):
+    def complete_success(self, metadata=None, commit=True):
         """Mark operation as successfully completed"""
         self.status = 'success'
         self.completed_at = datetime.utcnow()
@@ -92,9 +103,10 @@ class SyncLog(db.Model):
         if metadata:
             self.sync_metadata = {**(self.sync_metadata or {}), **metadata}
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
-    def complete_failure(self, error_message, error_code=None, metadata=None):
+    def complete_failure(self, error_message, error_code=None, metadata=None, commit=True):
         """Mark operation as failed"""
         self.status = 'failed'
         self.completed_at = datetime.utcnow()
@@ -104,9 +116,10 @@ class SyncLog(db.Model):
         if metadata:
             self.sync_metadata = {**(self.sync_metadata or {}), **metadata}
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
-    def retry_operation(self):
+    def retry_operation(self, commit=True):
         """Increment retry count and mark for retry"""
         self.retry_count += 1
         if self.retry_count <= self.max_retries:
@@ -115,7 +128,8 @@ class SyncLog(db.Model):
             self.status = 'failed'
             self.error_message = f"Max retries ({self.max_retries}) exceeded"
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return self.retry_count <= self.max_retries
     
     def can_retry(self):
@@ -145,12 +159,66 @@ class SyncLog(db.Model):
         return sync_log
     
     @classmethod
-    def get_pending_retries(cls):
-        """Get sync logs that can be retried"""
-        return cls.query.filter(
+    def create_sync_logs(cls, entries):
+        """
+        Create several sync log entries with one commit
+        
+        Args:
+            entries: Keyword-argument dicts as accepted by create_sync_log
+            
+        Returns:
+            The new sync logs, in input order
+        """
+        sync_logs = [
+            cls(
+                operation_type=entry['operation_type'],
+                status='pending',
+                kindle_email=entry['kindle_email'],
+                book_id=entry.get('book_id'),
+                news_digest_id=entry.get('news_digest_id'),
+                file_name=entry.get('file_name'),
+                file_size=entry.get('file_size'),
+                max_retries=entry.get('max_retries', 3),
+                sync_metadata=entry.get('metadata'),
+                user_agent=entry.get('user_agent'),
+                ip_address=entry.get('ip_address')
+            )
+            for entry in entries
+        ]
+        db.session.add_all(sync_logs)
+        db.session.commit()
+        return sync_logs
+    
+    @classmethod
+    def lock_for_retry(cls, log_id):
+        """
+        Lock a sync log row for the rest of the transaction
+        
+        Uses SELECT ... FOR UPDATE SKIP LOCKED, so a row another request
+        is already retrying comes back as None instead of blocking.
+        
+        Returns:
+            The locked sync log, or None if it is missing or already locked
+        """
+        return cls.query.filter(cls.id == log_id).with_for_update(skip_locked=True).first()
+    
+    @classmethod
+    def get_pending_retries(cls, limit=None, with_book=False):
+        """
+        Get sync logs that can be retried
+
+        Pass with_book=True when the caller reads ``log.book``, so the books
+        are joined into the same query instead of loaded one per log.
+        """
+        query = cls.query.filter(
             cls.status.in_(['failed', 'retrying']),
             cls.retry_count < cls.max_retries
-        ).all()
+        )
+        if with_book:
+            query = query.options(joinedload(cls.book))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
     
     @classmethod
     def get_recent_by_email(cls, kindle_email, limit=20):
@@ -178,6 +246,6 @@ class SyncLog(db.Model):
         from datetime import timedelta
         cutoff = datetime.utcnow() - timedelta(days=days)
         
-        deleted_count = cls.query.filter(cls.created_at < cutoff).delete()
+        deleted_count = cls.query.filter(cls.created_at < cutoff).delete(synchronize_session=False)
         db.session.commit()
         return deleted_count
\ No newline at end of file
@@ -7,13 +7,24 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 import logging
 
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.exc import SQLAlchemyError
+
 from models import db, NewsItem
-from services.article_sync_manager import ArticleSyncManager
+from services.article_sync_manager import get_sync_manager
 from services.rss_feed_tester import FeedConfiguration
+from utils.cache import get_or_set_json, invalidate_content_list
+from utils.pagination import fetch_page, with_total_count
+from utils.responses import ojson, stream_ojson
+from utils.validation import QueryParamError, parse_bool_arg, parse_int_arg
 
 articles_bp = Blueprint('articles', __name__)
 logger = logging.getLogger(__name__)
 
+# Article stats change with every sync run, so keep the TTL short
+ARTICLE_STATS_CACHE_KEY = 'stats:articles:global'
+ARTICLE_STATS_CACHE_TTL = 60
+
 
 @articles_bp.route('/sync-sources', methods=['POST'])
 def sync_news_sources():
@@ -26,20 +37,38 @@ def sync_news_sources():
         if not sources:
             return jsonify({'error': 'No sources provided'}), 400
         
-        # Create sync manager
-        sync_manager = ArticleSyncManager()
+        sync_manager = get_sync_manager()
+        
+        # Scheduled polls usually find nothing due; answer those without
+        # starting a sync cycle or dropping the cached lists
+        if not force_sync and not sync_manager.has_any_due_sources(sources):
+            return ojson({
+                'message': 'No sources due for sync',
+                'result': {
+                    'total_sources': len(sources),
+                    'sources_synced': 0,
+                    'sources_skipped': len(sources),
+                    'sources_failed': 0,
+                    'total_articles_added': 0,
+                    'total_articles_updated': 0,
+                    'sync_results': []
+                },
+                'timestamp': datetime.utcnow().isoformat()
+            })
         
         # Sync sources
         result = sync_manager.sync_all_due_sources(sources, force=force_sync)
+        invalidate_content_list(ARTICLE_STATS_CACHE_KEY)
         
-        return jsonify({
+        return ojson({
             'message': 'Article sync completed',
             'result': result,
             'timestamp': datetime.utcnow().isoformat()
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error syncing articles: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error syncing articles")
         return jsonify({'error': 'Failed to sync articles'}), 500
 
 
@@ -55,20 +84,21 @@ def sync_single_source():
         if not source:
             return jsonify({'error': 'Source data required'}), 400
         
-        # Create sync manager
-        sync_manager = ArticleSyncManager()
+        sync_manager = get_sync_manager()
         
         # Sync single source
         result = sync_manager.sync_source_articles(source)
+        invalidate_content_list(ARTICLE_STATS_CACHE_KEY)
         
-        return jsonify({
+        return ojson({
             'message': f'Sync completed for {source.get("name", "Unknown")}',
             'result': result,
             'timestamp': datetime.utcnow().isoformat()
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error syncing source: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error syncing source")
         return jsonify({'error': 'Failed to sync source'}), 500
 
 
@@ -77,20 +107,23 @@ def get_articles_for_kindle_sync():
     """Get articles ready for Kindle sync, grouped by source"""
     try:
         # Query parameters
-        hours = int(request.args.get('hours', 24))
+        hours = parse_int_arg(request.args, 'hours', 24, minimum=0, maximum=24 * 365)
         max_hours = min(hours, 168)  # Max 1 week
+        sources = [name.strip() for name in request.args.get('sources', '').split(',') if name.strip()]
+        per_source = parse_int_arg(request.args, 'per_source', None, minimum=1, maximum=100)
         
-        # Create sync manager
-        sync_manager = ArticleSyncManager()
+        sync_manager = get_sync_manager()
         
         # Get articles grouped by source
-        articles = sync_manager.get_articles_for_kindle_sync(max_hours)
+        articles = sync_manager.get_articles_for_kindle_sync(
+            max_hours, sources=sources or None, per_source_limit=per_source
+        )
         
         # Calculate totals
         total_articles = sum(group['article_count'] for group in articles)
         total_sources = len(articles)
         
-        return jsonify({
+        return ojson({
             'articles_by_source': articles,
             'summary': {
                 'total_articles': total_articles,
@@ -98,10 +131,14 @@ def get_articles_for_kindle_sync():
                 'hours_range': max_hours,
                 'generated_at': datetime.utcnow().isoformat()
             }
-        }), 200
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
-    except Exception as e:
-        logger.error(f"Error getting articles for Kindle sync: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting articles for Kindle sync")
         return jsonify({'error': 'Failed to get articles for Kindle sync'}), 500
 
 
@@ -110,31 +147,46 @@ def get_kindle_sync_items():
     """Get individual articles formatted for sync status display"""
     try:
         # Query parameters
-        hours = int(request.args.get('hours', 24))
-        limit = min(int(request.args.get('limit', 50)), 100)
+        hours = parse_int_arg(request.args, 'hours', 24, minimum=0, maximum=24 * 365)
+        limit = parse_int_arg(request.args, 'limit', 50, minimum=1, maximum=100)
         
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        # Get articles that are ready for Kindle sync
-        articles = NewsItem.query.filter(
+        # Get articles that are ready for Kindle sync (only the columns we render).
+        # As a lambda statement the SQL is built and compiled once; later
+        # requests only rebind cutoff_time and limit.
+        stmt = lambda_stmt(lambda: select(
+            NewsItem.id,
+            NewsItem.title,
+            NewsItem.source_name,
+            NewsItem.author,
+            NewsItem.word_count,
+            NewsItem.reading_time,
+            NewsItem.quality_score,
+            NewsItem.category,
+            NewsItem.published_at,
+            # Truncate in SQL so long summaries never leave the database
+            db.func.substr(NewsItem.summary, 1, 150).label('summary'),
+            (db.func.length(NewsItem.summary) > 150).label('summary_truncated')
+        ).where(
             NewsItem.epub_included == True,
             NewsItem.published_at >= cutoff_time,
             NewsItem.quality_score >= 0.3
         ).order_by(
             NewsItem.source_name.asc(),
             NewsItem.published_at.desc()
-        ).limit(limit).all()
+        ).limit(limit))
+        articles = db.session.execute(stmt).all()
         
         # Format for sync status display
-        sync_items = []
-        for article in articles:
-            sync_items.append({
+        sync_items = [
+            {
                 'id': f"article_{article.id}",
                 'type': 'article',
                 'title': article.title,
                 'itemName': article.title,
                 'status': 'ready',
-                'timestamp': article.published_at.isoformat(),
+                'timestamp': article.published_at,
                 'lastSync': None,
                 'progress': 100,
                 'message': f"Ready to sync to Kindle",
@@ -146,15 +198,21 @@ def get_kindle_sync_items():
                     'reading_time': article.reading_time,
                     'quality_score': article.quality_score,
                     'category': article.category,
-                    'published_at': article.published_at.isoformat(),
-                    'summary': article.summary[:150] + '...' if article.summary and len(article.summary) > 150 else article.summary
+                    'published_at': article.published_at,
+                    'summary': article.summary + '...' if article.summary_truncated else article.summary
                 }
-            })
+            }
+            for article in articles
+        ]
         
-        return jsonify(sync_items), 200
+        return ojson(sync_items)
         
-    except Exception as e:
-        logger.error(f"Error getting Kindle sync items: {e}")
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
+        
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting Kindle sync items")
         return jsonify({'error': 'Failed to get sync items'}), 500
 
 
@@ -162,13 +220,18 @@ def get_kindle_sync_items():
 def get_article_stats():
     """Get article synchronization statistics"""
     try:
-        sync_manager = ArticleSyncManager()
-        stats = sync_manager.get_sync_statistics()
-        
-        return jsonify(stats), 200
-        
-    except Exception as e:
-        logger.error(f"Error getting article stats: {e}")
+        sync_manager = get_sync_manager()
+        stats = get_or_set_json(
+            ARTICLE_STATS_CACHE_KEY,
+            ARTICLE_STATS_CACHE_TTL,
+            sync_manager.get_sync_statistics
+        )
+        
+        return ojson(stats)
+        
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting article stats")
         return jsonify({'error': 'Failed to get article statistics'}), 500
 
 
@@ -183,18 +246,20 @@ def cleanup_old_articles():
         if days < 1 or days > 365:
             return jsonify({'error': 'Days must be between 1 and 365'}), 400
         
-        sync_manager = ArticleSyncManager()
+        sync_manager = get_sync_manager()
         deleted_count = sync_manager.cleanup_old_articles(days, keep_epub_included)
+        invalidate_content_list(ARTICLE_STATS_CACHE_KEY)
         
-        return jsonify({
+        return ojson({
             'message': f'Cleaned up {deleted_count} old articles',
             'deleted_count': deleted_count,
             'days': days,
             'keep_epub_included': keep_epub_included
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error cleaning up articles: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error cleaning up articles")
         return jsonify({'error': 'Failed to clean up articles'}), 500
 
 
@@ -212,16 +277,18 @@ def toggle_article_sync(article_id):
             message = f'Article "{article.title}" included in Kindle sync'
         
         db.session.commit()
+        invalidate_content_list(ARTICLE_STATS_CACHE_KEY)
         
-        return jsonify({
+        return ojson({
             'message': message,
             'article_id': str(article.id),
             'epub_included': article.epub_included,
             'status': article.status
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error toggling article sync: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error toggling article sync")
         return jsonify({'error': 'Failed to toggle article sync'}), 500
 
 
@@ -242,39 +309,34 @@ def bulk_article_actions():
         if len(article_ids) > 100:
             return jsonify({'error': 'Maximum 100 articles allowed per bulk action'}), 400
         
-        articles = NewsItem.query.filter(NewsItem.id.in_(article_ids)).all()
-        
-        if not articles:
-            return jsonify({'error': 'No articles found'}), 404
-        
-        processed_count = 0
-        
+        # Each action is a single set-based statement returning the ids it touched
         if action == 'include_in_sync':
-            for article in articles:
-                article.include_in_epub()
-                processed_count += 1
+            processed_ids = NewsItem.bulk_include_in_epub(article_ids)
         elif action == 'exclude_from_sync':
             reason = data.get('reason', 'Bulk exclusion')
-            for article in articles:
-                article.exclude_from_epub(reason)
-                processed_count += 1
+            processed_ids = NewsItem.bulk_exclude_from_epub(article_ids, reason)
         elif action == 'delete':
-            for article in articles:
-                db.session.delete(article)
-                processed_count += 1
+            processed_ids = NewsItem.bulk_delete(article_ids)
         else:
             return jsonify({'error': f'Unknown action: {action}'}), 400
         
+        if not processed_ids:
+            db.session.rollback()
+            return jsonify({'error': 'No articles found'}), 404
+        
         db.session.commit()
+        invalidate_content_list(ARTICLE_STATS_CACHE_KEY)
         
-        return jsonify({
+        return ojson({
             'message': f'Bulk action "{action}" completed',
-            'processed_count': processed_count,
+            'processed_count': len(processed_ids),
+            'processed_ids': [str(article_id) for article_id in processed_ids],
             'total_requested': len(article_ids)
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error performing bulk action: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error performing bulk action")
         return jsonify({'error': 'Failed to perform bulk action'}), 500
 
 
@@ -283,63 +345,129 @@ def get_recent_articles():
     """Get recent articles with pagination"""
     try:
         # Query parameters
-        hours = int(request.args.get('hours', 24))
-        limit = min(int(request.args.get('limit', 20)), 100)
-        offset = int(request.args.get('offset', 0))
+        hours = parse_int_arg(request.args, 'hours', 24, minimum=0, maximum=24 * 365)
+        limit = parse_int_arg(request.args, 'limit', 20, minimum=1, maximum=100)
+        offset = parse_int_arg(request.args, 'offset', 0, minimum=0)
         source = request.args.get('source')
-        include_content = request.args.get('include_content', 'false').lower() == 'true'
+        include_content = parse_bool_arg(request.args, 'include_content')
+        with_total = parse_bool_arg(request.args, 'count', default=True)  # ?count=false skips the COUNT
         
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        # Build query
-        query = NewsItem.query.filter(NewsItem.published_at >= cutoff_time)
+        # Build a column-only query; content is only fetched when requested
+        columns = [
+            NewsItem.id,
+            NewsItem.title,
+            NewsItem.author,
+            NewsItem.source_name,
+            NewsItem.category,
+            NewsItem.published_at,
+            NewsItem.word_count,
+            NewsItem.reading_time,
+            NewsItem.quality_score,
+            NewsItem.epub_included,
+            NewsItem.status,
+            NewsItem.summary
+        ]
+        if include_content:
+            columns.append(NewsItem.content)
+        
+        query = db.session.query(*columns).filter(NewsItem.published_at >= cutoff_time)
         
         if source:
             query = query.filter(NewsItem.source_name == source)
         
         # Apply sorting and pagination
         query = query.order_by(NewsItem.published_at.desc())
-        total_count = query.count()
-        articles = query.offset(offset).limit(limit).all()
-        
-        # Format articles
-        articles_data = []
-        for article in articles:
-            article_dict = {
-                'id': str(article.id),
-                'title': article.title,
-                'author': article.author,
-                'source_name': article.source_name,
-                'category': article.category,
-                'published_at': article.published_at.isoformat(),
-                'word_count': article.word_count,
-                'reading_time': article.reading_time,
-                'quality_score': article.quality_score,
-                'epub_included': article.epub_included,
-                'status': article.status,
-                'summary': article.summary
-            }
-            
-            if include_content:
-                article_dict['content'] = article.content
-            
-            articles_data.append(article_dict)
-        
-        return jsonify({
-            'articles': articles_data,
+        query_info = {
+            'hours': hours,
+            'source': source,
+            'include_content': include_content
+        }
+        
+        if include_content:
+            # Full bodies can run to megabytes, so stream rows as they arrive
+            return _stream_recent_articles(query, offset, limit, with_total, query_info)
+        
+        # The total is only counted when the client asks for it
+        articles, total_count, has_more = fetch_page(query, offset, limit, with_total)
+        
+        return ojson({
+            'articles': [_serialize_recent_article(article, include_content) for article in articles],
             'pagination': {
                 'total': total_count,
                 'limit': limit,
                 'offset': offset,
-                'has_more': offset + limit < total_count
+                'has_more': has_more
             },
-            'query_info': {
-                'hours': hours,
-                'source': source,
-                'include_content': include_content
-            }
-        }), 200
+            'query_info': query_info
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
-    except Exception as e:
-        logger.error(f"Error getting recent articles: {e}")
-        return jsonify({'error': 'Failed to get recent articles'}), 500
\ No newline at end of file
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting recent articles")
+        return jsonify({'error': 'Failed to get recent articles'}), 500
+
+
+def _serialize_recent_article(article, include_content):
+    """Format a recent-articles row for the API response"""
+    article_dict = {
+        'id': str(article.id),
+        'title': article.title,
+        'author': article.author,
+        'source_name': article.source_name,
+        'category': article.category,
+        'published_at': article.published_at,
+        'word_count': article.word_count,
+        'reading_time': article.reading_time,
+        'quality_score': article.quality_score,
+        'epub_included': article.epub_included,
+        'status': article.status,
+        'summary': article.summary
+    }
+    
+    if include_content:
+        article_dict['content'] = article.content
+    
+    return article_dict
+
+
+def _stream_recent_articles(query, offset, limit, with_total, query_info):
+    """Stream a page of recent articles, batching rows from the database cursor"""
+    if with_total:
+        rows = with_total_count(query).offset(offset).limit(limit).yield_per(25)
+    else:
+        # One extra row answers has_more without counting
+        rows = query.offset(offset).limit(limit + 1).yield_per(25)
+    page = {'total': None, 'has_more': False}
+    
+    def articles():
+        for index, article in enumerate(rows):
+            if index == limit:
+                page['has_more'] = True
+                break
+            if with_total and index == 0:
+                page['total'] = article.total_count
+            yield _serialize_recent_article(article, include_content=True)
+    
+    def trailer():
+        total_count = page['total']
+        if with_total:
+            if total_count is None:
+                # Past the last page the window has nothing to report
+                total_count = query.count() if offset else 0
+            page['has_more'] = offset + limit < total_count
+        return {
+            'pagination': {
+                'total': total_count,
+                'limit': limit,
+                'offset': offset,
+                'has_more': page['has_more']
+            },
+            'query_info': query_info
+        }
+    
+    return stream_ojson('articles', articles(), trailer)
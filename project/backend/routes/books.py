@@ -9,13 +9,42 @@ from datetime import datetime, timedelta
 import logging
 import os
 
+from sqlalchemy import JSON, literal, null, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+
 from models import db, Book, SyncLog
-from services.book_manager import BookManager
+from services.book_manager import get_book_manager
+from utils.cache import bump_version, get_or_set_json, invalidate_content_list, versioned_etag
 from utils.file_handler import FileHandler
+from utils.pagination import fetch_page
+from utils.responses import ojson
+from utils.validation import QueryParamError, parse_bool_arg, parse_int_arg
 
 books_bp = Blueprint('books', __name__)
 logger = logging.getLogger(__name__)
 
+# Cache keys for read-mostly aggregate endpoints
+BOOK_STATS_CACHE_KEY = 'stats:books:global'
+BOOK_STATS_CACHE_TTL = 300  # 5 minutes
+GENRES_CACHE_KEY = 'genres:books:list'
+GENRES_CACHE_TTL = 600  # 10 minutes
+# Content version behind the ETags of the read-mostly endpoints
+BOOKS_VERSION = 'books'
+# Signed URLs live for an hour; expire the cached copy 5 minutes earlier
+DOWNLOAD_URL_CACHE_TTL = 55 * 60
+
+def _download_url_cache_key(book_id):
+    """Cache key for a book's signed download URL"""
+    return f'download:book:{book_id}'
+
+def _invalidate_book_caches(book_id=None):
+    """Drop cached aggregates, and the book's download URL, after a committed mutation"""
+    keys = [BOOK_STATS_CACHE_KEY, GENRES_CACHE_KEY]
+    if book_id is not None:
+        keys.append(_download_url_cache_key(book_id))
+    invalidate_content_list(*keys)
+    bump_version(BOOKS_VERSION)
+
 @books_bp.route('/', methods=['GET'])
 def list_books():
     """List books with optional filtering and pagination"""
@@ -26,18 +55,20 @@ def list_books():
         author = request.args.get('author')
         format_filter = request.args.get('format')
         status = request.args.get('status')
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
-        offset = int(request.args.get('offset', 0))
+        limit = parse_int_arg(request.args, 'limit', 50, minimum=1, maximum=100)  # Max 100
+        offset = parse_int_arg(request.args, 'offset', 0, minimum=0)
         sort_by = request.args.get('sort_by', 'created_at')
         order = request.args.get('order', 'desc')
+        with_total = parse_bool_arg(request.args, 'count', default=True)  # ?count=false skips the COUNT
         
-        # Build query
-        query = Book.query
+        # Build a column-only query so rows skip ORM hydration
+        query = db.session.query(*Book.list_columns())
         
         # Apply filters
         if search:
-            books = Book.search(search, limit=limit)
-            total_count = len(books)
+            # Ranked search results, paginated like the plain listing
+            query = Book.apply_search(query, search)
+            books, total_count, has_more = fetch_page(query, offset, limit, with_total)
         else:
             if genre:
                 query = query.filter(Book.genre == genre)
@@ -66,24 +97,25 @@ def list_books():
             
             query = query.order_by(sort_field)
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            books = query.offset(offset).limit(limit).all()
+            # The total is only counted when the client asks for it
+            books, total_count, has_more = fetch_page(query, offset, limit, with_total)
         
-        return jsonify({
-            'books': [book.to_dict() for book in books],
+        return ojson({
+            'books': [Book.row_to_dict(book) for book in books],
             'pagination': {
                 'total': total_count,
                 'limit': limit,
                 'offset': offset,
-                'has_more': offset + limit < total_count
+                'has_more': has_more
             }
-        }), 200
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
-    except Exception as e:
-        logger.error(f"Error listing books: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error listing books")
         return jsonify({'error': 'Failed to list books'}), 500
 
 @books_bp.route('/<book_id>', methods=['GET'])
@@ -91,10 +123,11 @@ def get_book(book_id):
     """Get specific book details"""
     try:
         book = Book.query.get_or_404(book_id)
-        return jsonify(book.to_dict()), 200
+        return ojson(book.to_dict())
         
-    except Exception as e:
-        logger.error(f"Error getting book {book_id}: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception(f"Error getting book {book_id}")
         return jsonify({'error': 'Failed to get book'}), 500
 
 @books_bp.route('/', methods=['POST'])
@@ -102,16 +135,16 @@ def create_book():
     """Create a new book entry"""
     try:
         # Validate request data
-        if not request.json:
+        book_data = request.get_json(silent=True)
+        if not book_data:
             return jsonify({'error': 'JSON data required'}), 400
         
         required_fields = ['title', 'author', 'format', 'file_size', 'gcs_path', 'file_hash']
         for field in required_fields:
-            if field not in request.json:
+            if field not in book_data:
                 return jsonify({'error': f'{field} is required'}), 400
         
         # Create book
-        book_data = request.json
         book = Book(
             title=book_data['title'],
             author=book_data['author'],
@@ -132,6 +165,7 @@ def create_book():
         
         db.session.add(book)
         db.session.commit()
+        _invalidate_book_caches()
         
         logger.info(f"Created new book: {book.title} by {book.author}")
         
@@ -140,9 +174,13 @@ def create_book():
             'book': book.to_dict()
         }), 201
         
-    except Exception as e:
+    except (TypeError, ValueError) as e:
+        logger.info(f"Rejected creating book: {e}")
+        return jsonify({'error': 'Invalid book data'}), 400
+        
+    except SQLAlchemyError:
         db.session.rollback()
-        logger.error(f"Error creating book: {e}")
+        logger.exception("Error creating book")
         return jsonify({'error': 'Failed to create book'}), 500
 
 @books_bp.route('/upload', methods=['POST'])
@@ -167,10 +205,11 @@ def upload_book():
             return jsonify({'error': 'Title and author are required'}), 400
         
         # Use BookManager to handle upload
-        book_manager = BookManager()
+        book_manager = get_book_manager()
         book = book_manager.upload_book(file, title, author, description, genre)
         
         if book:
+            _invalidate_book_caches()
             return jsonify({
                 'message': 'Book uploaded successfully',
                 'book': book.to_dict()
@@ -178,8 +217,9 @@ def upload_book():
         else:
             return jsonify({'error': 'Failed to upload book'}), 500
             
-    except Exception as e:
-        logger.error(f"Error uploading book: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error uploading book")
         return jsonify({'error': 'Failed to upload book'}), 500
 
 @books_bp.route('/<book_id>', methods=['PUT'])
@@ -188,7 +228,8 @@ def update_book(book_id):
     try:
         book = Book.query.get_or_404(book_id)
         
-        if not request.json:
+        data = request.get_json(silent=True)
+        if not data:
             return jsonify({'error': 'JSON data required'}), 400
         
         # Update allowed fields
@@ -199,25 +240,31 @@ def update_book(book_id):
         ]
         
         for field in allowed_fields:
-            if field in request.json:
-                if field == 'publication_date' and request.json[field]:
-                    setattr(book, field, datetime.fromisoformat(request.json[field]))
+            if field in data:
+                if field == 'publication_date' and data[field]:
+                    setattr(book, field, datetime.fromisoformat(data[field]))
                 else:
-                    setattr(book, field, request.json[field])
+                    setattr(book, field, data[field])
         
         book.updated_at = datetime.utcnow()
         db.session.commit()
+        # The title is baked into the signed URL's download filename
+        _invalidate_book_caches(book.id)
         
         logger.info(f"Updated book: {book.title}")
         
-        return jsonify({
+        return ojson({
             'message': 'Book updated successfully',
             'book': book.to_dict()
-        }), 200
+        })
         
-    except Exception as e:
+    except (TypeError, ValueError) as e:
+        logger.info(f"Rejected updating book {book_id}: {e}")
+        return jsonify({'error': 'Invalid book data'}), 400
+        
+    except SQLAlchemyError:
         db.session.rollback()
-        logger.error(f"Error updating book {book_id}: {e}")
+        logger.exception(f"Error updating book {book_id}")
         return jsonify({'error': 'Failed to update book'}), 500
 
 @books_bp.route('/<book_id>', methods=['DELETE'])
@@ -227,16 +274,18 @@ def delete_book(book_id):
         book = Book.query.get_or_404(book_id)
         
         # Use BookManager to handle deletion (includes file cleanup)
-        book_manager = BookManager()
+        book_manager = get_book_manager()
         success = book_manager.delete_book(book)
         
         if success:
-            return jsonify({'message': 'Book deleted successfully'}), 200
+            _invalidate_book_caches(book.id)
+            return ojson({'message': 'Book deleted successfully'})
         else:
             return jsonify({'error': 'Failed to delete book'}), 500
             
-    except Exception as e:
-        logger.error(f"Error deleting book {book_id}: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception(f"Error deleting book {book_id}")
         return jsonify({'error': 'Failed to delete book'}), 500
 
 @books_bp.route('/<book_id>/download', methods=['GET'])
@@ -245,102 +294,185 @@ def download_book(book_id):
     try:
         book = Book.query.get_or_404(book_id)
         
-        # Use BookManager to generate download URL
-        book_manager = BookManager()
-        download_url = book_manager.get_download_url(book)
+        # Reuse a still-valid signed URL instead of signing on every request
+        download = get_or_set_json(
+            _download_url_cache_key(book.id),
+            DOWNLOAD_URL_CACHE_TTL,
+            lambda: _sign_download_url(book)
+        )
         
-        if download_url:
-            return jsonify({
-                'download_url': download_url,
+        if download:
+            return ojson({
+                'download_url': download['download_url'],
                 'filename': f"{book.title}.{book.format.lower()}",
-                'expires_at': (datetime.utcnow() + timedelta(hours=1)).isoformat()
-            }), 200
+                'expires_at': download['expires_at']
+            })
         else:
             return jsonify({'error': 'Failed to generate download URL'}), 500
             
-    except Exception as e:
-        logger.error(f"Error getting download URL for book {book_id}: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception(f"Error getting download URL for book {book_id}")
         return jsonify({'error': 'Failed to get download URL'}), 500
 
+def _sign_download_url(book):
+    """Sign a fresh download URL, or return None if signing failed"""
+    download_url = get_book_manager().get_download_url(book)
+    if not download_url:
+        return None
+    
+    return {
+        'download_url': download_url,
+        'expires_at': (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    }
+
 @books_bp.route('/<book_id>/progress', methods=['PUT'])
 def update_reading_progress(book_id):
     """Update reading progress for a book"""
     try:
         book = Book.query.get_or_404(book_id)
         
-        if not request.json or 'progress' not in request.json:
+        data = request.get_json(silent=True) or {}
+        if 'progress' not in data:
             return jsonify({'error': 'Progress value required'}), 400
         
-        progress = float(request.json['progress'])
-        position = request.json.get('position')
+        progress = float(data['progress'])
+        position = data.get('position')
         
         # Validate progress
         if not 0.0 <= progress <= 1.0:
             return jsonify({'error': 'Progress must be between 0.0 and 1.0'}), 400
         
         book.update_reading_progress(progress, position)
+        _invalidate_book_caches()
         
-        return jsonify({
+        return ojson({
             'message': 'Reading progress updated',
             'progress': book.reading_progress,
             'position': book.last_read_position
-        }), 200
+        })
+        
+    except (TypeError, ValueError) as e:
+        logger.info(f"Rejected updating reading progress for book {book_id}: {e}")
+        return jsonify({'error': 'Invalid progress value'}), 400
         
-    except Exception as e:
-        logger.error(f"Error updating reading progress for book {book_id}: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception(f"Error updating reading progress for book {book_id}")
         return jsonify({'error': 'Failed to update reading progress'}), 500
 
+def _count_by(column, *criteria):
+    """Scalar subquery folding per-value book counts into a JSON object"""
+    counts = select(column.label('key'), db.func.count(Book.id).label('count'))\
+        .where(*criteria)\
+        .group_by(column)\
+        .subquery()
+    # json_object_agg rejects NULL keys; "null" is what the encoder emits for None anyway
+    return select(db.func.coalesce(
+        db.func.json_object_agg(db.func.coalesce(counts.c.key, 'null'), counts.c.count),
+        db.func.json_build_object()
+    )).scalar_subquery()
+
+def _compute_book_stats_postgresql():
+    """Have PostgreSQL build the whole /stats payload as one JSON scalar"""
+    stats = db.session.execute(select(db.func.json_build_object(
+        'total_books', select(db.func.count(Book.id)).scalar_subquery(),
+        'by_format', _count_by(Book.format),
+        'by_genre', _count_by(Book.genre, Book.genre.isnot(None)),
+        'by_status', _count_by(Book.status),
+        'by_sync_status', _count_by(Book.sync_status),
+        'total_file_size', select(db.func.coalesce(db.func.sum(Book.file_size), 0)).scalar_subquery(),
+        type_=JSON
+    ))).scalar()
+    
+    stats['recent_books'] = min(stats['total_books'], 10)
+    return stats
+
+def _compute_book_stats():
+    """Run the aggregations behind /stats in a single round-trip"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _compute_book_stats_postgresql()
+    
+    # Portable fallback (SQLite in tests): one UNION ALL tagged by dimension
+    count = db.func.count(Book.id)
+    rows = db.session.execute(union_all(
+        select(literal('by_format'), Book.format, count, null()).group_by(Book.format),
+        select(literal('by_genre'), Book.genre, count, null())
+            .where(Book.genre.isnot(None))
+            .group_by(Book.genre),
+        select(literal('by_status'), Book.status, count, null()).group_by(Book.status),
+        select(literal('by_sync_status'), Book.sync_status, count, null()).group_by(Book.sync_status),
+        select(literal('total'), null(), count, db.func.sum(Book.file_size))
+    )).all()
+    
+    stats = {'by_format': {}, 'by_genre': {}, 'by_status': {}, 'by_sync_status': {}}
+    for dimension, key, row_count, file_size in rows:
+        if dimension == 'total':
+            total_books, total_file_size = row_count, int(file_size or 0)
+        else:
+            stats[dimension][key] = row_count
+    
+    return {
+        'total_books': total_books,
+        **stats,
+        'total_file_size': total_file_size,
+        'recent_books': min(total_books, 10)
+    }
+
 @books_bp.route('/stats', methods=['GET'])
+@versioned_etag(BOOKS_VERSION, max_age=BOOK_STATS_CACHE_TTL)
 def get_book_stats():
     """Get book collection statistics"""
     try:
-        stats = {
-            'total_books': Book.query.count(),
-            'by_format': dict(db.session.query(Book.format, db.func.count(Book.id)).group_by(Book.format).all()),
-            'by_genre': dict(db.session.query(Book.genre, db.func.count(Book.id))
-                           .filter(Book.genre.isnot(None))
-                           .group_by(Book.genre).all()),
-            'by_status': dict(db.session.query(Book.status, db.func.count(Book.id)).group_by(Book.status).all()),
-            'by_sync_status': dict(db.session.query(Book.sync_status, db.func.count(Book.id)).group_by(Book.sync_status).all()),
-            'total_file_size': db.session.query(db.func.sum(Book.file_size)).scalar() or 0,
-            'recent_books': len(Book.get_recent(limit=10))
-        }
-        
-        return jsonify(stats), 200
-        
-    except Exception as e:
-        logger.error(f"Error getting book stats: {e}")
+        stats = get_or_set_json(BOOK_STATS_CACHE_KEY, BOOK_STATS_CACHE_TTL, _compute_book_stats)
+        
+        return ojson(stats)
+        
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting book stats")
         return jsonify({'error': 'Failed to get book stats'}), 500
 
 @books_bp.route('/recent', methods=['GET'])
+@versioned_etag(BOOKS_VERSION, max_age=BOOK_STATS_CACHE_TTL)
 def get_recent_books():
     """Get recently added books"""
     try:
-        limit = min(int(request.args.get('limit', 20)), 100)
+        limit = parse_int_arg(request.args, 'limit', 20, minimum=1, maximum=100)
         books = Book.get_recent(limit=limit)
         
-        return jsonify({
+        return ojson({
             'books': [book.to_dict() for book in books]
-        }), 200
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
-    except Exception as e:
-        logger.error(f"Error getting recent books: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting recent books")
         return jsonify({'error': 'Failed to get recent books'}), 500
 
+def _compute_genres():
+    """Return the sorted list of distinct genres"""
+    genres = db.session.query(Book.genre)\
+                      .filter(Book.genre.isnot(None))\
+                      .distinct().all()
+    
+    return sorted(genre[0] for genre in genres)
+
 @books_bp.route('/genres', methods=['GET'])
+@versioned_etag(BOOKS_VERSION, max_age=GENRES_CACHE_TTL)
 def get_genres():
     """Get list of available genres"""
     try:
-        genres = db.session.query(Book.genre)\
-                          .filter(Book.genre.isnot(None))\
-                          .distinct().all()
+        genre_list = get_or_set_json(GENRES_CACHE_KEY, GENRES_CACHE_TTL, _compute_genres)
         
-        genre_list = [genre[0] for genre in genres]
+        return ojson({'genres': genre_list})
         
-        return jsonify({'genres': sorted(genre_list)}), 200
-        
-    except Exception as e:
-        logger.error(f"Error getting genres: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Error getting genres")
         return jsonify({'error': 'Failed to get genres'}), 500
 
 @books_bp.route('/<book_id>/sync', methods=['POST'])
@@ -349,13 +481,15 @@ def mark_for_sync(book_id):
     try:
         book = Book.query.get_or_404(book_id)
         book.mark_for_sync()
+        _invalidate_book_caches()
         
-        return jsonify({
+        return ojson({
             'message': 'Book marked for sync',
             'book_id': str(book.id),
             'sync_status': book.sync_status
-        }), 200
+        })
         
-    except Exception as e:
-        logger.error(f"Error marking book {book_id} for sync: {e}")
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception(f"Error marking book {book_id} for sync")
         return jsonify({'error': 'Failed to mark book for sync'}), 500
\ No newline at end of file
@@ -3,20 +3,50 @@ KUAL API endpoints
 Provides API endpoints expected by the Kindle KUAL client for downloading content
 """
 
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, g
+from werkzeug.datastructures import ContentRange
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+import hashlib
+import itertools
 import logging
 import json
 import os
+import re
 import tempfile
+import threading
+import time
+import uuid
 
+from sqlalchemy.orm import load_only
+
+from config.settings import Config
 from models import db, NewsItem, Book
+from services.book_manager import get_book_manager
 from services.kindle_sync import KindleSyncService
-from utils.epub_creator import EpubCreator
+from utils.cache import CONTENT_LIST_CACHE_KEY, etag_matches, get_or_set_json
+from utils.digest_cache import digest_cache_path, store_digest
+from utils.epub_creator import DIGEST_ARTICLE_COLUMNS, EpubCreator
+from utils.responses import dumps_bytes, ojson
 
 kual_api_bp = Blueprint('kual_api', __name__, url_prefix='/api/v1')
 logger = logging.getLogger(__name__)
 
+# Mutations invalidate the content list; the TTL covers the news window
+CONTENT_LIST_CACHE_TTL = 60
+
+# News digest content IDs are news_<source slug>_<YYYYMMDD>
+NEWS_CONTENT_ID_RE = re.compile(r'^news_(?P<slug>.+)_(?P<date>\d{8})$')
+_source_names_by_slug = {}
+
+# Digest builds in progress, keyed by cache path so concurrent requests for
+# the same digest share one build. Failed builds stay until their expiry in
+# _failed_digest_builds so polling clients see the error instead of a rebuild.
+_digest_executor = None
+_digest_builds = {}
+_failed_digest_builds = {}
+_digest_builds_lock = threading.RLock()
+
 
 def verify_device_auth():
     """Verify device authentication using headers"""
@@ -34,6 +64,102 @@ def verify_device_auth():
     return device_id, None
 
 
+def _source_slug(source_name):
+    """Slug used for a news source in digest content IDs"""
+    return source_name.lower().replace(' ', '_')
+
+
+def _resolve_source_slug(slug):
+    """Return the source name for a digest slug, remembering resolved slugs"""
+    source_name = _source_names_by_slug.get(slug)
+    if source_name is None:
+        source_name = NewsItem.find_source_name(slug)
+        if source_name is not None:
+            _source_names_by_slug[slug] = source_name
+    return source_name
+
+
+def _get_digest_executor():
+    """Return the shared digest build pool, creating it on first use"""
+    global _digest_executor
+    if _digest_executor is None:
+        _digest_executor = ThreadPoolExecutor(
+            max_workers=Config.DIGEST_BUILD_MAX_WORKERS,
+            thread_name_prefix='digest-build'
+        )
+    return _digest_executor
+
+
+def _build_digest(app, source_name, article_ids, title, cache_path):
+    """Build a digest EPUB into the digest cache; runs on the build pool"""
+    with app.app_context():
+        articles = NewsItem.query.options(load_only(*DIGEST_ARTICLE_COLUMNS)).filter(
+            NewsItem.id.in_(article_ids)
+        ).order_by(NewsItem.published_at.desc()).all()
+        
+        epub_path = EpubCreator().create_news_digest(
+            title=title,
+            articles=articles,
+            author=source_name
+        )
+        
+        if not epub_path or not os.path.exists(epub_path):
+            raise RuntimeError(f"Failed to create EPUB file for {source_name}")
+        
+        store_digest(epub_path, cache_path)
+        logger.info(f"Built news digest: {title} ({len(articles)} articles)")
+    
+    return cache_path
+
+
+def _submit_digest_build(source_name, article_ids, title, cache_path):
+    """Start building a digest unless the same build is running or recently failed"""
+    with _digest_builds_lock:
+        now = time.monotonic()
+        for failed_path, expires_at in list(_failed_digest_builds.items()):
+            if expires_at <= now:
+                del _failed_digest_builds[failed_path]
+                _digest_builds.pop(failed_path, None)
+        
+        future = _digest_builds.get(cache_path)
+        if future is None:
+            future = _get_digest_executor().submit(
+                _build_digest, current_app._get_current_object(),
+                source_name, article_ids, title, cache_path
+            )
+            _digest_builds[cache_path] = future
+            future.add_done_callback(lambda done: _finish_digest_build(cache_path, done))
+    return future
+
+
+def _finish_digest_build(cache_path, future):
+    """Forget a finished build, keeping failures for DIGEST_BUILD_FAILURE_TTL"""
+    with _digest_builds_lock:
+        if future.cancelled() or future.exception() is None:
+            _digest_builds.pop(cache_path, None)
+        else:
+            _failed_digest_builds[cache_path] = time.monotonic() + Config.DIGEST_BUILD_FAILURE_TTL
+
+
+def _digest_building_response(content_id):
+    """202 telling the client to poll again for a digest still being built"""
+    response = jsonify({
+        'status': 'building',
+        'content_id': content_id,
+        'poll_url': request.path
+    })
+    response.status_code = 202
+    response.headers['Retry-After'] = '5'
+    return response
+
+
+@kual_api_bp.before_request
+def capture_request_time():
+    """Take the request timestamp once for every handler to share"""
+    g.now = datetime.utcnow()
+    g.now_iso = g.now.isoformat()
+
+
 @kual_api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for KUAL client"""
@@ -41,7 +167,7 @@ def health_check():
         'status': 'healthy',
         'service': 'kindle-content-server',
         'version': '1.0.0',
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': g.now_iso
     }), 200
 
 
@@ -69,8 +195,8 @@ def authenticate_device():
             'message': 'Device authenticated successfully',
             'device_id': device_id,
             'device_type': device_type,
-            'server_time': datetime.utcnow().isoformat(),
-            'session_expires': (datetime.utcnow() + timedelta(hours=24)).isoformat()
+            'server_time': g.now_iso,
+            'session_expires': (g.now + timedelta(hours=24)).isoformat()
         }), 200
         
     except Exception as e:
@@ -81,6 +207,76 @@ def authenticate_device():
         }), 500
 
 
+def _build_content_list():
+    """Build the device-independent part of the content list"""
+    now = datetime.utcnow()
+    content_items = []
+    
+    # Get available books, loading only the fields listed below
+    books = Book.query.options(load_only(
+        Book.id, Book.title, Book.author, Book.format, Book.file_size, Book.created_at
+    )).filter_by(status='available').limit(50).all()
+    for book in books:
+        content_items.append({
+            'id': str(book.id),
+            'type': 'book',
+            'title': book.title,
+            'author': book.author,
+            'filename': f"{book.title}.{book.format.lower()}",
+            'format': book.format.lower(),
+            'file_size': book.file_size,
+            'upload_date': book.created_at.isoformat() if book.created_at else None,
+            'description': f"Book by {book.author}",
+            'ready_for_sync': True
+        })
+    
+    # Get recent articles ready for sync (create EPUBs), aggregated per source
+    cutoff_time = now - timedelta(hours=48)
+    source_totals = db.session.query(
+        NewsItem.source_name,
+        db.func.count(NewsItem.id).label('article_count'),
+        db.func.coalesce(db.func.sum(NewsItem.word_count), 0).label('total_words'),
+        db.func.max(NewsItem.published_at).label('latest_published')
+    ).filter(
+        NewsItem.epub_included == True,
+        NewsItem.published_at >= cutoff_time,
+        NewsItem.quality_score >= 0.3
+    ).group_by(NewsItem.source_name).order_by(NewsItem.source_name).all()
+    
+    today = now.strftime('%Y%m%d')
+    
+    # Create EPUB entries for each source
+    for source_name, article_count, total_words, latest_published in source_totals:
+        # Calculate total size estimate
+        estimated_size = max(50000, total_words * 10)  # Rough estimate
+        
+        content_items.append({
+            'id': f"news_{_source_slug(source_name)}_{today}",
+            'type': 'news_digest',
+            'title': f"{source_name} - {now.strftime('%Y-%m-%d')}",
+            'author': source_name,
+            'filename': f"{source_name.replace(' ', '_')}_digest_{today}.epub",
+            'format': 'epub',
+            'file_size': estimated_size,
+            'upload_date': latest_published.isoformat(),
+            'description': f"News digest from {source_name} ({article_count} articles)",
+            'article_count': article_count,
+            'source_name': source_name,
+            'ready_for_sync': True
+        })
+    
+    # Every item field is derived from stored data, so the hash only changes
+    # when the listed content does
+    return {
+        'etag': hashlib.sha1(dumps_bytes(content_items)).hexdigest(),
+        'body': {
+            'content': content_items,
+            'total_items': len(content_items),
+            'last_updated': now.isoformat()
+        }
+    }
+
+
 @kual_api_bp.route('/content/list', methods=['GET'])
 def get_content_list():
     """Get list of content available for download"""
@@ -91,74 +287,59 @@ def get_content_list():
         
         logger.info(f"Content list requested by device: {device_id}")
         
-        content_items = []
-        
-        # Get available books
-        books = Book.query.filter_by(status='available').limit(50).all()
-        for book in books:
-            content_items.append({
-                'id': str(book.id),
-                'type': 'book',
-                'title': book.title,
-                'author': book.author,
-                'filename': f"{book.title}.{book.format.lower()}",
-                'format': book.format.lower(),
-                'file_size': book.file_size,
-                'upload_date': book.upload_date.isoformat() if book.upload_date else None,
-                'description': f"Book by {book.author}",
-                'ready_for_sync': True
-            })
-        
-        # Get recent articles ready for sync (create EPUBs)
-        cutoff_time = datetime.utcnow() - timedelta(hours=48)
-        articles = NewsItem.query.filter(
-            NewsItem.epub_included == True,
-            NewsItem.published_at >= cutoff_time,
-            NewsItem.quality_score >= 0.3
-        ).order_by(NewsItem.source_name, NewsItem.published_at.desc()).all()
-        
-        # Group articles by source for EPUB creation
-        articles_by_source = {}
-        for article in articles:
-            source = article.source_name
-            if source not in articles_by_source:
-                articles_by_source[source] = []
-            articles_by_source[source].append(article)
-        
-        # Create EPUB entries for each source
-        for source_name, source_articles in articles_by_source.items():
-            if len(source_articles) > 0:
-                # Calculate total size estimate
-                total_words = sum(article.word_count or 0 for article in source_articles)
-                estimated_size = max(50000, total_words * 10)  # Rough estimate
-                
-                content_items.append({
-                    'id': f"news_{source_name.lower().replace(' ', '_')}_{datetime.utcnow().strftime('%Y%m%d')}",
-                    'type': 'news_digest',
-                    'title': f"{source_name} - {datetime.utcnow().strftime('%Y-%m-%d')}",
-                    'author': source_name,
-                    'filename': f"{source_name.replace(' ', '_')}_digest_{datetime.utcnow().strftime('%Y%m%d')}.epub",
-                    'format': 'epub',
-                    'file_size': estimated_size,
-                    'upload_date': datetime.utcnow().isoformat(),
-                    'description': f"News digest from {source_name} ({len(source_articles)} articles)",
-                    'article_count': len(source_articles),
-                    'source_name': source_name,
-                    'ready_for_sync': True
-                })
+        content_list = get_or_set_json(CONTENT_LIST_CACHE_KEY, CONTENT_LIST_CACHE_TTL, _build_content_list)
         
-        return jsonify({
-            'content': content_items,
-            'total_items': len(content_items),
-            'last_updated': datetime.utcnow().isoformat(),
-            'device_id': device_id
-        }), 200
+        # The body echoes device_id, so the validator is per device
+        etag = hashlib.sha1(f"{content_list['etag']}:{device_id}".encode()).hexdigest()
+        if etag_matches(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = ojson({**content_list['body'], 'device_id': device_id})
+        
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         logger.error(f"Error getting content list: {e}")
         return jsonify({'error': 'Failed to get content list'}), 500
 
 
+def _stream_book(book):
+    """
+    Stream a book from Cloud Storage in chunks, so no request holds the whole file
+    
+    A single Range is honoured (206 with Content-Range) so interrupted
+    downloads resume, and one past the end of the file gets 416; other
+    requests get the full file.
+    """
+    byte_range = request.range.range_for_length(book.file_size) if request.range else None
+    if (byte_range is None and request.range and request.range.units == 'bytes'
+            and len(request.range.ranges) == 1):
+        response = jsonify({'error': 'Requested range not satisfiable'})
+        response.status_code = 416
+        response.headers['Content-Range'] = f'bytes */{book.file_size}'
+        return response
+    start, stop = byte_range or (0, book.file_size)
+    
+    chunks = get_book_manager().stream_book_content(book, start, stop)
+    # Fetch the first chunk now so a missing file fails before headers are sent
+    first_chunk = next(chunks, b'')
+    
+    response = Response(
+        itertools.chain([first_chunk], chunks),
+        status=206 if byte_range else 200,
+        mimetype='application/octet-stream',
+        direct_passthrough=True
+    )
+    response.content_length = stop - start
+    response.accept_ranges = 'bytes'
+    if byte_range:
+        response.content_range = ContentRange('bytes', start, stop, book.file_size)
+    response.headers.set('Content-Disposition', 'attachment',
+                         filename=f"{book.title}.{book.format.lower()}")
+    return response
+
+
 @kual_api_bp.route('/content/download/<content_id>', methods=['GET'])
 def download_content(content_id):
     """Download specific content file"""
@@ -179,78 +360,85 @@ def download_content(content_id):
                     file_path = file_handler.get_book_file_path(book.id)
                     if os.path.exists(file_path):
                         logger.info(f"Serving book file: {book.title}")
+                        # conditional answers Range / If-Range so interrupted
+                        # downloads resume instead of restarting
                         return send_file(
                             file_path,
                             as_attachment=True,
                             download_name=f"{book.title}.{book.format.lower()}",
-                            mimetype='application/octet-stream'
+                            mimetype='application/octet-stream',
+                            conditional=True
                         )
+                
+                # Otherwise stream it from Cloud Storage
+                if book.gcs_path:
+                    logger.info(f"Streaming book file: {book.title}")
+                    return _stream_book(book)
         except Exception as e:
             logger.warning(f"Book download failed for {content_id}: {e}")
         
         # Check if it's a news digest
-        if content_id.startswith('news_'):
+        match = NEWS_CONTENT_ID_RE.match(content_id)
+        if match:
             try:
-                # Parse content ID to extract source and date
-                parts = content_id.split('_')
-                if len(parts) >= 3:
-                    source_parts = parts[1:-1]  # Everything between 'news_' and date
-                    source_name = ' '.join(word.capitalize() for word in source_parts)
-                    date_str = parts[-1]
-                    
-                    # Get articles for this source from recent time
-                    cutoff_time = datetime.utcnow() - timedelta(hours=48)
-                    articles = NewsItem.query.filter(
+                # Map the slug back to the exact source name it was built from
+                source_name = _resolve_source_slug(match['slug'])
+                if source_name:
+                    # Identify the articles first; the full rows are only
+                    # needed if this digest has not been built yet
+                    cutoff_time = g.now - timedelta(hours=48)
+                    article_versions = db.session.query(NewsItem.id, NewsItem.updated_at).filter(
                         NewsItem.source_name == source_name,
                         NewsItem.epub_included == True,
                         NewsItem.published_at >= cutoff_time,
                         NewsItem.quality_score >= 0.3
                     ).order_by(NewsItem.published_at.desc()).limit(20).all()
                     
-                    if articles:
-                        # Create EPUB
-                        epub_creator = EpubCreator()
-                        title = f"{source_name} News Digest - {datetime.utcnow().strftime('%Y-%m-%d')}"
+                    if article_versions:
+                        today = g.now.strftime('%Y%m%d')
+                        cache_path = digest_cache_path(source_name, today, article_versions)
                         
-                        try:
-                            epub_path = epub_creator.create_news_digest(
-                                title=title,
-                                articles=articles,
-                                author=source_name
+                        if not os.path.exists(cache_path):
+                            future = _submit_digest_build(
+                                source_name,
+                                [article_id for article_id, _ in article_versions],
+                                f"{source_name} News Digest - {g.now.strftime('%Y-%m-%d')}",
+                                cache_path
                             )
                             
-                            if not epub_path or not os.path.exists(epub_path):
-                                raise Exception("Failed to create EPUB file")
+                            # Clients that opt in poll instead of holding a worker;
+                            # others wait a bounded time and then get a 503, which
+                            # download scripts treat as an error rather than saving
+                            # a JSON body as the .epub
+                            respond_async = 'respond-async' in request.headers.get('Prefer', '')
+                            wait = 0 if respond_async else Config.DIGEST_BUILD_WAIT_SECONDS
                             
-                            logger.info(f"Serving news digest: {title} ({len(articles)} articles)")
-                            
-                            filename = f"{source_name.replace(' ', '_')}_digest_{datetime.utcnow().strftime('%Y%m%d')}.epub"
-                            
-                            # Send file
-                            response = send_file(
-                                epub_path,
-                                as_attachment=True,
-                                download_name=filename,
-                                mimetype='application/epub+zip'
-                            )
-                            
-                            # Clean up temp file after sending
                             try:
-                                os.unlink(epub_path)
-                            except Exception:
-                                pass
-                            
-                            return response
-                            
-                        except Exception as e:
-                            logger.error(f"Error creating EPUB: {e}")
-                            # Clean up temp file on error
-                            if 'epub_path' in locals() and epub_path:
-                                try:
-                                    os.unlink(epub_path)
-                                except Exception:
-                                    pass
-                            raise e
+                                future.result(timeout=wait)
+                            except FutureTimeoutError:
+                                if respond_async:
+                                    return _digest_building_response(content_id)
+                                response = jsonify({'error': 'News digest is still being built'})
+                                response.status_code = 503
+                                response.headers['Retry-After'] = '5'
+                                return response
+                            except Exception as e:
+                                logger.error(f"News digest build failed for {content_id}: {e}")
+                                return jsonify({
+                                    'status': 'failed',
+                                    'content_id': content_id,
+                                    'error': 'Failed to build news digest'
+                                }), 500
+                        
+                        logger.info(f"Serving news digest for {source_name}")
+                        
+                        return send_file(
+                            cache_path,
+                            as_attachment=True,
+                            download_name=f"{source_name.replace(' ', '_')}_digest_{today}.epub",
+                            mimetype='application/epub+zip',
+                            conditional=True
+                        )
                             
             except Exception as e:
                 logger.error(f"News digest creation failed for {content_id}: {e}")
@@ -289,28 +477,30 @@ def report_sync_status():
             'message': message,
             'download_time': download_time,
             'file_size': file_size,
-            'reported_at': datetime.utcnow().isoformat()
+            'reported_at': g.now_iso
         }
         
         # For now, just log it
         logger.info(f"Sync report: {json.dumps(sync_log_data)}")
         
-        # If it's a book, update its sync status
-        try:
-            book = Book.query.get(content_id)
-            if book:
-                if status == 'success':
-                    book.mark_synced()
-                    db.session.commit()
-                    logger.info(f"Marked book {book.title} as synced")
-        except Exception as e:
-            logger.warning(f"Failed to update book sync status: {e}")
+        # If it's a book, update its sync status in a single statement
+        if status == 'success' and content_id and not NEWS_CONTENT_ID_RE.match(content_id):
+            try:
+                title = Book.mark_synced_by_id(uuid.UUID(content_id))
+                db.session.commit()
+                if title is not None:
+                    logger.info(f"Marked book {title} as synced")
+            except ValueError:
+                pass  # Not a book id
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Failed to update book sync status: {e}")
         
         return jsonify({
             'status': 'received',
             'message': 'Sync status recorded successfully',
             'content_id': content_id,
-            'server_time': datetime.utcnow().isoformat()
+            'server_time': g.now_iso
         }), 200
         
     except Exception as e:
@@ -341,7 +531,7 @@ def get_device_info():
                 'preferred_categories': ['news', 'books']
             },
             'server_info': {
-                'server_time': datetime.utcnow().isoformat(),
+                'server_time': g.now_iso,
                 'api_version': '1.0',
                 'features': ['books', 'news_digests', 'auto_sync']
             }
@@ -365,7 +555,7 @@ def get_sync_stats():
         article_count = NewsItem.query.filter_by(epub_included=True).count()
         
         recent_articles = NewsItem.query.filter(
-            NewsItem.published_at >= datetime.utcnow() - timedelta(hours=24),
+            NewsItem.published_at >= g.now - timedelta(hours=24),
             NewsItem.epub_included == True
         ).count()
         
@@ -376,13 +566,13 @@ def get_sync_stats():
                 'new_articles_24h': recent_articles
             },
             'sync_stats': {
-                'last_sync': datetime.utcnow().isoformat(),
+                'last_sync': g.now_iso,
                 'total_downloads': 0,  # Would track in production
                 'successful_syncs': 0,  # Would track in production
                 'failed_syncs': 0      # Would track in production
             },
             'device_id': device_id,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': g.now_iso
         }), 200
         
     except Exception as e:
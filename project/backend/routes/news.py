@@ -7,13 +7,38 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 import logging
 
+from sqlalchemy.orm import defer, load_only
+
 from models import db, NewsItem
 from services.news_aggregator import NewsAggregator
-from utils.epub_creator import EpubCreator
+from utils.cache import invalidate_content_list
+from utils.digest_cache import cleanup_digest_cache
+from utils.epub_creator import DIGEST_ARTICLE_COLUMNS, EpubCreator
+from utils.responses import ojson, stream_ojson
+from utils.validation import QueryParamError, parse_bool_arg, parse_int_arg
 
 news_bp = Blueprint('news', __name__)
 logger = logging.getLogger(__name__)
 
+# Serialized news items without content, keyed by (id, updated_at); any
+# change to an item bumps updated_at, so entries never need invalidating
+NEWS_DICT_CACHE_MAX_ENTRIES = 10000
+_news_dict_cache = {}
+
+def _news_item_dict(item, include_content):
+    """Return item.to_dict(), reusing the cached result for an unchanged item"""
+    if include_content:
+        # Article bodies are too large to keep around
+        return item.to_dict()
+    
+    key = (item.id, item.updated_at)
+    item_dict = _news_dict_cache.get(key)
+    if item_dict is None:
+        if len(_news_dict_cache) >= NEWS_DICT_CACHE_MAX_ENTRIES:
+            _news_dict_cache.clear()
+        item_dict = _news_dict_cache[key] = item.to_dict(include_content=False)
+    return item_dict
+
 @news_bp.route('/', methods=['GET'])
 def list_news():
     """List news items with optional filtering and pagination"""
@@ -23,17 +48,19 @@ def list_news():
         category = request.args.get('category')
         status = request.args.get('status')
         search = request.args.get('search')
-        hours = int(request.args.get('hours', 24))  # Recent news within X hours
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
-        offset = int(request.args.get('offset', 0))
-        include_content = request.args.get('include_content', 'false').lower() == 'true'
+        hours = parse_int_arg(request.args, 'hours', 24, minimum=0, maximum=24 * 365)  # Recent news within X hours
+        limit = parse_int_arg(request.args, 'limit', 50, minimum=1, maximum=100)  # Max 100
+        offset = parse_int_arg(request.args, 'offset', 0, minimum=0)
+        include_content = parse_bool_arg(request.args, 'include_content')
         
-        # Build query
+        # Build query, leaving the article body unloaded unless requested
         query = NewsItem.query
+        if not include_content:
+            query = query.options(defer(NewsItem.content))
         
         # Apply filters
         if search:
-            news_items = NewsItem.search(search, limit=limit)
+            news_items = NewsItem.search(search, limit=limit, include_content=include_content)
             total_count = len(news_items)
         else:
             if source:
@@ -55,19 +82,28 @@ def list_news():
             
             # Get total count
             total_count = query.count()
+            pagination = {
+                'total': total_count,
+                'limit': limit,
+                'offset': offset,
+                'has_more': offset + limit < total_count
+            }
+            
+            if include_content:
+                # Stream full articles batch by batch instead of holding the page
+                rows = query.offset(offset).limit(limit).yield_per(20)
+                return stream_ojson(
+                    'news_items',
+                    (item.to_dict() for item in rows),
+                    lambda: {'pagination': pagination}
+                )
             
             # Apply pagination
             news_items = query.offset(offset).limit(limit).all()
         
-        # Convert to dict, optionally excluding content for performance
-        items_data = []
-        for item in news_items:
-            item_dict = item.to_dict()
-            if not include_content:
-                item_dict.pop('content', None)
-            items_data.append(item_dict)
+        items_data = [_news_item_dict(item, include_content) for item in news_items]
         
-        return jsonify({
+        return ojson({
             'news_items': items_data,
             'pagination': {
                 'total': total_count,
@@ -75,7 +111,10 @@ def list_news():
                 'offset': offset,
                 'has_more': offset + limit < total_count
             }
-        }), 200
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
     except Exception as e:
         logger.error(f"Error listing news: {e}")
@@ -97,12 +136,14 @@ def aggregate_news():
     """Manually trigger news aggregation"""
     try:
         # Get optional parameters
-        force_refresh = request.json.get('force_refresh', False) if request.json else False
-        max_articles_per_feed = request.json.get('max_articles_per_feed', 10) if request.json else 10
+        data = request.get_json(silent=True) or {}
+        force_refresh = data.get('force_refresh', False)
+        max_articles_per_feed = data.get('max_articles_per_feed', 10)
         
         # Start news aggregation
         aggregator = NewsAggregator()
         results = aggregator.aggregate_all_feeds(force_refresh, max_articles_per_feed)
+        invalidate_content_list()
         
         return jsonify({
             'message': 'News aggregation completed',
@@ -152,18 +193,19 @@ def create_digest():
     """Create news digest EPUB"""
     try:
         # Validate request data
-        if not request.json:
+        data = request.get_json(silent=True)
+        if not data:
             return jsonify({'error': 'JSON data required'}), 400
         
-        title = request.json.get('title', f'News Digest - {datetime.now().strftime("%Y-%m-%d")}')
-        max_articles = request.json.get('max_articles', 20)
-        min_quality = request.json.get('min_quality', 0.5)
-        sources = request.json.get('sources', [])  # Filter by specific sources
-        categories = request.json.get('categories', [])  # Filter by specific categories
-        hours = request.json.get('hours', 24)  # Recent articles within X hours
+        title = data.get('title', f'News Digest - {datetime.now().strftime("%Y-%m-%d")}')
+        max_articles = data.get('max_articles', 20)
+        min_quality = data.get('min_quality', 0.5)
+        sources = data.get('sources', [])  # Filter by specific sources
+        categories = data.get('categories', [])  # Filter by specific categories
+        hours = data.get('hours', 24)  # Recent articles within X hours
         
         # Get news items for digest
-        query = NewsItem.query.filter(
+        query = NewsItem.query.options(load_only(*DIGEST_ARTICLE_COLUMNS)).filter(
             NewsItem.epub_included == True,
             NewsItem.quality_score >= min_quality
         )
@@ -210,6 +252,8 @@ def include_in_epub(news_id):
     try:
         news_item = NewsItem.query.get_or_404(news_id)
         news_item.include_in_epub()
+        db.session.commit()
+        invalidate_content_list()
         
         return jsonify({
             'message': 'News item included in EPUB',
@@ -226,9 +270,11 @@ def exclude_from_epub(news_id):
     """Exclude news item from EPUB generation"""
     try:
         news_item = NewsItem.query.get_or_404(news_id)
-        reason = request.json.get('reason') if request.json else None
+        reason = (request.get_json(silent=True) or {}).get('reason')
         
         news_item.exclude_from_epub(reason)
+        db.session.commit()
+        invalidate_content_list()
         
         return jsonify({
             'message': 'News item excluded from EPUB',
@@ -245,26 +291,17 @@ def exclude_from_epub(news_id):
 def process_pending():
     """Process pending news items"""
     try:
-        pending_items = NewsItem.get_pending_processing()
-        
-        processed_count = 0
-        for item in pending_items:
-            try:
-                item.process_content()
-                processed_count += 1
-            except Exception as e:
-                logger.error(f"Error processing news item {item.id}: {e}")
-                continue
-        
+        processed_count = NewsItem.process_pending()
         db.session.commit()
         
         return jsonify({
             'message': f'Processed {processed_count} news items',
             'processed_count': processed_count,
-            'total_pending': len(pending_items)
+            'total_pending': processed_count
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Error processing pending news items: {e}")
         return jsonify({'error': 'Failed to process pending news items'}), 500
 
@@ -272,19 +309,28 @@ def process_pending():
 def get_news_stats():
     """Get news collection statistics"""
     try:
+        cutoff_24h = datetime.utcnow() - timedelta(hours=24)
+        
+        # Scalar aggregates in one pass using FILTER for the conditional counts
+        totals = db.session.query(
+            db.func.count(NewsItem.id).label('total_items'),
+            db.func.count(NewsItem.id).filter(NewsItem.epub_included == True).label('epub_included'),
+            db.func.count(NewsItem.id).filter(NewsItem.published_at >= cutoff_24h).label('recent_24h'),
+            db.func.avg(NewsItem.quality_score).label('average_quality_score'),
+            db.func.sum(NewsItem.word_count).label('total_word_count')
+        ).one()
+        
         stats = {
-            'total_items': NewsItem.query.count(),
+            'total_items': totals.total_items,
             'by_status': dict(db.session.query(NewsItem.status, db.func.count(NewsItem.id)).group_by(NewsItem.status).all()),
             'by_source': dict(db.session.query(NewsItem.source_name, db.func.count(NewsItem.id)).group_by(NewsItem.source_name).all()),
-            'epub_included': NewsItem.query.filter_by(epub_included=True).count(),
-            'recent_24h': NewsItem.query.filter(
-                NewsItem.published_at >= datetime.utcnow() - timedelta(hours=24)
-            ).count(),
-            'average_quality_score': db.session.query(db.func.avg(NewsItem.quality_score)).scalar() or 0,
-            'total_word_count': db.session.query(db.func.sum(NewsItem.word_count)).scalar() or 0
+            'epub_included': totals.epub_included,
+            'recent_24h': totals.recent_24h,
+            'average_quality_score': totals.average_quality_score or 0,
+            'total_word_count': totals.total_word_count or 0
         }
         
-        return jsonify(stats), 200
+        return ojson(stats)
         
     except Exception as e:
         logger.error(f"Error getting news stats: {e}")
@@ -294,20 +340,18 @@ def get_news_stats():
 def cleanup_old_news():
     """Clean up old news items"""
     try:
-        days = request.json.get('days', 30) if request.json else 30
+        days = (request.get_json(silent=True) or {}).get('days', 30)
         cutoff = datetime.utcnow() - timedelta(days=days)
         
         # Delete old news items that are not included in EPUB
-        deleted_count = NewsItem.query.filter(
-            NewsItem.created_at < cutoff,
-            NewsItem.epub_included == False
-        ).delete()
+        deleted_count = NewsItem.delete_older_than(cutoff)
         
-        db.session.commit()
+        digest_files_removed = cleanup_digest_cache()
         
         return jsonify({
             'message': f'Cleaned up {deleted_count} old news items',
             'deleted_count': deleted_count,
+            'digest_files_removed': digest_files_removed,
             'cutoff_date': cutoff.isoformat()
         }), 200
         
@@ -5,17 +5,24 @@ Handles RSS feed testing, configuration, and management
 
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
+import hashlib
 import logging
 from typing import Dict, List
 
-from services.rss_feed_tester import RSSFeedTester, FeedConfiguration, FeedHealthStatus
+from services.rss_feed_tester import get_feed_tester, FeedConfiguration, FeedHealthStatus
 from services.news_aggregator import NewsAggregator
 from models import db
-from utils.validation import validate_json_schema
+from config.settings import Config
+from utils.cache import etag_matches, get_or_set_json
+from utils.responses import ojson, stream_ojson
+from utils.validation import compile_schema, validate_json_schema
 
 rss_feeds_bp = Blueprint('rss_feeds', __name__)
 logger = logging.getLogger(__name__)
 
+FEED_HEALTH_CACHE_KEY = 'rss:feed_health'
+FEED_HEALTH_CACHE_TTL = 60
+
 # JSON schemas for validation
 RSS_FEED_SCHEMA = {
     "type": "object",
@@ -58,16 +65,19 @@ FEED_TEST_SCHEMA = {
     "additionalProperties": False
 }
 
+# Checked and built once; validated against on every feed test request
+FEED_TEST_VALIDATOR = compile_schema(FEED_TEST_SCHEMA)
+
 
 @rss_feeds_bp.route('/test', methods=['POST'])
 def test_rss_feed():
     """Test a single RSS feed"""
     try:
         # Validate input
-        if not validate_json_schema(request.json, FEED_TEST_SCHEMA):
+        data = request.get_json(silent=True)
+        if not validate_json_schema(data, FEED_TEST_VALIDATOR):
             return jsonify({'error': 'Invalid request data'}), 400
         
-        data = request.json
         url = data['url']
         
         # Create configuration
@@ -79,27 +89,10 @@ def test_rss_feed():
         )
         
         # Test the feed
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         result = tester.test_feed(url, config)
         
-        # Convert result to dict
-        result_dict = {
-            'url': result.url,
-            'status': result.status.value,
-            'success': result.success,
-            'title': result.title,
-            'description': result.description,
-            'article_count': result.article_count,
-            'last_updated': result.last_updated.isoformat() if result.last_updated else None,
-            'error_message': result.error_message,
-            'warnings': result.warnings,
-            'metadata': result.metadata,
-            'test_duration': result.test_duration,
-            'sample_articles': result.sample_articles,
-            'tested_at': datetime.utcnow().isoformat()
-        }
-        
-        return jsonify(result_dict), 200
+        return jsonify({**result.to_dict(), 'tested_at': datetime.utcnow()}), 200
         
     except Exception as e:
         logger.error(f"Error testing RSS feed: {e}")
@@ -110,7 +103,7 @@ def test_rss_feed():
 def test_multiple_rss_feeds():
     """Test multiple RSS feeds at once"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'urls' not in data:
             return jsonify({'error': 'URLs list required'}), 400
         
@@ -126,47 +119,51 @@ def test_multiple_rss_feeds():
         config = FeedConfiguration(
             max_articles=config_data.get('max_articles', 5),  # Lower for multiple feeds
             timeout=config_data.get('timeout', 15),  # Lower timeout
-            quality_threshold=config_data.get('quality_threshold', 0.3)
+            quality_threshold=config_data.get('quality_threshold', 0.3),
+            sample_limit=3  # Only three samples per feed are returned
         )
         
         # Test all feeds
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         results = tester.test_multiple_feeds(urls, config)
         
-        # Convert results to dict
+        # Convert results to dict and tally the summary in the same pass
         results_dict = []
+        successful = healthy = warning = error = total_articles = 0
+        total_duration = 0.0
         for result in results:
-            results_dict.append({
-                'url': result.url,
-                'status': result.status.value,
-                'success': result.success,
-                'title': result.title,
-                'description': result.description,
-                'article_count': result.article_count,
-                'last_updated': result.last_updated.isoformat() if result.last_updated else None,
-                'error_message': result.error_message,
-                'warnings': result.warnings,
-                'test_duration': result.test_duration,
-                'sample_articles': result.sample_articles[:3]  # Limit sample articles
-            })
+            status = result.status
+            results_dict.append(result.to_dict(include_metadata=False))
+            
+            if result.success:
+                successful += 1
+            # Enum members are singletons, so identity checks suffice
+            if status is FeedHealthStatus.HEALTHY:
+                healthy += 1
+            elif status is FeedHealthStatus.WARNING:
+                warning += 1
+            elif status is FeedHealthStatus.ERROR:
+                error += 1
+            total_articles += result.article_count
+            total_duration += result.test_duration
         
         # Generate summary
         summary = {
             'total_feeds': len(results),
-            'successful_feeds': sum(1 for r in results if r.success),
-            'failed_feeds': sum(1 for r in results if not r.success),
-            'healthy_feeds': sum(1 for r in results if r.status == FeedHealthStatus.HEALTHY),
-            'warning_feeds': sum(1 for r in results if r.status == FeedHealthStatus.WARNING),
-            'error_feeds': sum(1 for r in results if r.status == FeedHealthStatus.ERROR),
-            'total_articles': sum(r.article_count for r in results),
-            'average_test_duration': sum(r.test_duration for r in results) / len(results)
+            'successful_feeds': successful,
+            'failed_feeds': len(results) - successful,
+            'healthy_feeds': healthy,
+            'warning_feeds': warning,
+            'error_feeds': error,
+            'total_articles': total_articles,
+            'average_test_duration': total_duration / len(results)
         }
         
-        return jsonify({
+        return ojson({
             'results': results_dict,
             'summary': summary,
-            'tested_at': datetime.utcnow().isoformat()
-        }), 200
+            'tested_at': datetime.utcnow()
+        })
         
     except Exception as e:
         logger.error(f"Error testing multiple RSS feeds: {e}")
@@ -178,10 +175,10 @@ def validate_rss_feed():
     """Validate RSS feed before saving"""
     try:
         # Validate input
-        if not validate_json_schema(request.json, FEED_TEST_SCHEMA):
+        data = request.get_json(silent=True)
+        if not validate_json_schema(data, FEED_TEST_VALIDATOR):
             return jsonify({'error': 'Invalid request data'}), 400
         
-        data = request.json
         url = data['url']
         
         # Create configuration
@@ -193,7 +190,7 @@ def validate_rss_feed():
         )
         
         # Validate the feed
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         is_valid, error_message, metadata = tester.validate_feed_before_save(url, config)
         
         if is_valid:
@@ -218,30 +215,29 @@ def validate_rss_feed():
 def suggest_rss_feeds():
     """Get RSS feed suggestions from website URL"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'url' not in data:
             return jsonify({'error': 'Website URL required'}), 400
         
         url = data['url']
         
         # Get suggestions
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         suggestions = tester.get_feed_suggestions(url)
         
         # Test suggestions to see which ones work
         if data.get('test_suggestions', False):
             config = FeedConfiguration(max_articles=3, timeout=10)
-            tested_suggestions = []
+            candidates = suggestions[:5]  # Test only first 5 suggestions
+            results = tester.test_multiple_feeds(candidates, config, max_workers=5)
             
-            for suggestion in suggestions[:5]:  # Test only first 5 suggestions
-                result = tester.test_feed(suggestion, config)
-                tested_suggestions.append({
-                    'url': suggestion,
-                    'success': result.success,
-                    'title': result.title,
-                    'article_count': result.article_count,
-                    'status': result.status.value
-                })
+            tested_suggestions = [{
+                'url': suggestion,
+                'success': result.success,
+                'title': result.title,
+                'article_count': result.article_count,
+                'status': result.status.value
+            } for suggestion, result in zip(candidates, results)]
             
             return jsonify({
                 'suggestions': tested_suggestions,
@@ -263,8 +259,7 @@ def check_feed_health():
     """Check health of configured RSS feeds"""
     try:
         # Get configured feeds from settings
-        from config.settings import Config
-        feeds = getattr(Config, 'RSS_FEEDS', [])
+        feeds = Config.RSS_FEEDS
         
         if not feeds:
             return jsonify({
@@ -278,36 +273,49 @@ def check_feed_health():
                 }
             }), 200
         
-        # Check health of all feeds
-        aggregator = NewsAggregator()
-        health_status = aggregator.get_feed_health()
+        # Probing every feed is slow, so polls within the TTL share one check
+        health = get_or_set_json(FEED_HEALTH_CACHE_KEY, FEED_HEALTH_CACHE_TTL,
+                                 lambda: _check_feeds(feeds))
         
-        # Format response
-        feed_details = []
-        for feed_url in feeds:
-            status = health_status['feed_status'].get(feed_url, 'unknown')
-            feed_details.append({
-                'url': feed_url,
-                'status': 'healthy' if status == 'healthy' else 'error',
-                'details': status
-            })
+        # The body only changes when a new check runs
+        etag = hashlib.sha1(health['checked_at'].encode()).hexdigest()
+        if etag_matches(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = ojson(health)
         
-        return jsonify({
-            'feeds': feed_details,
-            'summary': {
-                'total': len(feeds),
-                'healthy': health_status['healthy_feeds'],
-                'error': health_status['unhealthy_feeds'],
-                'warning': 0
-            },
-            'checked_at': datetime.utcnow().isoformat()
-        }), 200
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         logger.error(f"Error checking feed health: {e}")
         return jsonify({'error': 'Failed to check feed health'}), 500
 
 
+def _check_feeds(feeds):
+    """Probe the configured feeds and format the health response body"""
+    aggregator = NewsAggregator()
+    health_status = aggregator.get_feed_health()
+    
+    feed_status = health_status['feed_status'].get
+    feed_details = [{
+        'url': feed_url,
+        'status': 'healthy' if (status := feed_status(feed_url, 'unknown')) == 'healthy' else 'error',
+        'details': status
+    } for feed_url in feeds]
+    
+    return {
+        'feeds': feed_details,
+        'summary': {
+            'total': len(feeds),
+            'healthy': health_status['healthy_feeds'],
+            'error': health_status['unhealthy_feeds'],
+            'warning': 0
+        },
+        'checked_at': datetime.utcnow().isoformat()
+    }
+
+
 @rss_feeds_bp.route('/config/schema', methods=['GET'])
 def get_config_schema():
     """Get RSS feed configuration schema"""
@@ -362,7 +370,7 @@ def get_config_schema():
 def quick_test_rss_feed():
     """Quick test of RSS feed (minimal validation)"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'url' not in data:
             return jsonify({'error': 'URL required'}), 400
         
@@ -376,7 +384,7 @@ def quick_test_rss_feed():
         )
         
         # Test the feed
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         result = tester.test_feed(url, config)
         
         # Return minimal response
@@ -399,7 +407,7 @@ def quick_test_rss_feed():
 def preview_rss_feed():
     """Preview RSS feed content"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         if not data or 'url' not in data:
             return jsonify({'error': 'URL required'}), 400
         
@@ -415,7 +423,7 @@ def preview_rss_feed():
         )
         
         # Test the feed
-        tester = RSSFeedTester()
+        tester = get_feed_tester()
         result = tester.test_feed(url, config)
         
         if not result.success:
@@ -424,20 +432,26 @@ def preview_rss_feed():
                 'url': url
             }), 400
         
-        # Return preview data
-        return jsonify({
+        # Reject a feed with nothing to preview before the 200 goes out
+        if not result.sample_articles:
+            return jsonify({
+                'error': 'No articles could be extracted from feed',
+                'url': url
+            }), 400
+        
+        # Extracted article bodies make previews large, so encode them one at a time
+        return stream_ojson('articles', result.sample_articles, lambda: {
             'url': url,
             'title': result.title,
             'description': result.description,
             'article_count': result.article_count,
-            'last_updated': result.last_updated.isoformat() if result.last_updated else None,
-            'articles': result.sample_articles,
+            'last_updated': result.last_updated,
             'metadata': {
                 'feed_format': result.metadata.get('feed_format'),
                 'language': result.metadata.get('language'),
                 'generator': result.metadata.get('generator')
             }
-        }), 200
+        })
         
     except Exception as e:
         logger.error(f"Error previewing RSS feed: {e}")
@@ -3,13 +3,20 @@ Kindle sync API endpoints
 Handles synchronization between the server and Kindle devices
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from datetime import datetime, timedelta
 import logging
+import uuid
+
+from sqlalchemy import tuple_
 
 from models import db, Book, SyncLog
 from services.kindle_sync import KindleSyncService
+from services.sync_tasks import submit_batch_sync, submit_book_sync, submit_news_digest_sync
 from utils.file_handler import FileHandler
+from utils.pagination import fetch_page
+from utils.responses import ojson
+from utils.validation import QueryParamError, is_kindle_email, parse_int_arg
 
 sync_bp = Blueprint('sync', __name__)
 logger = logging.getLogger(__name__)
@@ -44,13 +51,14 @@ def sync_book(book_id):
     """Sync a specific book to Kindle"""
     try:
         # Validate request data
-        if not request.json or 'kindle_email' not in request.json:
+        data = request.get_json(silent=True) or {}
+        if 'kindle_email' not in data:
             return jsonify({'error': 'kindle_email is required'}), 400
         
-        kindle_email = request.json['kindle_email']
+        kindle_email = data['kindle_email']
         
         # Validate email format
-        if not kindle_email.endswith('@kindle.com'):
+        if not is_kindle_email(kindle_email):
             return jsonify({'error': 'Invalid Kindle email format'}), 400
         
         # Get book
@@ -71,22 +79,15 @@ def sync_book(book_id):
             ip_address=request.remote_addr
         )
         
-        # Start sync operation
-        sync_service = KindleSyncService()
-        success = sync_service.sync_book_to_kindle(book, kindle_email, sync_log)
+        # Deliver in the background; the sync log tracks progress
+        submit_book_sync(current_app._get_current_object(), book.id, kindle_email, sync_log.id)
         
-        if success:
-            book.mark_synced()
-            return jsonify({
-                'message': 'Book sync initiated successfully',
-                'sync_log_id': str(sync_log.id),
-                'book_id': str(book.id)
-            }), 200
-        else:
-            return jsonify({
-                'error': 'Failed to initiate book sync',
-                'sync_log_id': str(sync_log.id)
-            }), 500
+        return jsonify({
+            'message': 'Book sync initiated successfully',
+            'sync_log_id': str(sync_log.id),
+            'book_id': str(book.id),
+            'status_url': _sync_log_url(sync_log)
+        }), 202
             
     except Exception as e:
         logger.error(f"Error syncing book {book_id}: {e}")
@@ -97,16 +98,17 @@ def sync_news_digest():
     """Create and sync news digest to Kindle"""
     try:
         # Validate request data
-        if not request.json or 'kindle_email' not in request.json:
+        data = request.get_json(silent=True) or {}
+        if 'kindle_email' not in data:
             return jsonify({'error': 'kindle_email is required'}), 400
         
-        kindle_email = request.json['kindle_email']
-        digest_title = request.json.get('title', f'News Digest - {datetime.now().strftime("%Y-%m-%d")}')
-        max_articles = request.json.get('max_articles', 20)
-        min_quality = request.json.get('min_quality', 0.5)
+        kindle_email = data['kindle_email']
+        digest_title = data.get('title', f'News Digest - {datetime.now().strftime("%Y-%m-%d")}')
+        max_articles = data.get('max_articles', 20)
+        min_quality = data.get('min_quality', 0.5)
         
         # Validate email format
-        if not kindle_email.endswith('@kindle.com'):
+        if not is_kindle_email(kindle_email):
             return jsonify({'error': 'Invalid Kindle email format'}), 400
         
         # Generate digest ID
@@ -127,23 +129,18 @@ def sync_news_digest():
             ip_address=request.remote_addr
         )
         
-        # Start news digest sync
-        sync_service = KindleSyncService()
-        success = sync_service.sync_news_digest_to_kindle(
-            kindle_email, digest_title, max_articles, min_quality, sync_log
+        # Build and deliver in the background; the sync log tracks progress
+        submit_news_digest_sync(
+            current_app._get_current_object(), kindle_email, digest_title,
+            max_articles, min_quality, sync_log.id
         )
         
-        if success:
-            return jsonify({
-                'message': 'News digest sync initiated successfully',
-                'sync_log_id': str(sync_log.id),
-                'digest_id': digest_id
-            }), 200
-        else:
-            return jsonify({
-                'error': 'Failed to initiate news digest sync',
-                'sync_log_id': str(sync_log.id)
-            }), 500
+        return jsonify({
+            'message': 'News digest sync initiated successfully',
+            'sync_log_id': str(sync_log.id),
+            'digest_id': digest_id,
+            'status_url': _sync_log_url(sync_log)
+        }), 202
             
     except Exception as e:
         logger.error(f"Error syncing news digest: {e}")
@@ -154,14 +151,15 @@ def sync_batch():
     """Sync multiple books to Kindle"""
     try:
         # Validate request data
-        if not request.json or 'kindle_email' not in request.json or 'book_ids' not in request.json:
+        data = request.get_json(silent=True) or {}
+        if 'kindle_email' not in data or 'book_ids' not in data:
             return jsonify({'error': 'kindle_email and book_ids are required'}), 400
         
-        kindle_email = request.json['kindle_email']
-        book_ids = request.json['book_ids']
+        kindle_email = data['kindle_email']
+        book_ids = data['book_ids']
         
         # Validate email format
-        if not kindle_email.endswith('@kindle.com'):
+        if not is_kindle_email(kindle_email):
             return jsonify({'error': 'Invalid Kindle email format'}), 400
         
         # Validate book IDs
@@ -185,46 +183,35 @@ def sync_batch():
                 'unavailable_books': [str(book.id) for book in unavailable_books]
             }), 400
         
-        # Start batch sync
-        sync_service = KindleSyncService()
-        sync_results = []
-        
-        for book in books:
-            # Create sync log for each book
-            sync_log = SyncLog.create_sync_log(
-                operation_type='batch_book_sync',
-                kindle_email=kindle_email,
-                book_id=book.id,
-                file_name=f"{book.title}.{book.format.lower()}",
-                file_size=book.file_size,
-                user_agent=request.headers.get('User-Agent'),
-                ip_address=request.remote_addr
-            )
-            
-            # Sync book
-            success = sync_service.sync_book_to_kindle(book, kindle_email, sync_log)
-            
-            sync_results.append({
-                'book_id': str(book.id),
-                'sync_log_id': str(sync_log.id),
-                'success': success
-            })
-            
-            if success:
-                book.mark_synced()
-        
-        successful_syncs = [r for r in sync_results if r['success']]
-        failed_syncs = [r for r in sync_results if not r['success']]
+        # Create a sync log for each book with one commit
+        user_agent = request.headers.get('User-Agent')
+        sync_logs = SyncLog.create_sync_logs([{
+            'operation_type': 'batch_book_sync',
+            'kindle_email': kindle_email,
+            'book_id': book.id,
+            'file_name': f"{book.title}.{book.format.lower()}",
+            'file_size': book.file_size,
+            'user_agent': user_agent,
+            'ip_address': request.remote_addr
+        } for book in books])
+        
+        # Deliver in the background; each book's sync log tracks its progress
+        submit_batch_sync(
+            current_app._get_current_object(),
+            [book.id for book in books], kindle_email, [sync_log.id for sync_log in sync_logs]
+        )
         
         return jsonify({
-            'message': f'Batch sync completed: {len(successful_syncs)} successful, {len(failed_syncs)} failed',
-            'results': sync_results,
+            'message': f'Batch sync initiated for {len(books)} books',
+            'results': [{
+                'book_id': str(book.id),
+                'sync_log_id': str(sync_log.id),
+                'status_url': _sync_log_url(sync_log)
+            } for book, sync_log in zip(books, sync_logs)],
             'summary': {
-                'total': len(books),
-                'successful': len(successful_syncs),
-                'failed': len(failed_syncs)
+                'total': len(books)
             }
-        }), 200
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in batch sync: {e}")
@@ -238,8 +225,9 @@ def get_sync_logs():
         kindle_email = request.args.get('kindle_email')
         operation_type = request.args.get('operation_type')
         status = request.args.get('status')
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
-        offset = int(request.args.get('offset', 0))
+        limit = parse_int_arg(request.args, 'limit', 50, minimum=1, maximum=100)  # Max 100
+        offset = parse_int_arg(request.args, 'offset', 0, minimum=0)
+        cursor = request.args.get('cursor')
         
         # Build query
         query = SyncLog.query
@@ -253,27 +241,54 @@ def get_sync_logs():
         if status:
             query = query.filter(SyncLog.status == status)
         
-        # Get logs with pagination
-        logs = query.order_by(SyncLog.created_at.desc())\
-                   .offset(offset).limit(limit).all()
+        # id breaks created_at ties so keyset pages never skip or repeat a log
+        query = query.order_by(SyncLog.created_at.desc(), SyncLog.id.desc())
         
-        # Get total count for pagination
-        total_count = query.count()
+        if cursor:
+            # Keyset page: seek past the cursor instead of scanning OFFSET rows
+            created_at, log_id = _parse_log_cursor(cursor)
+            query = query.filter(tuple_(SyncLog.created_at, SyncLog.id) < (created_at, log_id))
+            logs, total_count, has_more = fetch_page(query, 0, limit)
+            offset = None
+        else:
+            # Page and total come back from one statement
+            rows, total_count, has_more = fetch_page(query, offset, limit, with_total=True)
+            logs = [row.SyncLog for row in rows]
         
-        return jsonify({
+        return ojson({
             'logs': [log.to_dict() for log in logs],
             'pagination': {
                 'total': total_count,
                 'limit': limit,
                 'offset': offset,
-                'has_more': offset + limit < total_count
+                'has_more': has_more,
+                'next_cursor': _log_cursor(logs[-1]) if has_more else None
             }
-        }), 200
+        })
+        
+    except QueryParamError as e:
+        return jsonify({'error': str(e)}), 400
         
     except Exception as e:
         logger.error(f"Error getting sync logs: {e}")
         return jsonify({'error': 'Failed to get sync logs'}), 500
 
+def _sync_log_url(sync_log):
+    """URL clients poll for the outcome of a background sync"""
+    return url_for('sync.get_sync_log', log_id=str(sync_log.id))
+
+def _log_cursor(sync_log):
+    """Keyset cursor pointing just past a sync log"""
+    return f"{sync_log.created_at.isoformat()}_{sync_log.id}"
+
+def _parse_log_cursor(cursor):
+    """Split a sync log cursor into (created_at, id)"""
+    try:
+        created_at, log_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(log_id)
+    except ValueError:
+        raise QueryParamError('cursor is not a valid sync log cursor')
+
 @sync_bp.route('/logs/<log_id>', methods=['GET'])
 def get_sync_log(log_id):
     """Get specific sync log details"""
@@ -289,26 +304,38 @@ def get_sync_log(log_id):
 def retry_sync(log_id):
     """Retry a failed sync operation"""
     try:
-        sync_log = SyncLog.query.get_or_404(log_id)
+        # Claim the log under a row lock so concurrent retries cannot both pass
+        sync_log = SyncLog.lock_for_retry(log_id)
+        if sync_log is None:
+            db.session.rollback()
+            if db.session.get(SyncLog, log_id) is None:
+                return jsonify({'error': 'Sync log not found'}), 404
+            return jsonify({'error': 'Retry already in progress'}), 409
         
         # Check if sync can be retried
         if not sync_log.can_retry():
+            db.session.rollback()
             return jsonify({
                 'error': f'Sync cannot be retried. Status: {sync_log.status}, Retry count: {sync_log.retry_count}'
             }), 400
         
         # Increment retry count
-        can_retry = sync_log.retry_operation()
+        can_retry = sync_log.retry_operation(commit=False)
         
         if not can_retry:
+            db.session.commit()
             return jsonify({'error': 'Maximum retries exceeded'}), 400
         
+        # Leave the log pending before the lock is released, so a retry
+        # arriving during delivery fails can_retry instead of sending twice
+        sync_log.start_operation()
+        
         # Retry the operation based on type
         sync_service = KindleSyncService()
         
         if sync_log.operation_type in ['book_sync', 'batch_book_sync']:
             if sync_log.book_id:
-                book = Book.query.get(sync_log.book_id)
+                book = sync_log.book
                 if book:
                     success = sync_service.sync_book_to_kindle(book, sync_log.kindle_email, sync_log)
                 else:
@@ -319,7 +346,7 @@ def retry_sync(log_id):
                 success = False
                 
         elif sync_log.operation_type == 'news_digest':
-            metadata = sync_log.metadata or {}
+            metadata = sync_log.sync_metadata or {}
             success = sync_service.sync_news_digest_to_kindle(
                 sync_log.kindle_email,
                 metadata.get('digest_title', 'News Digest'),
@@ -4,32 +4,102 @@ Handles syncing articles from RSS feeds based on frequency and storing them for
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy import and_, or_
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 from sqlalchemy.orm import sessionmaker
 
+from config.settings import Config
 from models import db, NewsItem
 from services.news_aggregator import NewsAggregator
-from services.rss_feed_tester import RSSFeedTester, FeedConfiguration
+from services.rss_feed_tester import FeedConfiguration, get_feed_tester
 
 logger = logging.getLogger(__name__)
 
+_sync_manager: Optional['ArticleSyncManager'] = None
+
+# Time between syncs, and articles fetched per sync, for each sync frequency
+SYNC_INTERVALS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+    'monthly': timedelta(days=30),
+}
+SYNC_MAX_ARTICLES = {
+    'hourly': 5,
+    'daily': 10,
+    'weekly': 20,
+    'monthly': 30,
+}
+
+# A feed that passed validation is trusted for this long before it is re-checked
+FEED_VALIDATION_TTL = 3600
+
+# A failing feed is skipped for 2**n minutes after its nth consecutive failure,
+# capped at 2**8 (about four hours), so dead feeds stop tying up sync workers
+FAILURE_BACKOFF_MAX_EXPONENT = 8
+
+
+def _sync_interval(source: Dict) -> timedelta:
+    """Time between syncs for a source; unknown frequencies default to daily"""
+    return SYNC_INTERVALS.get(source.get('syncFrequency', 'daily'), SYNC_INTERVALS['daily'])
+
+
+def _parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp as naive UTC, like the rest of the server; None if unusable"""
+    if not value:
+        return None
+    try:
+        # Python 3.11+ parses a trailing 'Z' natively
+        parsed = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _utc_iso(value: datetime) -> str:
+    """ISO timestamp with an explicit UTC offset for a naive UTC datetime"""
+    return value.replace(tzinfo=timezone.utc).isoformat()
+
+
+def get_sync_manager() -> 'ArticleSyncManager':
+    """Return the shared ArticleSyncManager, creating it on first use"""
+    global _sync_manager
+    if _sync_manager is None:
+        _sync_manager = ArticleSyncManager()
+    return _sync_manager
+
 
 class ArticleSyncManager:
     """Manages article syncing from RSS feeds with frequency control"""
     
     def __init__(self):
-        self.aggregator = NewsAggregator()
-        self.tester = RSSFeedTester()
+        self.tester = get_feed_tester()
+        # Validation and download hit the same feed URLs; sharing the tester's
+        # connection pool means the download reuses the connection validation
+        # just opened, while each service still sends its own User-Agent
+        self.aggregator = NewsAggregator(adapter=self.tester.session.get_adapter('https://'))
+        self._validated_at: Dict[str, float] = {}
+        self._validated_lock = threading.Lock()
+        # Feed URL -> (consecutive failures, monotonic time it may be retried)
+        self._failures: Dict[str, Tuple[int, float]] = {}
+        self._failures_lock = threading.Lock()
     
-    def should_sync_source(self, source: Dict, force: bool = False) -> bool:
+    def should_sync_source(self, source: Dict, force: bool = False,
+                           now: Optional[datetime] = None) -> bool:
         """
         Determine if a news source should be synced based on frequency and last sync
         
         Args:
             source: News source dictionary with sync frequency and last sync info
             force: If True, sync regardless of frequency
+            now: Current UTC time, so callers checking many sources read the clock once
             
         Returns:
             True if source should be synced
@@ -40,60 +110,108 @@ class ArticleSyncManager:
         if not source.get('isActive', True):
             return False
         
+        if self._backing_off(source.get('url')):
+            return False
+        
+        now = now or datetime.utcnow()
+        
+        # The stored next due time was computed from the frequency at the last
+        # sync; if the frequency has been shortened since, the earlier time wins
+        due_times = []
+        next_sync_due = _parse_utc(source.get('nextSyncDue'))
+        if next_sync_due is not None:
+            due_times.append(next_sync_due)
+        
         last_sync = source.get('lastSync')
-        if not last_sync:
-            return True  # Never synced before
+        if last_sync:
+            last_sync_dt = _parse_utc(last_sync)
+            if last_sync_dt is None:
+                return True  # Invalid last sync date, sync anyway
+            due_times.append(last_sync_dt + _sync_interval(source))
         
-        try:
-            last_sync_dt = datetime.fromisoformat(last_sync.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            return True  # Invalid last sync date, sync anyway
+        if not due_times:
+            return True  # Never synced before
         
+        return now >= min(due_times)
+    
+    def has_any_due_sources(self, sources: List[Dict]) -> bool:
+        """Check whether any source is due, stopping at the first one that is"""
         now = datetime.utcnow()
-        frequency = source.get('syncFrequency', 'daily')
-        
-        # Calculate next sync time based on frequency
-        if frequency == 'hourly':
-            next_sync = last_sync_dt + timedelta(hours=1)
-        elif frequency == 'daily':
-            next_sync = last_sync_dt + timedelta(days=1)
-        elif frequency == 'weekly':
-            next_sync = last_sync_dt + timedelta(weeks=1)
-        elif frequency == 'monthly':
-            next_sync = last_sync_dt + timedelta(days=30)
-        else:
-            next_sync = last_sync_dt + timedelta(days=1)  # Default to daily
-        
-        return now >= next_sync
+        return any(self.should_sync_source(source, now=now) for source in sources)
+    
+    def _default_config(self, source: Dict) -> FeedConfiguration:
+        """Build the feed configuration for a source based on its sync frequency"""
+        # Unknown frequencies get the monthly allowance
+        max_articles = SYNC_MAX_ARTICLES.get(source.get('syncFrequency', 'daily'), SYNC_MAX_ARTICLES['monthly'])
+        
+        return FeedConfiguration(
+            max_articles=max_articles,
+            timeout=30,
+            quality_threshold=0.3
+        )
+    
+    def _fetch_source(self, source: Dict, config: FeedConfiguration) -> Tuple[Any, Optional[str]]:
+        """
+        Validate and download a source's feed
+        
+        Feeds that passed validation within FEED_VALIDATION_TTL are only
+        downloaded once; validation is repeated after the TTL or a failure.
+        
+        Network only, so it is safe to run on a worker thread.
+        
+        Args:
+            source: News source dictionary
+            config: RSS feed configuration
+            
+        Returns:
+            Tuple of (parsed feed, error message)
+        """
+        url = source['url']
+        
+        # Validation downloads the feed too, so skip it for recently validated feeds
+        with self._validated_lock:
+            validated_at = self._validated_at.get(url)
+        
+        if validated_at is None or time.monotonic() - validated_at > FEED_VALIDATION_TTL:
+            is_valid, error_message, metadata = self.tester.validate_feed_before_save(url, config)
+            
+            if not is_valid:
+                with self._validated_lock:
+                    self._validated_at.pop(url, None)
+                return None, f"Feed validation failed: {error_message}"
+            
+            with self._validated_lock:
+                self._validated_at[url] = time.monotonic()
+        
+        try:
+            return self.aggregator.fetch_feed(url), None
+        except Exception:
+            # Make the next cycle re-validate a feed that stopped responding
+            with self._validated_lock:
+                self._validated_at.pop(url, None)
+            raise
     
-    def sync_source_articles(self, source: Dict, config: FeedConfiguration = None) -> Dict:
+    def sync_source_articles(self, source: Dict, config: FeedConfiguration = None,
+                             prefetched: Optional[Future] = None,
+                             mark_for_kindle: bool = True,
+                             now: Optional[datetime] = None) -> Dict:
         """
         Sync articles from a single news source
         
         Args:
             source: News source dictionary
             config: Optional RSS feed configuration
+            prefetched: Optional future resolving to the _fetch_source result
+            mark_for_kindle: If False, leave marking articles for Kindle sync
+                to the caller, which can batch it across sources
+            now: Sync timestamp; a cycle passes its start so every source shares it
             
         Returns:
             Dictionary with sync results
         """
         if config is None:
             # Default configuration based on frequency
-            frequency = source.get('syncFrequency', 'daily')
-            if frequency == 'hourly':
-                max_articles = 5
-            elif frequency == 'daily':
-                max_articles = 10
-            elif frequency == 'weekly':
-                max_articles = 20
-            else:  # monthly
-                max_articles = 30
-            
-            config = FeedConfiguration(
-                max_articles=max_articles,
-                timeout=30,
-                quality_threshold=0.3
-            )
+            config = self._default_config(source)
         
         result = {
             'source_id': source.get('id'),
@@ -105,26 +223,31 @@ class ArticleSyncManager:
             'articles_total': 0,
             'error_message': None,
             'sync_duration': 0,
-            'last_sync': None
+            'last_sync': None,
+            'next_sync_due': None
         }
         
-        start_time = datetime.utcnow()
+        start_time = now or datetime.utcnow()
+        # Durations come from the monotonic clock, which wall-clock jumps can't skew
+        started = time.monotonic()
         
         try:
-            # Validate feed first
-            is_valid, error_message, metadata = self.tester.validate_feed_before_save(
-                source['url'], config
-            )
+            # Validate and fetch the feed, unless that already ran concurrently
+            if prefetched is not None:
+                feed, error_message = prefetched.result()
+            else:
+                feed, error_message = self._fetch_source(source, config)
             
-            if not is_valid:
-                result['error_message'] = f"Feed validation failed: {error_message}"
+            if error_message:
+                result['error_message'] = error_message
                 return result
             
             # Sync articles from this feed
             sync_result = self.aggregator.aggregate_feed(
                 source['url'], 
                 force_refresh=True, 
-                max_articles=config.max_articles
+                max_articles=config.max_articles,
+                feed=feed
             )
             
             result.update({
@@ -132,25 +255,50 @@ class ArticleSyncManager:
                 'articles_added': sync_result['articles_added'],
                 'articles_updated': sync_result['articles_updated'],
                 'articles_total': sync_result['articles_found'],
-                'last_sync': start_time.isoformat()
+                'last_sync': _utc_iso(start_time),
+                # Stored on the source as nextSyncDue for the next due check
+                'next_sync_due': _utc_iso(start_time + _sync_interval(source))
             })
             
-            # Mark articles for kindle sync
-            self._mark_articles_for_kindle_sync(source, start_time)
+            if mark_for_kindle:
+                self._mark_articles_for_kindle_sync([source.get('name')], start_time)
             
         except Exception as e:
             logger.error(f"Error syncing source {source.get('name', 'Unknown')}: {e}")
             result['error_message'] = str(e)
         
         finally:
-            result['sync_duration'] = (datetime.utcnow() - start_time).total_seconds()
+            result['sync_duration'] = time.monotonic() - started
+            self._record_sync_outcome(source.get('url'), result['success'])
         
         return result
     
+    def _backing_off(self, url: Optional[str]) -> bool:
+        """Check whether a feed is still waiting out its failure backoff"""
+        with self._failures_lock:
+            failure = self._failures.get(url)
+        return failure is not None and time.monotonic() < failure[1]
+    
+    def _record_sync_outcome(self, url: Optional[str], success: bool):
+        """Reset a feed's failure backoff on success, or lengthen it on failure"""
+        with self._failures_lock:
+            if success:
+                self._failures.pop(url, None)
+                return
+            
+            failures = self._failures.get(url, (0, 0.0))[0] + 1
+            backoff = 60 * 2 ** min(failures, FAILURE_BACKOFF_MAX_EXPONENT)
+            self._failures[url] = (failures, time.monotonic() + backoff)
+        
+        logger.warning(f"Feed {url} failed {failures} time(s) in a row; skipping it for {backoff // 60} minutes")
+    
     def sync_all_due_sources(self, sources: List[Dict], force: bool = False) -> Dict:
         """
         Sync all news sources that are due for syncing
         
+        Collects iter_due_source_syncs into one summary; callers that only
+        need the per-source results as they arrive can iterate that instead.
+        
         Args:
             sources: List of news source dictionaries
             force: If True, sync all sources regardless of frequency
@@ -158,6 +306,8 @@ class ArticleSyncManager:
         Returns:
             Dictionary with overall sync results
         """
+        start_time = datetime.utcnow()
+        started = time.monotonic()
         overall_result = {
             'total_sources': len(sources),
             'sources_synced': 0,
@@ -166,54 +316,114 @@ class ArticleSyncManager:
             'total_articles_added': 0,
             'total_articles_updated': 0,
             'sync_results': [],
-            'started_at': datetime.utcnow().isoformat(),
+            'started_at': start_time.isoformat(),
             'completed_at': None,
             'duration': 0
         }
         
-        start_time = datetime.utcnow()
+        for sync_result in self.iter_due_source_syncs(sources, force, now=start_time):
+            overall_result['sync_results'].append(sync_result)
+            
+            if sync_result['success']:
+                overall_result['sources_synced'] += 1
+                overall_result['total_articles_added'] += sync_result['articles_added']
+                overall_result['total_articles_updated'] += sync_result['articles_updated']
+            else:
+                overall_result['sources_failed'] += 1
+        
+        # Sources that were not due produce no result
+        overall_result['sources_skipped'] = len(sources) - len(overall_result['sync_results'])
+        
+        overall_result['completed_at'] = datetime.utcnow().isoformat()
+        overall_result['duration'] = time.monotonic() - started
+        
+        return overall_result
+    
+    def iter_due_source_syncs(self, sources: List[Dict], force: bool = False,
+                              now: Optional[datetime] = None) -> Iterator[Dict]:
+        """
+        Sync the due news sources, yielding each source's result as it completes
+        
+        Feeds are fetched concurrently on a thread pool; database writes
+        stay on the calling thread, which owns the session. Sources that are
+        not due are skipped without a result. Once every source has been
+        yielded, the synced sources' articles are marked for Kindle sync in
+        one UPDATE and commit.
         
+        Args:
+            sources: List of news source dictionaries
+            force: If True, sync all sources regardless of frequency
+            now: Current UTC time used for the due checks
+            
+        Yields:
+            Result dictionary for each source that was due or failed its check
+        """
+        now = now or datetime.utcnow()
+        
+        due = []
         for source in sources:
             try:
-                if not self.should_sync_source(source, force):
-                    overall_result['sources_skipped'] += 1
-                    continue
-                
-                logger.info(f"Syncing source: {source.get('name', 'Unknown')}")
-                sync_result = self.sync_source_articles(source)
-                overall_result['sync_results'].append(sync_result)
+                if self.should_sync_source(source, force, now=now):
+                    due.append((source, self._default_config(source)))
+                    
+            except Exception as e:
+                yield self._source_failure(source, e)
+        
+        if not due:
+            return
+        
+        synced_names = []
+        with ThreadPoolExecutor(max_workers=min(Config.RSS_SYNC_MAX_WORKERS, len(due))) as executor:
+            fetches = {
+                executor.submit(self._fetch_source, source, config): (source, config)
+                for source, config in due
+            }
+            
+            # Store each feed as soon as its fetch lands, so a slow feed
+            # does not hold up writes for the ones already downloaded
+            for fetch in as_completed(fetches):
+                source, config = fetches[fetch]
+                try:
+                    logger.info(f"Syncing source: {source.get('name', 'Unknown')}")
+                    sync_result = self.sync_source_articles(
+                        source, config, prefetched=fetch, mark_for_kindle=False, now=now
+                    )
+                    
+                except Exception as e:
+                    sync_result = self._source_failure(source, e)
                 
                 if sync_result['success']:
-                    overall_result['sources_synced'] += 1
-                    overall_result['total_articles_added'] += sync_result['articles_added']
-                    overall_result['total_articles_updated'] += sync_result['articles_updated']
-                else:
-                    overall_result['sources_failed'] += 1
+                    synced_names.append(source.get('name'))
                 
-            except Exception as e:
-                logger.error(f"Error processing source {source.get('name', 'Unknown')}: {e}")
-                overall_result['sources_failed'] += 1
-                overall_result['sync_results'].append({
-                    'source_id': source.get('id'),
-                    'source_name': source.get('name'),
-                    'success': False,
-                    'error_message': str(e)
-                })
-        
-        overall_result['completed_at'] = datetime.utcnow().isoformat()
-        overall_result['duration'] = (datetime.utcnow() - start_time).total_seconds()
+                yield sync_result
         
-        return overall_result
+        if synced_names:
+            self._mark_articles_for_kindle_sync(synced_names, now)
+    
+    def _source_failure(self, source: Dict, error: Exception) -> Dict:
+        """Result for a source that failed outside sync_source_articles"""
+        logger.error(f"Error processing source {source.get('name', 'Unknown')}: {error}")
+        return {
+            'source_id': source.get('id'),
+            'source_name': source.get('name'),
+            'success': False,
+            'error_message': str(error)
+        }
     
-    def get_articles_for_kindle_sync(self, hours: int = 24) -> List[Dict]:
+    def get_articles_for_kindle_sync(self, hours: int = 24,
+                                     sources: Optional[List[str]] = None,
+                                     per_source_limit: Optional[int] = None) -> List[Dict]:
         """
         Get articles that should be synced to Kindle devices
         
         Args:
             hours: Number of hours to look back for recent articles
+            sources: Optional list of source names to restrict the result to
+            per_source_limit: Optional cap on the newest articles returned per
+                source; article_count still reports the source's full total
             
         Returns:
-            List of article dictionaries grouped by source
+            List of article dictionaries grouped by source, largest source first
         """
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
@@ -221,76 +431,97 @@ class ArticleSyncManager:
         # 1. Included in EPUB (marked for sync)
         # 2. Recent (within specified hours)
         # 3. Good quality
-        articles = NewsItem.query.filter(
-            and_(
-                NewsItem.epub_included == True,
-                NewsItem.published_at >= cutoff_time,
-                NewsItem.quality_score >= 0.3
+        # One round-trip for every source, fetching only the rendered columns;
+        # window functions count and rank each source's articles in the database
+        columns = [
+            NewsItem.id,
+            NewsItem.title,
+            NewsItem.author,
+            NewsItem.published_at,
+            NewsItem.word_count,
+            NewsItem.reading_time,
+            NewsItem.quality_score,
+            # Shorten long summaries in SQL, ellipsis included, so rows need no fixing up
+            db.case(
+                (db.func.length(NewsItem.summary) > 200,
+                 db.func.substr(NewsItem.summary, 1, 200, type_=db.Text).concat('...')),
+                else_=NewsItem.summary
+            ).label('summary'),
+            NewsItem.category,
+            NewsItem.source_url,
+            NewsItem.source_name,
+            db.func.count().over(partition_by=NewsItem.source_name).label('source_count')
+        ]
+        if per_source_limit is not None:
+            columns.append(db.func.row_number().over(
+                partition_by=NewsItem.source_name,
+                order_by=NewsItem.published_at.desc()
+            ).label('source_rank'))
+        
+        query = db.session.query(*columns).filter(
+            NewsItem.epub_included == True,
+            NewsItem.published_at >= cutoff_time,
+            NewsItem.quality_score >= 0.3
+        )
+        
+        if sources:
+            query = query.filter(NewsItem.source_name.in_(sources))
+        
+        ranked = query.subquery()
+        query = db.session.query(ranked)
+        if per_source_limit is not None:
+            query = query.filter(ranked.c.source_rank <= per_source_limit)
+        
+        # Stream rows in batches, largest source first; only the output dicts are held in memory
+        articles = query.order_by(
+            ranked.c.source_count.desc(),
+            ranked.c.source_name.asc(),
+            ranked.c.published_at.desc()
+        ).yield_per(500)
+        
+        # Rows arrive ordered by source, so each group is contiguous
+        return [
+            {
+                'source_name': source_name,
+                'article_count': source_count,
+                'articles': [
+                    {
+                        'id': str(article.id),
+                        'title': article.title,
+                        'author': article.author,
+                        'published_at': article.published_at,
+                        'word_count': article.word_count,
+                        'reading_time': article.reading_time,
+                        'quality_score': article.quality_score,
+                        'summary': article.summary,
+                        'category': article.category,
+                        'source_url': article.source_url
+                    }
+                    for article in rows
+                ]
+            }
+            for (source_name, source_count), rows in groupby(
+                articles, key=attrgetter('source_name', 'source_count')
             )
-        ).order_by(
-            NewsItem.source_name.asc(),
-            NewsItem.published_at.desc()
-        ).all()
-        
-        # Group articles by source
-        grouped_articles = {}
-        for article in articles:
-            source_name = article.source_name
-            if source_name not in grouped_articles:
-                grouped_articles[source_name] = {
-                    'source_name': source_name,
-                    'article_count': 0,
-                    'articles': []
-                }
-            
-            grouped_articles[source_name]['articles'].append({
-                'id': str(article.id),
-                'title': article.title,
-                'author': article.author,
-                'published_at': article.published_at.isoformat(),
-                'word_count': article.word_count,
-                'reading_time': article.reading_time,
-                'quality_score': article.quality_score,
-                'summary': article.summary[:200] + '...' if article.summary and len(article.summary) > 200 else article.summary,
-                'category': article.category,
-                'source_url': article.source_url
-            })
-            grouped_articles[source_name]['article_count'] += 1
-        
-        # Convert to list and sort by article count (most articles first)
-        result = list(grouped_articles.values())
-        result.sort(key=lambda x: x['article_count'], reverse=True)
-        
-        return result
+        ]
     
-    def _mark_articles_for_kindle_sync(self, source: Dict, sync_time: datetime):
+    def _mark_articles_for_kindle_sync(self, source_names: List[str], sync_time: datetime):
         """
-        Mark recently synced articles from this source for Kindle sync
+        Mark recently synced articles from these sources for Kindle sync
         
         Args:
-            source: News source dictionary
-            sync_time: Time when sync started
+            source_names: Names of the synced news sources
+            sync_time: Time when the earliest of their syncs started
         """
         try:
             # Mark articles from the last hour as ready for sync
             cutoff_time = sync_time - timedelta(hours=1)
             
-            articles_to_sync = NewsItem.query.filter(
-                and_(
-                    NewsItem.source_name == source.get('name'),
-                    NewsItem.created_at >= cutoff_time,
-                    NewsItem.quality_score >= 0.3,
-                    NewsItem.epub_included == False
-                )
-            ).all()
-            
-            for article in articles_to_sync:
-                article.include_in_epub()
-            
+            marked_ids = NewsItem.include_recent_from_sources(source_names, cutoff_time)
             db.session.commit()
             
-            if articles_to_sync:
-                logger.info(f"Marked {len(articles_to_sync)} articles from {source.get('name')} for Kindle sync")
+            if marked_ids:
+                logger.info(f"Marked {len(marked_ids)} articles from {len(source_names)} sources for Kindle sync")
                 
         except Exception as e:
             logger.error(f"Error marking articles for sync: {e}")
@@ -305,16 +536,15 @@ class ArticleSyncManager:
         """
         now = datetime.utcnow()
         
-        # Articles synced in last 24 hours
         last_24h = now - timedelta(hours=24)
-        articles_24h = NewsItem.query.filter(
-            NewsItem.created_at >= last_24h
-        ).count()
         
-        # Articles marked for Kindle sync
-        articles_for_sync = NewsItem.query.filter(
-            NewsItem.epub_included == True
-        ).count()
+        # Scalar aggregates in one pass using FILTER for the conditional counts
+        totals = db.session.query(
+            db.func.count(NewsItem.id).label('total_articles'),
+            db.func.count(NewsItem.id).filter(NewsItem.created_at >= last_24h).label('articles_24h'),
+            db.func.count(NewsItem.id).filter(NewsItem.epub_included == True).label('articles_for_sync'),
+            db.func.avg(NewsItem.quality_score).label('avg_quality')
+        ).one()
         
         # Articles by source in last 24 hours
         articles_by_source = db.session.query(
@@ -324,20 +554,15 @@ class ArticleSyncManager:
             NewsItem.created_at >= last_24h
         ).group_by(NewsItem.source_name).all()
         
-        # Quality score distribution
-        avg_quality = db.session.query(
-            db.func.avg(NewsItem.quality_score)
-        ).scalar() or 0
-        
         return {
-            'articles_last_24h': articles_24h,
-            'articles_for_kindle_sync': articles_for_sync,
+            'articles_last_24h': totals.articles_24h,
+            'articles_for_kindle_sync': totals.articles_for_sync,
             'articles_by_source': [
                 {'source': source, 'count': count} 
                 for source, count in articles_by_source
             ],
-            'average_quality_score': round(avg_quality, 2),
-            'total_articles': NewsItem.query.count(),
+            'average_quality_score': round(totals.avg_quality or 0, 2),
+            'total_articles': totals.total_articles,
             'sources_with_articles': len(articles_by_source)
         }
     
@@ -354,13 +579,7 @@ class ArticleSyncManager:
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        query = NewsItem.query.filter(NewsItem.created_at < cutoff_date)
-        
-        if keep_epub_included:
-            query = query.filter(NewsItem.epub_included == False)
-        
-        deleted_count = query.delete()
-        db.session.commit()
+        deleted_count = NewsItem.delete_older_than(cutoff_date, keep_epub_included)
         
         logger.info(f"Cleaned up {deleted_count} old articles older than {days} days")
         return deleted_count
\ No newline at end of file
@@ -6,15 +6,16 @@ Handles book file operations, Cloud Storage integration, and metadata management
 import os
 import hashlib
 import logging
-from typing import Optional, Dict, List
+import shutil
+from typing import BinaryIO, Iterator, Optional, Dict, List
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 import mimetypes
 
 # Google Cloud Storage
-from google.cloud import storage
-from google.cloud.exceptions import GoogleCloudError
+from google.cloud.exceptions import GoogleCloudError, NotFound
+from google.cloud.storage import transfer_manager
 
 # Book processing libraries
 import ebooklib
@@ -23,17 +24,69 @@ import PyPDF2
 from PIL import Image
 import zipfile
 
+from sqlalchemy import select
+
 from models import db, Book
 from config.settings import Config
-from utils.file_handler import FileHandler
+from utils.file_handler import FileHandler, get_storage_client
 
 logger = logging.getLogger(__name__)
 
+_book_manager: Optional['BookManager'] = None
+
+# Books above this size are downloaded as concurrent ranged requests; threads
+# share the client, where process workers would have to rebuild it
+CONCURRENT_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024
+CONCURRENT_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CONCURRENT_DOWNLOAD_MAX_WORKERS = 4
+
+# Most operations Cloud Storage accepts in one batch request
+GCS_BATCH_SIZE = 100
+
+def get_book_manager() -> 'BookManager':
+    """Return the shared BookManager, creating its storage client on first use"""
+    global _book_manager
+    if _book_manager is None:
+        _book_manager = BookManager()
+    return _book_manager
+
+class _HashingReader:
+    """
+    Read-through wrapper that SHA-256 hashes a stream as it is consumed
+    
+    Each byte is hashed once even if the reader rewinds, as upload retries
+    do, so the digest matches the file however many times it is re-read.
+    A forward seek past unhashed bytes leaves a gap, and no digest is given.
+    """
+    
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._sha256 = hashlib.sha256()
+        self._gap = False
+        self.size = 0  # Bytes hashed so far
+    
+    def read(self, size: int = -1) -> bytes:
+        position = self._stream.tell()
+        chunk = self._stream.read(size)
+        if position > self.size:
+            self._gap = True
+        elif position + len(chunk) > self.size:
+            self._sha256.update(memoryview(chunk)[self.size - position:])
+            self.size = position + len(chunk)
+        return chunk
+    
+    def hexdigest(self) -> Optional[str]:
+        """Digest of the bytes read, or None if reads skipped over any"""
+        return None if self._gap else self._sha256.hexdigest()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
 class BookManager:
     """Service for managing book files and metadata"""
     
     def __init__(self):
-        self.storage_client = storage.Client()
+        self.storage_client = get_storage_client()
         self.bucket_name = Config.GCS_BUCKET_NAME
         self.bucket = self.storage_client.bucket(self.bucket_name)
         self.file_handler = FileHandler()
@@ -86,29 +139,38 @@ class BookManager:
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
             unique_filename = f"{timestamp}_{original_filename}"
             
-            # Calculate file hash
-            file.seek(0)
-            file_content = file.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            file_size = len(file_content)
-            
-            # Check if file already exists by hash
-            existing_book = Book.query.filter_by(file_hash=file_hash).first()
-            if existing_book:
-                logger.warning(f"Book with same hash already exists: {existing_book.title}")
-                return existing_book
-            
-            # Upload to Google Cloud Storage
             gcs_path = f"books/{unique_filename}"
             blob = self.bucket.blob(gcs_path)
             
+            file_size = file.stream.seek(0, os.SEEK_END)
             file.seek(0)
-            blob.upload_from_file(file, content_type=file.content_type)
+            
+            # A duplicate must be the same size, so only then is it worth
+            # hashing before the upload; otherwise hash the bytes as they stream out
+            if db.session.query(Book.query.filter_by(file_size=file_size).exists()).scalar():
+                file_hash = hashlib.file_digest(file.stream, 'sha256').hexdigest()
+                
+                # Check if file already exists by hash
+                existing_book = Book.query.filter_by(file_hash=file_hash).first()
+                if existing_book:
+                    logger.warning(f"Book with same hash already exists: {existing_book.title}")
+                    return existing_book
+                
+                file.seek(0)
+                blob.upload_from_file(file.stream, content_type=file.content_type, size=file_size)
+            else:
+                reader = _HashingReader(file.stream)
+                blob.upload_from_file(reader, content_type=file.content_type, size=file_size)
+                file_hash = reader.hexdigest()
+                if file_hash is None or reader.size != file_size:
+                    # The upload did not read the file contiguously; hash it directly
+                    file.seek(0)
+                    file_hash = hashlib.file_digest(file.stream, 'sha256').hexdigest()
             
             logger.info(f"Uploaded book to GCS: {gcs_path}")
             
             # Extract metadata from file
-            metadata = self._extract_metadata(file_content, book_format)
+            metadata = self._extract_metadata(file.stream, book_format)
             
             # Create book entry
             book = Book(
@@ -189,12 +251,8 @@ class BookManager:
             
             blob = self.bucket.blob(book.gcs_path)
             
-            # Check if file exists
-            if not blob.exists():
-                logger.error(f"Book file not found in GCS: {book.gcs_path}")
-                return None
-            
-            # Generate signed URL
+            # Signing is local; a missing file surfaces as a 404 when the URL is used,
+            # so there is no exists() round trip here
             expiration = datetime.utcnow() + timedelta(hours=expiration_hours)
             url = blob.generate_signed_url(
                 expiration=expiration,
@@ -260,18 +318,66 @@ class BookManager:
             
             blob = self.bucket.blob(book.gcs_path)
             
-            if not blob.exists():
-                logger.error(f"Book file not found in GCS: {book.gcs_path}")
-                return None
-            
-            content = blob.download_as_bytes()
+            # The download reports a missing file itself; no separate exists() call
+            if book.file_size and book.file_size > CONCURRENT_DOWNLOAD_MIN_SIZE:
+                content = self._download_concurrently(blob)
+            else:
+                content = blob.download_as_bytes()
             logger.info(f"Downloaded book content for {book.id}")
             return content
             
+        except NotFound:
+            logger.error(f"Book file not found in GCS: {book.gcs_path}")
+            return None
+            
         except Exception as e:
             logger.error(f"Error downloading book content {book.id}: {e}")
             return None
     
+    def stream_book_content(self, book: Book, start: int = 0, stop: Optional[int] = None,
+                            chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Stream book content from Google Cloud Storage without buffering the file
+        
+        Args:
+            book: Book object
+            start: First byte to send
+            stop: Byte to stop before; the end of the file if None
+            chunk_size: Bytes fetched from Cloud Storage per request
+            
+        Yields:
+            Successive chunks of the requested byte range
+            
+        Raises:
+            NotFound: If the book file is missing, on the first chunk
+        """
+        blob = self.bucket.blob(book.gcs_path)
+        with blob.open('rb', chunk_size=chunk_size) as reader:
+            if start:
+                reader.seek(start)
+            remaining = None if stop is None else stop - start
+            while remaining is None or remaining > 0:
+                chunk = reader.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    def _download_concurrently(self, blob) -> bytes:
+        """Download a large blob as parallel ranged requests on worker threads"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'book')
+            transfer_manager.download_chunks_concurrently(
+                blob, path,
+                chunk_size=CONCURRENT_DOWNLOAD_CHUNK_SIZE,
+                worker_type=transfer_manager.THREAD,
+                max_workers=CONCURRENT_DOWNLOAD_MAX_WORKERS
+            )
+            with open(path, 'rb') as downloaded:
+                return downloaded.read()
+    
     def _validate_file(self, file: FileStorage) -> bool:
         """
         Validate uploaded file format and size
@@ -305,12 +411,12 @@ class BookManager:
         
         return True
     
-    def _extract_metadata(self, file_content: bytes, book_format: str) -> Dict:
+    def _extract_metadata(self, file: BinaryIO, book_format: str) -> Dict:
         """
         Extract metadata from book file
         
         Args:
-            file_content: Book file content as bytes
+            file: Seekable binary stream of the book file
             book_format: Book format (EPUB, PDF, etc.)
             
         Returns:
@@ -319,27 +425,28 @@ class BookManager:
         metadata = {}
         
         try:
+            file.seek(0)
             if book_format == 'EPUB':
-                metadata = self._extract_epub_metadata(file_content)
+                metadata = self._extract_epub_metadata(file)
             elif book_format == 'PDF':
-                metadata = self._extract_pdf_metadata(file_content)
+                metadata = self._extract_pdf_metadata(file)
             elif book_format == 'TXT':
-                metadata = self._extract_txt_metadata(file_content)
+                metadata = self._extract_txt_metadata(file.read())
             
         except Exception as e:
             logger.error(f"Error extracting metadata for {book_format}: {e}")
         
         return metadata
     
-    def _extract_epub_metadata(self, file_content: bytes) -> Dict:
+    def _extract_epub_metadata(self, file: BinaryIO) -> Dict:
         """Extract metadata from EPUB file"""
         metadata = {}
         
         try:
-            # Save to temp file for processing
+            # Spool to a temp file for processing, copying in chunks
             import tempfile
             with tempfile.NamedTemporaryFile(suffix='.epub', delete=False) as temp_file:
-                temp_file.write(file_content)
+                shutil.copyfileobj(file, temp_file)
                 temp_file.flush()
                 
                 # Read EPUB
@@ -380,43 +487,36 @@ class BookManager:
         
         return metadata
     
-    def _extract_pdf_metadata(self, file_content: bytes) -> Dict:
+    def _extract_pdf_metadata(self, file: BinaryIO) -> Dict:
         """Extract metadata from PDF file"""
         metadata = {}
         
         try:
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-                
-                with open(temp_file.name, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    
-                    # Extract basic info
-                    if pdf_reader.metadata:
-                        metadata['title'] = pdf_reader.metadata.get('/Title', '')
-                        metadata['author'] = pdf_reader.metadata.get('/Author', '')
-                        metadata['creator'] = pdf_reader.metadata.get('/Creator', '')
-                        metadata['producer'] = pdf_reader.metadata.get('/Producer', '')
-                    
-                    # Page count
-                    metadata['page_count'] = len(pdf_reader.pages)
-                    
-                    # Estimate word count
-                    word_count = 0
-                    for page in pdf_reader.pages[:10]:  # Sample first 10 pages
-                        try:
-                            text = page.extract_text()
-                            word_count += len(text.split())
-                        except:
-                            continue
-                    
-                    # Extrapolate word count
-                    if word_count > 0 and metadata['page_count'] > 0:
-                        metadata['word_count'] = int(word_count * metadata['page_count'] / min(10, metadata['page_count']))
-                
-                os.unlink(temp_file.name)
+            # PdfReader seeks within the stream itself, so no temp copy is needed
+            pdf_reader = PyPDF2.PdfReader(file)
+            
+            # Extract basic info
+            if pdf_reader.metadata:
+                metadata['title'] = pdf_reader.metadata.get('/Title', '')
+                metadata['author'] = pdf_reader.metadata.get('/Author', '')
+                metadata['creator'] = pdf_reader.metadata.get('/Creator', '')
+                metadata['producer'] = pdf_reader.metadata.get('/Producer', '')
+            
+            # Page count
+            metadata['page_count'] = len(pdf_reader.pages)
+            
+            # Estimate word count
+            word_count = 0
+            for page in pdf_reader.pages[:10]:  # Sample first 10 pages
+                try:
+                    text = page.extract_text()
+                    word_count += len(text.split())
+                except:
+                    continue
+            
+            # Extrapolate word count
+            if word_count > 0 and metadata['page_count'] > 0:
+                metadata['word_count'] = int(word_count * metadata['page_count'] / min(10, metadata['page_count']))
                 
         except Exception as e:
             logger.error(f"Error extracting PDF metadata: {e}")
@@ -478,32 +578,45 @@ class BookManager:
             Number of files cleaned up
         """
         try:
-            # Get all GCS paths from database
-            db_paths = set()
-            books = Book.query.with_entities(Book.gcs_path).all()
-            for book in books:
-                if book.gcs_path:
-                    db_paths.add(book.gcs_path)
-            
-            # List all files in books/ directory
-            gcs_files = set()
-            blobs = self.bucket.list_blobs(prefix='books/')
-            for blob in blobs:
-                gcs_files.add(blob.name)
-            
-            # Find orphaned files
-            orphaned_files = gcs_files - db_paths
-            
-            # Delete orphaned files
+            # Page through books/ fetching only names, and ask the database
+            # which of each page's files it knows, so memory stays per page
+            blobs = self.bucket.list_blobs(
+                prefix='books/', page_size=1000, fields='items(name),nextPageToken'
+            )
+            
             deleted_count = 0
-            for file_path in orphaned_files:
-                try:
-                    blob = self.bucket.blob(file_path)
-                    blob.delete()
-                    deleted_count += 1
-                    logger.info(f"Deleted orphaned file: {file_path}")
-                except Exception as e:
-                    logger.error(f"Error deleting orphaned file {file_path}: {e}")
+            for page in blobs.pages:
+                names = [blob.name for blob in page]
+                if not names:
+                    continue
+                
+                known_paths = set(db.session.scalars(
+                    select(Book.gcs_path).where(Book.gcs_path.in_(names))
+                ))
+                orphaned_files = [name for name in names if name not in known_paths]
+                
+                # Delete orphaned files, up to GCS_BATCH_SIZE per batched HTTP request;
+                # files whose delete fails are left for the next cleanup run
+                for i in range(0, len(orphaned_files), GCS_BATCH_SIZE):
+                    chunk = orphaned_files[i:i + GCS_BATCH_SIZE]
+                    try:
+                        # Without raise_exception one failed delete would raise
+                        # for the whole batch and hide the deletes that succeeded
+                        batch = self.storage_client.batch(raise_exception=False)
+                        with batch:
+                            self.bucket.delete_blobs(chunk)
+                        
+                        # One sub-response per delete, in request order
+                        deleted = 0
+                        for name, response in zip(chunk, batch._responses):
+                            if 200 <= response.status_code < 300:
+                                deleted += 1
+                            else:
+                                logger.error(f"Error deleting orphaned file {name}: HTTP {response.status_code}")
+                        deleted_count += deleted
+                        logger.info(f"Deleted {deleted} orphaned files")
+                    except Exception as e:
+                        logger.error(f"Error deleting orphaned files {chunk[0]}..{chunk[-1]}: {e}")
             
             return deleted_count
             
@@ -9,14 +9,16 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email import encoders
-from typing import Optional, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import tempfile
 import os
 
 from models import db, Book, NewsItem, SyncLog
-from services.book_manager import BookManager
-from utils.epub_creator import EpubCreator
+from services.book_manager import get_book_manager
+from utils.epub_creator import DIGEST_ARTICLE_COLUMNS, EpubCreator
+from utils.validation import is_kindle_email
 from config.settings import Config
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,7 @@ class KindleSyncService:
         self.smtp_port = Config.SMTP_PORT
         self.email_user = Config.EMAIL_USER
         self.email_password = Config.EMAIL_PASSWORD
-        self.book_manager = BookManager()
+        self.book_manager = get_book_manager()
         self.epub_creator = EpubCreator()
     
     def sync_book_to_kindle(self, book: Book, kindle_email: str, sync_log: SyncLog) -> bool:
@@ -48,19 +50,74 @@ class KindleSyncService:
             sync_log.start_operation()
             
             # Validate Kindle email
-            if not kindle_email.endswith('@kindle.com'):
+            if not is_kindle_email(kindle_email):
                 sync_log.complete_failure("Invalid Kindle email address")
                 return False
             
-            # Get book content
-            book_content = self.book_manager.get_book_content(book)
-            if not book_content:
-                sync_log.complete_failure("Failed to retrieve book content")
-                return False
+            email = self._build_book_email(book)
+            error = self._deliver_book(book, kindle_email, email)
+            return self._finish_book_sync(book, kindle_email, sync_log, email, error)
+                
+        except Exception as e:
+            logger.error(f"Error syncing book {book.id} to {kindle_email}: {e}")
+            sync_log.complete_failure(str(e))
+            return False
+    
+    def sync_books_concurrently(self, work: List[Tuple[Book, SyncLog]], kindle_email: str,
+                                max_workers: int = 10) -> List[bool]:
+        """
+        Sync several books to Kindle, sending their emails in parallel
+        
+        Only the download and SMTP delivery run on worker threads. Sync logs
+        are started and completed on the calling thread, since the session
+        is not shared across threads, and every book's attributes are loaded
+        before any worker reads them.
+        
+        Args:
+            work: (book, sync_log) pairs to sync
+            kindle_email: Target Kindle email address
+            max_workers: Upper bound on concurrent deliveries
             
-            # Prepare email
-            subject = f"[Kindle Content Server] {book.title}"
-            body = f"""
+        Returns:
+            Success flag for each pair, in input order
+        """
+        if not work:
+            return []
+        
+        if not is_kindle_email(kindle_email):
+            for _, sync_log in work:
+                sync_log.start_operation(commit=False)
+                sync_log.complete_failure("Invalid Kindle email address", commit=False)
+            db.session.commit()
+            return [False] * len(work)
+        
+        for _, sync_log in work:
+            sync_log.start_operation(commit=False)
+        db.session.commit()
+        emails = [self._build_book_email(book) for book, _ in work]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(work))) as executor:
+            futures = [
+                executor.submit(self._deliver_book, book, kindle_email, email)
+                for (book, _), email in zip(work, emails)
+            ]
+            errors = []
+            for future in futures:
+                try:
+                    errors.append(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+        
+        results = [
+            self._finish_book_sync(book, kindle_email, sync_log, email, error, commit=False)
+            for (book, sync_log), email, error in zip(work, emails, errors)
+        ]
+        db.session.commit()
+        return results
+    
+    def _build_book_email(self, book: Book) -> Dict:
+        """Build the subject, body and attachment details for a book email"""
+        body = f"""
 Your book "{book.title}" by {book.author} is ready for your Kindle.
 
 Book Details:
@@ -72,37 +129,50 @@ Book Details:
 {book.description if book.description else ''}
 
 Sent from Kindle Content Server
-            """.strip()
-            
-            # Create filename
-            filename = f"{book.title[:50]}.{book.format.lower()}"
-            filename = self._sanitize_filename(filename)
-            
-            # Send email
-            success = self._send_email_with_attachment(
-                to_email=kindle_email,
-                subject=subject,
-                body=body,
-                attachment_data=book_content,
-                attachment_name=filename,
-                attachment_type=self._get_content_type(book.format)
-            )
-            
-            if success:
-                sync_log.complete_success({
-                    'file_name': filename,
-                    'kindle_email': kindle_email,
-                    'book_title': book.title
-                })
-                return True
-            else:
-                sync_log.complete_failure("Failed to send email")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error syncing book {book.id} to {kindle_email}: {e}")
-            sync_log.complete_failure(str(e))
+        """.strip()
+        
+        return {
+            'subject': f"[Kindle Content Server] {book.title}",
+            'body': body,
+            'attachment_name': self._sanitize_filename(f"{book.title[:50]}.{book.format.lower()}"),
+            'attachment_type': self._get_content_type(book.format),
+            'book_title': book.title
+        }
+    
+    def _deliver_book(self, book: Book, kindle_email: str, email: Dict) -> Optional[str]:
+        """
+        Download a book and email it to Kindle, without touching the session
+        
+        Returns:
+            None on success, otherwise the failure message
+        """
+        book_content = self.book_manager.get_book_content(book)
+        if not book_content:
+            return "Failed to retrieve book content"
+        
+        success = self._send_email_with_attachment(
+            to_email=kindle_email,
+            subject=email['subject'],
+            body=email['body'],
+            attachment_data=book_content,
+            attachment_name=email['attachment_name'],
+            attachment_type=email['attachment_type']
+        )
+        return None if success else "Failed to send email"
+    
+    def _finish_book_sync(self, book: Book, kindle_email: str, sync_log: SyncLog,
+                          email: Dict, error: Optional[str], commit: bool = True) -> bool:
+        """Record the outcome of a book delivery on its sync log"""
+        if error:
+            sync_log.complete_failure(error, commit=commit)
             return False
+        
+        sync_log.complete_success({
+            'file_name': email['attachment_name'],
+            'kindle_email': kindle_email,
+            'book_title': email['book_title']
+        }, commit=commit)
+        return True
     
     def sync_news_digest_to_kindle(self, kindle_email: str, digest_title: str, 
                                  max_articles: int, min_quality: float, 
@@ -124,12 +194,14 @@ Sent from Kindle Content Server
             sync_log.start_operation()
             
             # Validate Kindle email
-            if not kindle_email.endswith('@kindle.com'):
+            if not is_kindle_email(kindle_email):
                 sync_log.complete_failure("Invalid Kindle email address")
                 return False
             
             # Get news articles for digest
-            articles = NewsItem.get_for_epub(limit=max_articles, min_quality=min_quality)
+            articles = NewsItem.get_for_epub(
+                limit=max_articles, min_quality=min_quality, columns=DIGEST_ARTICLE_COLUMNS
+            )
             
             if not articles:
                 sync_log.complete_failure("No articles found for digest")
@@ -222,31 +294,28 @@ Articles included:
         Returns:
             List of sync results
         """
-        results = []
+        sync_logs = SyncLog.create_sync_logs([{
+            'operation_type': 'batch_book_sync',
+            'kindle_email': kindle_email,
+            'book_id': book.id,
+            'file_name': f"{book.title}.{book.format.lower()}",
+            'file_size': book.file_size
+        } for book in books])
+        work = list(zip(books, sync_logs))
         
-        for book in books:
-            # Create sync log for each book
-            sync_log = SyncLog.create_sync_log(
-                operation_type='batch_book_sync',
-                kindle_email=kindle_email,
-                book_id=book.id,
-                file_name=f"{book.title}.{book.format.lower()}",
-                file_size=book.file_size
-            )
-            
-            success = self.sync_book_to_kindle(book, kindle_email, sync_log)
-            
-            results.append({
-                'book_id': str(book.id),
-                'book_title': book.title,
-                'sync_log_id': str(sync_log.id),
-                'success': success
-            })
-            
-            if success:
-                book.mark_synced()
+        successes = self.sync_books_concurrently(work, kindle_email)
         
-        return results
+        synced_ids = [book.id for (book, _), success in zip(work, successes) if success]
+        if synced_ids:
+            Book.mark_synced_many(synced_ids)
+            db.session.commit()
+        
+        return [{
+            'book_id': str(book.id),
+            'book_title': book.title,
+            'sync_log_id': str(sync_log.id),
+            'success': success
+        } for (book, sync_log), success in zip(work, successes)]
     
     def _send_email_with_attachment(self, to_email: str, subject: str, body: str,
                                   attachment_data: bytes, attachment_name: str,
@@ -431,7 +500,7 @@ Articles included:
             Dictionary with retry results
         """
         try:
-            pending_retries = SyncLog.get_pending_retries()[:max_retries]
+            pending_retries = SyncLog.get_pending_retries(limit=max_retries, with_book=True)
             
             results = {
                 'attempted': 0,
@@ -447,7 +516,7 @@ Articles included:
                     # Retry based on operation type
                     if sync_log.operation_type in ['book_sync', 'batch_book_sync']:
                         if sync_log.book_id:
-                            book = Book.query.get(sync_log.book_id)
+                            book = sync_log.book
                             if book:
                                 success = self.sync_book_to_kindle(book, sync_log.kindle_email, sync_log)
                             else:
@@ -458,7 +527,7 @@ Articles included:
                             success = False
                             
                     elif sync_log.operation_type == 'news_digest':
-                        metadata = sync_log.metadata or {}
+                        metadata = sync_log.sync_metadata or {}
                         success = self.sync_news_digest_to_kindle(
                             sync_log.kindle_email,
                             metadata.get('digest_title', 'News Digest'),
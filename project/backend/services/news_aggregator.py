@@ -5,6 +5,7 @@ Handles RSS feed aggregation and content processing
 
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
@@ -12,6 +13,7 @@ import hashlib
 import html2text
 from urllib.parse import urljoin, urlparse
 import re
+import threading
 
 from models import db, NewsItem
 from config.settings import Config
@@ -21,16 +23,33 @@ logger = logging.getLogger(__name__)
 class NewsAggregator:
     """Service for aggregating news from RSS feeds"""
     
-    def __init__(self):
+    def __init__(self, adapter: Optional[HTTPAdapter] = None):
         self.feeds = Config.RSS_FEEDS
         self.max_articles_per_feed = Config.RSS_MAX_ARTICLES_PER_FEED
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Kindle Content Server/1.0 (+https://kindle-content-server.com/bot)'
         })
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
+        # A shared adapter lets feeds validated through another service reuse its
+        # connection pool; requests still carry this aggregator's headers.
+        # Sync cycles fetch many feed hosts from a thread pool; keep a pool per
+        # host, big enough for every worker, so connections survive between cycles
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=100, pool_maxsize=Config.RSS_SYNC_MAX_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._local = threading.local()
+    
+    @property
+    def html_converter(self) -> html2text.HTML2Text:
+        """Per-thread HTML converter; HTML2Text keeps parser state on the instance"""
+        converter = getattr(self._local, 'html_converter', None)
+        if converter is None:
+            converter = html2text.HTML2Text()
+            converter.ignore_links = False
+            converter.ignore_images = True
+            self._local.html_converter = converter
+        return converter
     
     def aggregate_all_feeds(self, force_refresh: bool = False, max_articles_per_feed: int = None) -> Dict:
         """
@@ -75,7 +94,24 @@ class NewsAggregator:
         logger.info(f"Aggregation completed: {results}")
         return results
     
-    def aggregate_feed(self, feed_url: str, force_refresh: bool = False, max_articles: int = None) -> Dict:
+    def fetch_feed(self, feed_url: str):
+        """
+        Fetch and parse a single RSS feed without touching the database
+        
+        Args:
+            feed_url: URL of the RSS feed
+            
+        Returns:
+            Parsed feedparser result
+        """
+        logger.info(f"Fetching feed: {feed_url}")
+        response = self.session.get(feed_url, timeout=30)
+        response.raise_for_status()
+        
+        return feedparser.parse(response.content)
+    
+    def aggregate_feed(self, feed_url: str, force_refresh: bool = False, max_articles: int = None,
+                       feed=None) -> Dict:
         """
         Aggregate content from a single RSS feed
         
@@ -83,6 +119,7 @@ class NewsAggregator:
             feed_url: URL of the RSS feed
             force_refresh: If True, ignore cache and fetch fresh content
             max_articles: Maximum number of articles to process
+            feed: Already fetched feed from fetch_feed, skips the download
             
         Returns:
             Dictionary with feed processing results
@@ -98,11 +135,8 @@ class NewsAggregator:
         
         try:
             # Fetch and parse feed
-            logger.info(f"Fetching feed: {feed_url}")
-            response = self.session.get(feed_url, timeout=30)
-            response.raise_for_status()
-            
-            feed = feedparser.parse(response.content)
+            if feed is None:
+                feed = self.fetch_feed(feed_url)
             
             if feed.bozo and feed.bozo_exception:
                 logger.warning(f"Feed parsing warning for {feed_url}: {feed.bozo_exception}")
@@ -111,6 +145,14 @@ class NewsAggregator:
             feed_title = getattr(feed.feed, 'title', self._extract_domain(feed_url))
             feed_description = getattr(feed.feed, 'description', '')
             
+            # Look up the feed's known articles in one query, and commit the
+            # new ones together so they go out as one multi-row INSERT
+            guid_hashes = [self._guid_hash(entry, feed_url) for entry in feed.entries]
+            existing_articles = {
+                article.guid: article
+                for article in NewsItem.query.filter(NewsItem.guid.in_(guid_hashes))
+            }
+            
             # Process articles
             articles_processed = 0
             for entry in feed.entries:
@@ -118,7 +160,10 @@ class NewsAggregator:
                     break
                 
                 try:
-                    article_result = self.process_article(entry, feed_url, feed_title)
+                    article_result = self.process_article(
+                        entry, feed_url, feed_title,
+                        existing_articles=existing_articles, commit=False
+                    )
                     if article_result == 'added':
                         result['articles_added'] += 1
                     elif article_result == 'updated':
@@ -131,15 +176,19 @@ class NewsAggregator:
                     logger.error(f"Error processing article from {feed_url}: {e}")
                     continue
             
+            db.session.commit()
             logger.info(f"Processed {articles_processed} articles from {feed_title}")
             
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error fetching feed {feed_url}: {e}")
             raise
         
         return result
     
-    def process_article(self, entry, feed_url: str, source_name: str) -> str:
+    def process_article(self, entry, feed_url: str, source_name: str,
+                        existing_articles: Optional[Dict[str, NewsItem]] = None,
+                        commit: bool = True) -> str:
         """
         Process a single article entry from RSS feed
         
@@ -147,6 +196,9 @@ class NewsAggregator:
             entry: Feedparser entry object
             feed_url: URL of the RSS feed
             source_name: Name of the news source
+            existing_articles: Known articles by GUID hash; new articles are
+                added to it. Queried per article when omitted
+            commit: If False, leave the change pending for the caller to commit
             
         Returns:
             'added', 'updated', or 'skipped'
@@ -157,11 +209,13 @@ class NewsAggregator:
             return 'skipped'
         
         # Generate GUID for deduplication
-        guid = entry.get('id') or entry.get('link') or title
-        guid_hash = hashlib.md5(f"{feed_url}:{guid}".encode()).hexdigest()
+        guid_hash = self._guid_hash(entry, feed_url)
         
         # Check if article already exists
-        existing_article = NewsItem.query.filter_by(guid=guid_hash).first()
+        if existing_articles is None:
+            existing_article = NewsItem.query.filter_by(guid=guid_hash).first()
+        else:
+            existing_article = existing_articles.get(guid_hash)
         
         # Extract content
         content = self._extract_content(entry)
@@ -188,7 +242,8 @@ class NewsAggregator:
                 existing_article.word_count = word_count
                 existing_article.updated_at = datetime.utcnow()
                 
-                db.session.commit()
+                if commit:
+                    db.session.commit()
                 return 'updated'
             else:
                 return 'skipped'
@@ -210,29 +265,25 @@ class NewsAggregator:
             )
             
             db.session.add(news_item)
-            db.session.commit()
+            if existing_articles is not None:
+                existing_articles[guid_hash] = news_item
+            if commit:
+                db.session.commit()
             return 'added'
     
+    @staticmethod
+    def _guid_hash(entry, feed_url: str) -> str:
+        """Deduplication key for an entry, unique per feed"""
+        guid = entry.get('id') or entry.get('link') or entry.get('title', '').strip()
+        return hashlib.md5(f"{feed_url}:{guid}".encode()).hexdigest()
+    
     def process_new_articles(self):
         """Process newly added articles to calculate quality scores and reading times"""
-        pending_articles = NewsItem.get_pending_processing()
-        
-        for article in pending_articles:
-            try:
-                article.process_content()
-                
-                # Auto-include high-quality articles in EPUB
-                if article.quality_score >= 0.7:
-                    article.include_in_epub()
-                elif article.quality_score < 0.3:
-                    article.exclude_from_epub("Low quality score")
-                
-            except Exception as e:
-                logger.error(f"Error processing article {article.id}: {e}")
-                continue
+        # Auto-include high-quality articles in EPUB, exclude low-quality ones
+        processed_count = NewsItem.process_pending(auto_review=True)
         
         db.session.commit()
-        logger.info(f"Processed {len(pending_articles)} new articles")
+        logger.info(f"Processed {processed_count} new articles")
     
     def _extract_content(self, entry) -> str:
         """Extract and clean article content from entry"""
@@ -399,12 +450,7 @@ class NewsAggregator:
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        deleted_count = NewsItem.query.filter(
-            NewsItem.created_at < cutoff_date,
-            NewsItem.epub_included == False
-        ).delete()
-        
-        db.session.commit()
+        deleted_count = NewsItem.delete_older_than(cutoff_date)
         
         logger.info(f"Cleaned up {deleted_count} old articles older than {days} days")
         return deleted_count
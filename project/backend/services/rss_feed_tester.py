@@ -5,6 +5,7 @@ Tests RSS feeds before saving and provides configuration options
 
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
@@ -12,6 +13,8 @@ from urllib.parse import urlparse, urljoin
 import time
 import html2text
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 
@@ -42,6 +45,27 @@ class FeedTestResult:
     metadata: Dict
     test_duration: float
     sample_articles: List[Dict]
+    
+    def to_dict(self, include_metadata: bool = True) -> Dict:
+        """Convert the result to a dictionary for API responses"""
+        result_dict = {
+            'url': self.url,
+            'status': self.status.value,
+            'success': self.success,
+            'title': self.title,
+            'description': self.description,
+            'article_count': self.article_count,
+            'last_updated': self.last_updated,
+            'error_message': self.error_message,
+            'warnings': self.warnings,
+            'test_duration': self.test_duration,
+            'sample_articles': self.sample_articles
+        }
+        
+        if include_metadata:
+            result_dict['metadata'] = self.metadata
+        
+        return result_dict
 
 
 @dataclass
@@ -57,6 +81,24 @@ class FeedConfiguration:
     category_mapping: Dict[str, str] = None  # Custom category mapping
     quality_threshold: float = 0.3
     update_frequency: str = "daily"  # daily, hourly, weekly
+    sample_limit: Optional[int] = None  # Articles kept in the result; None keeps all tested
+
+
+_feed_tester: Optional['RSSFeedTester'] = None
+
+
+def get_feed_tester() -> 'RSSFeedTester':
+    """
+    Return the shared RSSFeedTester, creating it on first use
+    
+    One instance per worker process lets every request reuse the pooled
+    HTTP connections. It is safe to share between threads: the session only
+    issues independent GETs and the HTML converter is per-thread.
+    """
+    global _feed_tester
+    if _feed_tester is None:
+        _feed_tester = RSSFeedTester()
+    return _feed_tester
 
 
 class RSSFeedTester:
@@ -67,9 +109,23 @@ class RSSFeedTester:
         self.session.headers.update({
             'User-Agent': 'Kindle Content Server/1.0 RSS Feed Tester (+https://kindle-content-server.com/bot)'
         })
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
+        # Keep connections to many feed hosts alive across requests; the
+        # article sync manager shares this adapter for its feed downloads
+        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=50)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._local = threading.local()
+    
+    @property
+    def html_converter(self) -> html2text.HTML2Text:
+        """Per-thread HTML converter; HTML2Text keeps parser state on the instance"""
+        converter = getattr(self._local, 'html_converter', None)
+        if converter is None:
+            converter = html2text.HTML2Text()
+            converter.ignore_links = False
+            converter.ignore_images = True
+            self._local.html_converter = converter
+        return converter
     
     def test_feed(self, url: str, config: FeedConfiguration = None) -> FeedTestResult:
         """
@@ -145,16 +201,21 @@ class RSSFeedTester:
             
             # Step 6: Test articles
             articles = []
+            quality_scores = []
             article_count = len(feed.entries)
+            sample_limit = config.sample_limit if config.sample_limit is not None else config.max_articles
             
-            # Process sample articles (up to config.max_articles)
+            # Process sample articles (up to config.max_articles); every tested
+            # article counts towards health, but only sample_limit are kept
             for i, entry in enumerate(feed.entries[:config.max_articles]):
                 article_result = self._test_article(entry, config)
                 if article_result:
-                    articles.append(article_result)
+                    quality_scores.append(article_result['quality_score'])
+                    if len(articles) < sample_limit:
+                        articles.append(article_result)
             
             # Step 7: Determine overall health status
-            status = self._determine_feed_status(feed, articles, warnings)
+            status = self._determine_feed_status(feed, quality_scores, warnings)
             
             # Step 8: Generate metadata
             metadata = self._generate_metadata(feed, response, config)
@@ -220,13 +281,29 @@ class RSSFeedTester:
                 sample_articles=[]
             )
     
-    def test_multiple_feeds(self, urls: List[str], config: FeedConfiguration = None) -> List[FeedTestResult]:
-        """Test multiple RSS feeds"""
-        results = []
-        for url in urls:
-            result = self.test_feed(url, config)
-            results.append(result)
-        return results
+    def test_multiple_feeds(self, urls: List[str], config: FeedConfiguration = None,
+                            max_workers: int = 10) -> List[FeedTestResult]:
+        """
+        Test multiple RSS feeds concurrently
+        
+        Feed tests are network-bound, so they run on a thread pool and the
+        total time approaches the slowest feed rather than the sum. test_feed
+        turns every failure into an ERROR result, so one bad feed cannot
+        fail the batch.
+        
+        Args:
+            urls: RSS feed URLs to test
+            config: Optional configuration for testing
+            max_workers: Upper bound on concurrent feed tests
+            
+        Returns:
+            FeedTestResult for each URL, in input order
+        """
+        if not urls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(lambda url: self.test_feed(url, config), urls))
     
     def validate_feed_before_save(self, url: str, config: FeedConfiguration = None) -> Tuple[bool, str, Dict]:
         """
@@ -519,16 +596,16 @@ class RSSFeedTester:
         
         return min(1.0, score)
     
-    def _determine_feed_status(self, feed, articles: List[Dict], warnings: List[str]) -> FeedHealthStatus:
-        """Determine overall feed health status"""
-        if not articles:
+    def _determine_feed_status(self, feed, quality_scores: List[float], warnings: List[str]) -> FeedHealthStatus:
+        """Determine overall feed health status from the tested articles' quality scores"""
+        if not quality_scores:
             return FeedHealthStatus.ERROR
         
         if len(warnings) > 0:
             return FeedHealthStatus.WARNING
         
         # Check article quality
-        avg_quality = sum(article['quality_score'] for article in articles) / len(articles)
+        avg_quality = sum(quality_scores) / len(quality_scores)
         if avg_quality < 0.4:
             return FeedHealthStatus.WARNING
         
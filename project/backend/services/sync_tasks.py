@@ -0,0 +1,140 @@
+"""
+Background Kindle sync tasks
+Runs Kindle deliveries off the request thread; progress is tracked on sync logs
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from flask import Flask
+
+from models import db, Book, SyncLog
+from services.kindle_sync import KindleSyncService
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+_sync_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_sync_executor() -> ThreadPoolExecutor:
+    """Return the shared sync task pool, creating it on first use"""
+    global _sync_executor
+    if _sync_executor is None:
+        _sync_executor = ThreadPoolExecutor(
+            max_workers=Config.SYNC_TASK_MAX_WORKERS,
+            thread_name_prefix='kindle-sync'
+        )
+    return _sync_executor
+
+
+def submit_book_sync(app: Flask, book_id, kindle_email: str, sync_log_id) -> Future:
+    """Queue delivery of one book; the sync log records the outcome"""
+    return get_sync_executor().submit(_run_book_sync, app, book_id, kindle_email, sync_log_id)
+
+
+def submit_news_digest_sync(app: Flask, kindle_email: str, digest_title: str,
+                            max_articles: int, min_quality: float, sync_log_id) -> Future:
+    """Queue creation and delivery of a news digest"""
+    return get_sync_executor().submit(
+        _run_news_digest_sync, app, kindle_email, digest_title,
+        max_articles, min_quality, sync_log_id
+    )
+
+
+def submit_batch_sync(app: Flask, book_ids: List, kindle_email: str, sync_log_ids: List) -> Future:
+    """Queue delivery of several books, one sync log per book"""
+    return get_sync_executor().submit(_run_batch_sync, app, book_ids, kindle_email, sync_log_ids)
+
+
+def _run_book_sync(app: Flask, book_id, kindle_email: str, sync_log_id) -> bool:
+    with app.app_context():
+        try:
+            sync_log = db.session.get(SyncLog, sync_log_id)
+            book = db.session.get(Book, book_id)
+            if book is None:
+                sync_log.start_operation(commit=False)
+                sync_log.complete_failure("Book not found")
+                return False
+
+            success = KindleSyncService().sync_book_to_kindle(book, kindle_email, sync_log)
+            if success:
+                book.mark_synced()
+            return success
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Background sync of book {book_id} failed: {e}")
+            _fail_pending_sync_logs([sync_log_id], str(e))
+            return False
+
+
+def _run_news_digest_sync(app: Flask, kindle_email: str, digest_title: str,
+                          max_articles: int, min_quality: float, sync_log_id) -> bool:
+    with app.app_context():
+        try:
+            sync_log = db.session.get(SyncLog, sync_log_id)
+            return KindleSyncService().sync_news_digest_to_kindle(
+                kindle_email, digest_title, max_articles, min_quality, sync_log
+            )
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Background news digest sync failed: {e}")
+            _fail_pending_sync_logs([sync_log_id], str(e))
+            return False
+
+
+def _run_batch_sync(app: Flask, book_ids: List, kindle_email: str, sync_log_ids: List) -> List[bool]:
+    with app.app_context():
+        try:
+            books = {book.id: book for book in Book.query.filter(Book.id.in_(book_ids)).all()}
+            sync_logs = {
+                sync_log.id: sync_log
+                for sync_log in SyncLog.query.filter(SyncLog.id.in_(sync_log_ids)).all()
+            }
+
+            # Books deleted since the request was accepted fail on their own log
+            successes = [False] * len(book_ids)
+            work, positions = [], []
+            for position, (book_id, sync_log_id) in enumerate(zip(book_ids, sync_log_ids)):
+                sync_log = sync_logs[sync_log_id]
+                book = books.get(book_id)
+                if book is None:
+                    sync_log.start_operation(commit=False)
+                    sync_log.complete_failure("Book not found", commit=False)
+                    continue
+                work.append((book, sync_log))
+                positions.append(position)
+
+            results = KindleSyncService().sync_books_concurrently(work, kindle_email) if work else []
+            for position, success in zip(positions, results):
+                successes[position] = success
+
+            synced_ids = [book.id for (book, _), success in zip(work, results) if success]
+            if synced_ids:
+                Book.mark_synced_many(synced_ids)
+            db.session.commit()
+            return successes
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Background batch sync failed: {e}")
+            _fail_pending_sync_logs(sync_log_ids, str(e))
+            return [False] * len(book_ids)
+
+
+def _fail_pending_sync_logs(sync_log_ids: List, error_message: str) -> None:
+    """Mark logs the failed task left pending as failed so they can be retried"""
+    try:
+        for sync_log in SyncLog.query.filter(SyncLog.id.in_(sync_log_ids)).all():
+            if sync_log.status != 'pending':
+                continue
+            if sync_log.started_at is None:
+                sync_log.start_operation(commit=False)
+            sync_log.complete_failure(error_message, commit=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Could not record sync failure on logs {sync_log_ids}: {e}")
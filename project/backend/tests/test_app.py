@@ -26,4 +26,9 @@ def test_404_handling(client):
     assert response.status_code == 404
     
     data = response.get_json()
-    assert 'error' in data
\ No newline at end of file
+    assert 'error' in data
+
+def test_huge_hours_window_is_not_a_server_error(client):
+    """An out-of-range hours value is bounded instead of overflowing."""
+    response = client.get('/api/news/?hours=99999999999')
+    assert response.status_code == 200
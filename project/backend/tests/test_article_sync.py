@@ -0,0 +1,50 @@
+"""
+Article sync scheduling tests
+"""
+
+from datetime import datetime, timedelta
+
+from services.article_sync_manager import ArticleSyncManager
+
+
+def test_shortened_frequency_overrides_stored_due_time():
+    """A stale nextSyncDue from a longer frequency does not delay the sync."""
+    now = datetime(2024, 1, 10, 12, 0)
+    source = {
+        'url': 'https://example.com/feed',
+        'syncFrequency': 'hourly',
+        'lastSync': '2024-01-10T10:00:00+00:00',
+        'nextSyncDue': '2024-01-17T10:00:00+00:00',  # Set while it was weekly
+    }
+
+    assert ArticleSyncManager().should_sync_source(source, now=now) is True
+    assert ArticleSyncManager().should_sync_source(
+        {**source, 'lastSync': (now - timedelta(minutes=30)).isoformat() + 'Z'}, now=now
+    ) is False
+
+
+def test_stored_due_time_without_last_sync():
+    """A new source waits for its stored due time."""
+    now = datetime(2024, 1, 10, 12, 0)
+    source = {'url': 'https://example.com/feed', 'nextSyncDue': '2024-01-10T13:00:00+00:00'}
+
+    assert ArticleSyncManager().should_sync_source(source, now=now) is False
+
+
+def test_sync_sources_exits_early_when_nothing_is_due(client, monkeypatch):
+    """A poll with no due sources does not start a sync cycle."""
+    def no_cycle(*args, **kwargs):
+        raise AssertionError('sync cycle should not run')
+    monkeypatch.setattr(ArticleSyncManager, 'sync_all_due_sources', no_cycle)
+    now = datetime.utcnow()
+    source = {
+        'url': 'https://example.com/feed',
+        'syncFrequency': 'daily',
+        'lastSync': now.isoformat(),
+        'nextSyncDue': (now + timedelta(days=1)).isoformat(),
+    }
+
+    response = client.post('/api/articles/sync-sources', json={'sources': [source]})
+
+    assert response.status_code == 200
+    assert response.get_json()['result']['sources_skipped'] == 1
@@ -0,0 +1,61 @@
+"""
+Book manager helper tests
+"""
+
+import hashlib
+import io
+from types import SimpleNamespace
+
+from services.book_manager import BookManager, _HashingReader
+
+
+def test_hashing_reader_survives_rewinds():
+    """Re-reading from the start, as upload retries do, hashes each byte once."""
+    data = bytes(range(256)) * 10
+    reader = _HashingReader(io.BytesIO(data))
+
+    reader.read(100)
+    reader.seek(0)
+    reader.read(50)
+    reader.read()
+
+    assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_hashing_reader_refuses_digest_after_forward_seek():
+    """Skipping unread bytes leaves no digest rather than a wrong one."""
+    reader = _HashingReader(io.BytesIO(bytes(2560)))
+
+    reader.read(100)
+    reader.seek(500)
+    reader.read()
+
+    assert reader.hexdigest() is None
+
+
+def test_cleanup_counts_each_successful_delete(app):
+    """One failed delete in a batch does not discard the others."""
+    names = ['books/a.epub', 'books/b.epub', 'books/c.epub']
+
+    class FakeBatch:
+        def __init__(self, raise_exception=True):
+            assert raise_exception is False
+            self._responses = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self._responses = [SimpleNamespace(status_code=code) for code in (204, 503, 204)]
+
+    bucket = SimpleNamespace(
+        list_blobs=lambda **kwargs: SimpleNamespace(
+            pages=[[SimpleNamespace(name=name) for name in names]]
+        ),
+        delete_blobs=lambda blobs: None
+    )
+    manager = BookManager.__new__(BookManager)
+    manager.storage_client = SimpleNamespace(batch=FakeBatch)
+    manager.bucket = bucket
+
+    assert manager.cleanup_orphaned_files() == 2
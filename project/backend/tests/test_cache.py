@@ -0,0 +1,138 @@
+"""
+Cache helper tests
+"""
+
+import redis
+
+from utils import cache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis client"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = str(value).encode()
+        return True
+
+    def incr(self, key):
+        value = int(self.store.get(key, b'0')) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+
+class BrokenRedis:
+    """Redis client whose every call fails"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError('unavailable')
+        return fail
+
+
+def test_get_or_set_json_caches_value(monkeypatch):
+    """Second lookup is served from the cache."""
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': 3}
+
+    assert cache.get_or_set_json('stats:test', 60, compute) == {'total': 3}
+    assert cache.get_or_set_json('stats:test', 60, compute) == {'total': 3}
+    assert len(calls) == 1
+
+    cache.invalidate('stats:test')
+    assert 'stats:test' not in fake.store
+
+
+def test_get_or_set_json_survives_redis_outage(monkeypatch):
+    """An unavailable Redis falls through to the computed value."""
+    monkeypatch.setattr(cache, 'get_redis', lambda: BrokenRedis())
+
+    assert cache.get_or_set_json('stats:test', 60, lambda: [1, 2]) == [1, 2]
+    cache.invalidate('stats:test')
+
+
+def test_get_or_set_json_does_not_cache_none(monkeypatch):
+    """A None result is returned but left uncached."""
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+
+    assert cache.get_or_set_json('download:book:1', 60, lambda: None) is None
+    assert 'download:book:1' not in fake.store
+
+
+def test_version_is_seeded_and_bumped(monkeypatch):
+    """A missing version is seeded once and changes on every bump."""
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+
+    first = cache.get_version('books')
+    assert first is not None
+    assert cache.get_version('books') == first
+
+    cache.bump_version('books')
+    assert cache.get_version('books') != first
+
+
+def test_version_unavailable_without_redis(monkeypatch):
+    """Version lookups report None when Redis is down."""
+    monkeypatch.setattr(cache, 'get_redis', lambda: BrokenRedis())
+
+    assert cache.get_version('books') is None
+    cache.bump_version('books')
+
+
+def test_compressed_etag_gets_304(client, monkeypatch):
+    """The ETag Flask-Compress sends to compressing clients revalidates."""
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: fake)
+
+    response = client.get('/api/books/genres')
+    assert response.status_code == 200
+    etag, _ = response.get_etag()
+
+    for algorithm in ('br', 'gzip'):
+        revalidated = client.get('/api/books/genres',
+                                 headers={'If-None-Match': f'"{etag}:{algorithm}"'})
+        assert revalidated.status_code == 304
+
+
+def test_redis_outage_is_skipped_after_first_failure(monkeypatch):
+    """Once Redis times out, later calls skip it instead of waiting again."""
+    calls = []
+
+    class TimingOutRedis:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                calls.append(name)
+                raise redis.TimeoutError('timed out')
+            return fail
+
+    monkeypatch.setattr(cache, '_redis_client', TimingOutRedis())
+    monkeypatch.setattr(cache, '_redis_retry_at', 0.0)
+
+    assert cache.get_or_set_json('stats:test', 60, lambda: 1) == 1
+    assert cache.get_or_set_json('stats:test', 60, lambda: 2) == 2
+    assert calls == ['get']
+
+    monkeypatch.setattr(cache, '_redis_retry_at', 0.0)
+    cache.invalidate('stats:test')
+    assert calls == ['get', 'delete']
@@ -0,0 +1,90 @@
+"""
+News digest file cache tests
+"""
+
+import os
+import time
+from datetime import datetime
+
+from config.settings import Config
+from utils import digest_cache
+
+
+def test_cache_path_ignores_article_order(monkeypatch, tmp_path):
+    """The same articles map to the same file whatever their order."""
+    monkeypatch.setattr(Config, 'DIGEST_CACHE_DIR', str(tmp_path))
+    edited = datetime(2024, 1, 1, 12, 0)
+    articles = [('a', edited), ('b', None)]
+
+    path = digest_cache.digest_cache_path('Guardian', '20240101', articles)
+
+    assert path == digest_cache.digest_cache_path('Guardian', '20240101', reversed(articles))
+    assert os.path.dirname(path) == str(tmp_path)
+
+
+def test_cache_path_changes_with_article_versions(monkeypatch, tmp_path):
+    """An edited article or a different day produces a new digest."""
+    monkeypatch.setattr(Config, 'DIGEST_CACHE_DIR', str(tmp_path))
+    original = [('a', datetime(2024, 1, 1, 12, 0))]
+    edited = [('a', datetime(2024, 1, 1, 13, 0))]
+
+    path = digest_cache.digest_cache_path('Guardian', '20240101', original)
+
+    assert path != digest_cache.digest_cache_path('Guardian', '20240101', edited)
+    assert path != digest_cache.digest_cache_path('Guardian', '20240102', original)
+
+
+def test_store_and_cleanup(monkeypatch, tmp_path):
+    """Stored digests are kept until they pass the age limit."""
+    cache_dir = tmp_path / 'digests'
+    monkeypatch.setattr(Config, 'DIGEST_CACHE_DIR', str(cache_dir))
+    built = tmp_path / 'built.epub'
+    built.write_bytes(b'epub')
+
+    cache_path = digest_cache.digest_cache_path('Guardian', '20240101', [('a', None)])
+    digest_cache.store_digest(str(built), cache_path)
+
+    assert not built.exists()
+    assert os.listdir(cache_dir) == [os.path.basename(cache_path)]
+    assert digest_cache.cleanup_digest_cache(max_age_hours=48) == 0
+
+    stale = time.time() - 49 * 3600
+    os.utime(cache_path, (stale, stale))
+    assert digest_cache.cleanup_digest_cache(max_age_hours=48) == 1
+    assert not os.path.exists(cache_path)
+
+
+def test_cleanup_without_cache_dir(monkeypatch, tmp_path):
+    """A cache directory that was never created is not an error."""
+    monkeypatch.setattr(Config, 'DIGEST_CACHE_DIR', str(tmp_path / 'missing'))
+
+    assert digest_cache.cleanup_digest_cache() == 0
+
+
+def test_failed_build_is_kept_for_pollers(app, monkeypatch):
+    """A failed build is reported again rather than silently rebuilt."""
+    from routes import kual_api
+
+    builds = []
+    def failing_build(*args):
+        builds.append(args)
+        raise RuntimeError('no articles')
+    monkeypatch.setattr(kual_api, '_build_digest', failing_build)
+    monkeypatch.setattr(kual_api, '_digest_builds', {})
+    monkeypatch.setattr(kual_api, '_failed_digest_builds', {})
+
+    future = kual_api._submit_digest_build('Guardian', [], 'Digest', '/tmp/failed.epub')
+    assert isinstance(future.exception(timeout=5), RuntimeError)
+
+    assert kual_api._submit_digest_build('Guardian', [], 'Digest', '/tmp/failed.epub') is future
+    assert len(builds) == 1
+
+    # Done callbacks run just after waiters wake; let the failure be recorded
+    deadline = time.monotonic() + 5
+    while '/tmp/failed.epub' not in kual_api._failed_digest_builds and time.monotonic() < deadline:
+        time.sleep(0.01)
+    kual_api._failed_digest_builds['/tmp/failed.epub'] = 0
+    retry = kual_api._submit_digest_build('Guardian', [], 'Digest', '/tmp/failed.epub')
+    assert retry is not future
+    retry.exception(timeout=5)
+    assert len(builds) == 2
@@ -0,0 +1,21 @@
+"""
+KUAL download tests
+"""
+
+from types import SimpleNamespace
+
+from routes import kual_api
+
+
+def test_unsatisfiable_range_returns_416(app, monkeypatch):
+    """A range past the end of the book is refused, not answered with the whole file."""
+    def no_download(*args):
+        raise AssertionError('storage should not be read')
+    monkeypatch.setattr(kual_api, 'get_book_manager', no_download)
+    book = SimpleNamespace(file_size=1000, title='Test Book', format='EPUB')
+
+    with app.test_request_context(headers={'Range': 'bytes=5000-'}):
+        response = kual_api._stream_book(book)
+
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == 'bytes */1000'
@@ -0,0 +1,20 @@
+"""
+News item model tests
+"""
+
+from datetime import datetime
+
+from models import db, NewsItem
+
+
+def test_process_pending_covers_every_batch(app, sample_news_data):
+    """Pending items spanning several batches are all processed once."""
+    for i in range(5):
+        db.session.add(NewsItem(**{**sample_news_data, 'guid': f'guid-{i}'},
+                                published_at=datetime.utcnow(), status='pending'))
+    db.session.commit()
+
+    assert NewsItem.process_pending(batch_size=2) == 5
+    db.session.commit()
+
+    assert NewsItem.query.filter_by(status='pending').count() == 0
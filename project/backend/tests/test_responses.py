@@ -0,0 +1,79 @@
+"""
+Streamed JSON response tests
+"""
+
+import pytest
+
+from routes import rss_feeds
+from services.rss_feed_tester import FeedHealthStatus, FeedTestResult
+from utils.responses import stream_ojson
+
+
+def test_stream_failure_before_response_raises(app):
+    """An error on the first item reaches the view, before any 200 is sent."""
+    def items():
+        raise RuntimeError('query failed')
+        yield
+
+    with app.test_request_context(), pytest.raises(RuntimeError):
+        stream_ojson('articles', items(), dict)
+
+
+def test_stream_failure_mid_body_stays_valid_json(app):
+    """A later error closes the list with an error key instead of truncating."""
+    def items():
+        yield {'id': 1}
+        raise RuntimeError('connection lost')
+
+    with app.test_request_context():
+        response = stream_ojson('articles', items(), lambda: {'total': 1})
+        data = response.get_json()
+
+    assert data == {'articles': [{'id': 1}], 'error': 'Failed to stream articles'}
+
+
+def test_stream_empty_list(app):
+    """An empty iterable still produces the trailer keys."""
+    with app.test_request_context():
+        response = stream_ojson('articles', [], lambda: {'total': 0})
+        data = response.get_json()
+
+    assert data == {'articles': [], 'total': 0}
+
+
+def _preview_result(sample_articles):
+    return FeedTestResult(
+        url='https://example.com/feed', status=FeedHealthStatus.HEALTHY,
+        success=True, title='Example', description='', article_count=1,
+        last_updated=None, error_message=None, warnings=[], metadata={},
+        test_duration=0.1, sample_articles=sample_articles
+    )
+
+
+def _stub_feed_tester(monkeypatch, result):
+    class StubTester:
+        def test_feed(self, url, config):
+            return result
+    monkeypatch.setattr(rss_feeds, 'get_feed_tester', StubTester)
+
+
+def test_feed_preview_without_articles_is_rejected(client, monkeypatch):
+    """A feed with nothing to preview fails before streaming starts."""
+    _stub_feed_tester(monkeypatch, _preview_result([]))
+
+    response = client.post('/api/rss-feeds/preview',
+                           json={'url': 'https://example.com/feed'})
+
+    assert response.status_code == 400
+
+
+def test_feed_preview_failure_closes_article_list(client, monkeypatch):
+    """An article that cannot be encoded ends the preview with an error key."""
+    _stub_feed_tester(monkeypatch, _preview_result([{'title': 'ok'}, {'title': object()}]))
+
+    response = client.post('/api/rss-feeds/preview',
+                           json={'url': 'https://example.com/feed'})
+
+    data = response.get_json()
+    assert data['articles'] == [{'title': 'ok'}]
+    assert data['error'] == 'Failed to stream articles'
@@ -0,0 +1,45 @@
+"""
+Background Kindle sync tests
+"""
+
+from models import db, SyncLog
+from routes import sync as sync_routes
+from services import sync_tasks
+
+
+def test_news_digest_sync_returns_status_url(client, monkeypatch):
+    """The sync is queued and the client gets a log to poll."""
+    submitted = []
+    monkeypatch.setattr(sync_routes, 'submit_news_digest_sync',
+                        lambda *args: submitted.append(args))
+
+    response = client.post('/api/sync/news-digest',
+                           json={'kindle_email': 'reader@kindle.com'})
+
+    assert response.status_code == 202
+    data = response.get_json()
+    assert len(submitted) == 1
+    assert str(submitted[0][-1]) == data['sync_log_id']
+
+    assert data['status_url'].endswith(f"/api/sync/logs/{data['sync_log_id']}")
+    assert db.session.get(SyncLog, submitted[0][-1]).status == 'pending'
+
+
+def test_failed_background_sync_marks_log_failed(app, monkeypatch):
+    """A task that raises leaves its log failed, not pending."""
+    class FailingSyncService:
+        def sync_news_digest_to_kindle(self, *args):
+            raise RuntimeError('SMTP unavailable')
+    monkeypatch.setattr(sync_tasks, 'KindleSyncService', FailingSyncService)
+
+    sync_log = SyncLog.create_sync_log(operation_type='news_digest',
+                                       kindle_email='reader@kindle.com')
+
+    assert sync_tasks._run_news_digest_sync(
+        app, 'reader@kindle.com', 'Digest', 20, 0.5, sync_log.id
+    ) is False
+
+    db.session.expire_all()
+    sync_log = db.session.get(SyncLog, sync_log.id)
+    assert sync_log.status == 'failed'
+    assert sync_log.error_message == 'SMTP unavailable'
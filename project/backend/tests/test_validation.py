@@ -0,0 +1,59 @@
+"""
+Request validation tests
+"""
+
+import pytest
+
+from utils.validation import (
+    QueryParamError, compile_schema, is_kindle_email, parse_bool_arg, parse_int_arg,
+    validate_json_schema
+)
+
+
+def test_parse_int_arg_defaults_and_clamps():
+    """Missing values use the default and large values are clamped."""
+    assert parse_int_arg({}, 'limit', 20, minimum=1, maximum=100) == 20
+    assert parse_int_arg({'limit': ''}, 'limit', 20, minimum=1, maximum=100) == 20
+    assert parse_int_arg({'limit': '500'}, 'limit', 20, minimum=1, maximum=100) == 100
+
+
+def test_parse_int_arg_rejects_bad_values():
+    """Malformed or too-small values raise QueryParamError."""
+    with pytest.raises(QueryParamError):
+        parse_int_arg({'offset': 'abc'}, 'offset', 0, minimum=0)
+
+    with pytest.raises(QueryParamError):
+        parse_int_arg({'offset': '-5'}, 'offset', 0, minimum=0)
+
+
+def test_parse_bool_arg():
+    """Only "true" in any case is truthy."""
+    assert parse_bool_arg({'count': 'TRUE'}, 'count') is True
+    assert parse_bool_arg({'count': 'yes'}, 'count') is False
+    assert parse_bool_arg({}, 'count', default=True) is True
+
+
+def test_compiled_schema_matches_plain_schema():
+    """A compiled validator accepts and rejects the same data as its schema."""
+    schema = {
+        'type': 'object',
+        'properties': {'url': {'type': 'string'}},
+        'required': ['url'],
+        'additionalProperties': False
+    }
+    validator = compile_schema(schema)
+
+    for data in ({'url': 'https://example.com/feed'}, {}, {'url': 1}, {'url': 'x', 'extra': True}):
+        assert validate_json_schema(data, validator) == validate_json_schema(data, schema)
+
+    assert validate_json_schema({'url': 'https://example.com/feed'}, validator) is True
+    assert validate_json_schema({'url': 1}, validator) is False
+
+
+def test_is_kindle_email():
+    """Any Send-to-Kindle domain is accepted regardless of case."""
+    assert is_kindle_email('reader@kindle.com')
+    assert is_kindle_email('Reader@Kindle.COM')
+    assert is_kindle_email('reader@free.kindle.com')
+    assert not is_kindle_email('reader@example.com')
+    assert not is_kindle_email(None)
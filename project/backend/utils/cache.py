@@ -0,0 +1,225 @@
+"""
+Redis caching helpers
+Read-through JSON caching with explicit invalidation
+"""
+
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import orjson
+import redis
+from flask import current_app, make_response, request
+
+from config.settings import Config
+from utils.responses import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+
+# After a connection failure or timeout Redis is skipped for this many
+# seconds, so an outage costs one socket timeout rather than one per call
+REDIS_RETRY_INTERVAL = 10
+_redis_retry_at = 0.0
+
+# The KUAL content list is the same for every device and is polled
+# constantly; book and article mutations invalidate it
+CONTENT_LIST_CACHE_KEY = 'kual:content:list:v2'
+
+
+class RedisSkipped(redis.ConnectionError):
+    """Raised instead of contacting Redis while it is marked unavailable"""
+
+
+def get_redis() -> redis.Redis:
+    """
+    Return the shared Redis client, creating it on first use
+
+    Raises:
+        RedisSkipped: If Redis failed within the last REDIS_RETRY_INTERVAL seconds
+    """
+    global _redis_client
+    if time.monotonic() < _redis_retry_at:
+        raise RedisSkipped('Redis unavailable, retrying later')
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            Config.REDIS_URL,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5
+        )
+    return _redis_client
+
+
+def _redis_failed(error: redis.RedisError) -> None:
+    """Skip Redis for REDIS_RETRY_INTERVAL if error shows it is unreachable"""
+    global _redis_retry_at
+    if isinstance(error, (redis.ConnectionError, redis.TimeoutError)) \
+            and not isinstance(error, RedisSkipped):
+        _redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+def get_or_set_json(key: str, ttl: int, compute: Callable[[], Any]) -> Any:
+    """
+    Return the cached JSON value for key, computing and storing it on a miss
+
+    Cache failures are logged and fall through to compute() so an
+    unavailable Redis never fails the request. A None result is returned
+    but not cached, so failed computations are retried.
+
+    Args:
+        key: Redis key
+        ttl: Expiry in seconds
+        compute: Callable producing a JSON-serializable value
+
+    Returns:
+        Cached or freshly computed value
+    """
+    try:
+        cached = get_redis().get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except redis.RedisError as e:
+        _redis_failed(e)
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return compute()
+
+    value = compute()
+    if value is None:
+        return value
+
+    try:
+        get_redis().setex(key, ttl, dumps_bytes(value))
+    except redis.RedisError as e:
+        _redis_failed(e)
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+    return value
+
+
+def invalidate(*keys: str) -> None:
+    """
+    Delete cache keys after a mutation has been committed
+
+    Args:
+        keys: Redis keys to delete
+    """
+    if not keys:
+        return
+
+    try:
+        get_redis().delete(*keys)
+    except redis.RedisError as e:
+        _redis_failed(e)
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+
+def invalidate_content_list(*keys: str) -> None:
+    """
+    Delete the KUAL content list, and any other keys, in one round trip
+
+    Args:
+        keys: Additional Redis keys invalidated by the same mutation
+    """
+    invalidate(CONTENT_LIST_CACHE_KEY, *keys)
+
+
+def _version_key(namespace: str) -> str:
+    return f'version:{namespace}'
+
+
+def get_version(namespace: str) -> Optional[str]:
+    """
+    Return the current content version for a namespace
+
+    A missing counter is seeded from the clock rather than zero, so a
+    flushed Redis cannot reissue a version a client already holds.
+
+    Args:
+        namespace: Content namespace, e.g. 'books'
+
+    Returns:
+        Version string, or None if Redis is unavailable
+    """
+    key = _version_key(namespace)
+    try:
+        client = get_redis()
+        version = client.get(key)
+        if version is None:
+            client.set(key, time.time_ns(), nx=True)
+            version = client.get(key)
+        return version.decode() if version is not None else None
+    except redis.RedisError as e:
+        _redis_failed(e)
+        logger.warning(f"Version read failed for {namespace}: {e}")
+        return None
+
+
+def bump_version(namespace: str) -> None:
+    """
+    Advance a namespace's content version after a committed mutation
+
+    Args:
+        namespace: Content namespace, e.g. 'books'
+    """
+    try:
+        get_redis().incr(_version_key(namespace))
+    except redis.RedisError as e:
+        _redis_failed(e)
+        logger.warning(f"Version bump failed for {namespace}: {e}")
+
+
+def etag_matches(etag: str) -> bool:
+    """
+    Return True if the request's If-None-Match holds etag
+
+    Flask-Compress rewrites the ETag of a compressed response to
+    '<etag>:<algorithm>', which is what compressing clients send back,
+    so the suffixed forms match as well as the bare one.
+
+    Args:
+        etag: ETag the view would send, without a compression suffix
+    """
+    if_none_match = request.if_none_match
+    return etag in if_none_match or any(
+        f'{etag}:{algorithm}' in if_none_match for algorithm in Config.COMPRESS_ALGORITHM
+    )
+
+
+def versioned_etag(namespace: str, max_age: int):
+    """
+    Answer If-None-Match with 304 while a namespace's version is unchanged
+
+    The ETag covers the content version, the request URL and a max_age
+    time bucket, so changes made without a version bump still show up
+    within max_age seconds. Without Redis the view runs unconditionally.
+
+    Args:
+        namespace: Content namespace bumped by the mutation endpoints
+        max_age: Longest time in seconds a response may be reused
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = get_version(namespace)
+            if version is None:
+                return view(*args, **kwargs)
+
+            bucket = int(time.time()) // max_age
+            etag = hashlib.sha1(
+                f'{namespace}:{version}:{bucket}:{request.full_path}'.encode()
+            ).hexdigest()
+
+            if etag_matches(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
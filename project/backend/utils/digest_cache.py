@@ -0,0 +1,94 @@
+"""
+News digest file cache
+Keeps generated digest EPUBs on disk, keyed by the articles they contain
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+def digest_cache_path(source_name: str, date_str: str,
+                      article_versions: Iterable[Tuple[object, Optional[datetime]]]) -> str:
+    """
+    Return the cache file path for a digest of the given articles
+
+    The key covers each article's updated_at, so an edited article
+    produces a new digest rather than serving the stale one.
+
+    Args:
+        source_name: News source the digest is built from
+        date_str: Digest date as YYYYMMDD
+        article_versions: (article id, updated_at) pairs, in any order
+
+    Returns:
+        Path of the cached EPUB, which may not exist yet
+    """
+    entries = sorted(
+        f"{article_id}:{updated_at.isoformat() if updated_at else ''}"
+        for article_id, updated_at in article_versions
+    )
+    key = hashlib.sha256('\n'.join([source_name, date_str, *entries]).encode()).hexdigest()
+    return os.path.join(Config.DIGEST_CACHE_DIR, f'{key}.epub')
+
+
+def store_digest(epub_path: str, cache_path: str) -> str:
+    """
+    Move a freshly built EPUB into the cache
+
+    The file is staged next to its final path and renamed into place, so
+    concurrent readers never see a partially written digest.
+
+    Args:
+        epub_path: Path of the generated EPUB
+        cache_path: Path returned by digest_cache_path
+
+    Returns:
+        The cache path
+    """
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    staging_path = f'{cache_path}.{uuid.uuid4().hex}.tmp'
+    shutil.move(epub_path, staging_path)
+    os.replace(staging_path, cache_path)
+    return cache_path
+
+
+def cleanup_digest_cache(max_age_hours: Optional[int] = None) -> int:
+    """
+    Delete cached digests older than max_age_hours
+
+    Args:
+        max_age_hours: Age limit, defaulting to DIGEST_CACHE_MAX_AGE_HOURS
+
+    Returns:
+        Number of files removed
+    """
+    if max_age_hours is None:
+        max_age_hours = Config.DIGEST_CACHE_MAX_AGE_HOURS
+
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+
+    try:
+        entries = list(os.scandir(Config.DIGEST_CACHE_DIR))
+    except FileNotFoundError:
+        return 0
+
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Could not remove cached digest {entry.path}: {e}")
+
+    return removed
@@ -20,6 +20,13 @@ from models import NewsItem
 
 logger = logging.getLogger(__name__)
 
+# The NewsItem columns create_news_digest reads; digest queries load only these
+DIGEST_ARTICLE_COLUMNS = (
+    NewsItem.id, NewsItem.title, NewsItem.content, NewsItem.author,
+    NewsItem.source_name, NewsItem.source_url, NewsItem.published_at,
+    NewsItem.word_count, NewsItem.reading_time, NewsItem.quality_score
+)
+
 class EpubCreator:
     """Utility class for creating EPUB files"""
     
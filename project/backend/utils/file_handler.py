@@ -19,11 +19,25 @@ from config.settings import Config
 
 logger = logging.getLogger(__name__)
 
+_storage_client: Optional[storage.Client] = None
+
+def get_storage_client() -> storage.Client:
+    """
+    Return the shared Cloud Storage client, creating it on first use
+    
+    One client per process keeps its credentials and pooled HTTPS
+    connections warm across every upload, download and signed URL.
+    """
+    global _storage_client
+    if _storage_client is None:
+        _storage_client = storage.Client()
+    return _storage_client
+
 class FileHandler:
     """Utility class for handling file operations with Google Cloud Storage"""
     
     def __init__(self):
-        self.storage_client = storage.Client()
+        self.storage_client = get_storage_client()
         self.bucket_name = Config.GCS_BUCKET_NAME
         self.bucket = self.storage_client.bucket(self.bucket_name)
     
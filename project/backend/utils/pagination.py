@@ -0,0 +1,60 @@
+"""
+Pagination helpers for SQLAlchemy list queries
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+
+
+def with_total_count(query):
+    """Add a COUNT(*) OVER () ``total_count`` column to every row of a query"""
+    return query.add_columns(func.count().over().label('total_count'))
+
+
+def fetch_page_with_total(query, offset: int, limit: int) -> Tuple[List, int]:
+    """
+    Fetch one page of rows together with the total row count
+
+    The total is computed with a COUNT(*) OVER () window in the same
+    statement, so the filtered set is scanned once instead of twice.
+
+    Args:
+        query: Filtered and ordered query
+        offset: Number of rows to skip
+        limit: Maximum number of rows to return
+
+    Returns:
+        Tuple of (rows, total_count)
+    """
+    rows = with_total_count(query).offset(offset).limit(limit).all()
+
+    if rows:
+        return rows, rows[0].total_count
+
+    # Past the last page the window has nothing to report
+    return rows, query.count() if offset else 0
+
+
+def fetch_page(query, offset: int, limit: int, with_total: bool = False) -> Tuple[List, Optional[int], bool]:
+    """
+    Fetch one page of rows and whether more rows follow it
+
+    Unless with_total is set, no count is run at all: one extra row is
+    fetched to answer has_more and the total is reported as None.
+
+    Args:
+        query: Filtered and ordered query
+        offset: Number of rows to skip
+        limit: Maximum number of rows to return
+        with_total: Also compute the total row count
+
+    Returns:
+        Tuple of (rows, total_count, has_more)
+    """
+    if with_total:
+        rows, total_count = fetch_page_with_total(query, offset, limit)
+        return rows, total_count, offset + limit < total_count
+
+    rows = query.offset(offset).limit(limit + 1).all()
+    return rows[:limit], None, len(rows) > limit
@@ -0,0 +1,122 @@
+"""
+JSON response utilities
+orjson-backed serialization for Flask responses
+"""
+
+import decimal
+import logging
+from typing import Any, Callable, Dict, Iterable
+
+import orjson
+from flask import current_app, stream_with_context
+from flask.json.provider import JSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Non-string keys show up in GROUP BY dicts (e.g. a NULL genre)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Marks an empty iterable in stream_ojson
+_NO_ITEMS = object()
+
+
+def _default(obj: Any) -> Any:
+    """Serialize the types orjson does not handle natively"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes with orjson"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson
+
+    Makes ``jsonify`` and ``request.get_json`` use orjson. datetime and UUID
+    values are encoded natively in C.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def ojson(obj: Any, status: int = 200):
+    """
+    Build a JSON response serialized with orjson
+
+    Args:
+        obj: Response payload
+        status: HTTP status code
+
+    Returns:
+        Flask response object
+    """
+    return current_app.response_class(
+        dumps_bytes(obj),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def stream_ojson(key: str, items: Iterable[Any], extra: Callable[[], Dict[str, Any]]):
+    """
+    Stream a JSON object whose ``key`` holds a potentially large list
+
+    Items are serialized one at a time as they are produced, so peak memory
+    is one item rather than the whole payload. The first item is fetched
+    before the response starts, so a failing query still raises in the view.
+    Once the 200 has gone out a failure cannot change the status; the body is
+    closed with an ``error`` key instead so it stays valid JSON.
+
+    Args:
+        key: Top-level key holding the streamed list
+        items: Iterable of JSON-serializable items
+        extra: Called once the list is sent; returns the remaining top-level keys
+
+    Returns:
+        Streaming Flask response object
+    """
+    items = iter(items)
+    first = next(items, _NO_ITEMS)
+
+    def generate():
+        yield b'{' + dumps_bytes(key) + b':['
+        try:
+            if first is not _NO_ITEMS:
+                yield dumps_bytes(first)
+                for item in items:
+                    yield b',' + dumps_bytes(item)
+        except Exception:
+            logger.exception(f"Error streaming {key}")
+            yield b'],"error":' + dumps_bytes(f'Failed to stream {key}') + b'}'
+            return
+        yield b']'
+        try:
+            trailer = extra()
+        except Exception:
+            logger.exception(f"Error finishing {key} stream")
+            yield b',"error":' + dumps_bytes(f'Failed to stream {key}') + b'}'
+            return
+        for name, value in trailer.items():
+            yield b',' + dumps_bytes(name) + b':' + dumps_bytes(value)
+        yield b'}'
+
+    return current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='application/json'
+    )
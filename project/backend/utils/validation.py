@@ -7,22 +7,46 @@ from jsonschema import validate, ValidationError
 from typing import Dict, Any, Optional
 import logging
 
+from config.settings import Config
+
 logger = logging.getLogger(__name__)
 
 
-def validate_json_schema(data: Any, schema: Dict) -> bool:
+def compile_schema(schema: Dict):
+    """
+    Build a reusable validator for a JSON schema
+    
+    jsonschema.validate() checks the schema against its metaschema and
+    builds a new validator on every call; compile hot schemas once at
+    import time and pass the result to validate_json_schema instead.
+    
+    Args:
+        schema: JSON schema
+        
+    Returns:
+        Validator instance for the schema
+    """
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def validate_json_schema(data: Any, schema: Any) -> bool:
     """
     Validate JSON data against a schema
     
     Args:
         data: Data to validate
-        schema: JSON schema to validate against
+        schema: JSON schema, or a validator from compile_schema
         
     Returns:
         True if valid, False otherwise
     """
     try:
-        validate(instance=data, schema=schema)
+        if isinstance(schema, dict):
+            validate(instance=data, schema=schema)
+        else:
+            schema.validate(data)
         return True
     except ValidationError as e:
         logger.warning(f"Schema validation failed: {e.message}")
@@ -65,6 +89,19 @@ def validate_email(email: str) -> bool:
     return bool(re.match(pattern, email))
 
 
+def is_kindle_email(email: Any) -> bool:
+    """
+    Check that an address is a Send-to-Kindle email, ignoring case
+    
+    Args:
+        email: Email to check
+        
+    Returns:
+        True if it ends with one of Config.KINDLE_EMAIL_DOMAINS
+    """
+    return isinstance(email, str) and email.lower().endswith(Config.KINDLE_EMAIL_DOMAINS)
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename to prevent directory traversal and other issues
@@ -260,4 +297,65 @@ def validate_pagination_params(offset: int, limit: int) -> tuple[bool, Optional[
         
     except Exception as e:
         logger.error(f"Error validating pagination params: {e}")
-        return False, f"Validation error: {str(e)}"
\ No newline at end of file
+        return False, f"Validation error: {str(e)}"
+
+class QueryParamError(ValueError):
+    """Raised when a query string parameter is malformed or out of range"""
+
+
+def parse_int_arg(args, name: str, default: int, minimum: Optional[int] = None,
+                  maximum: Optional[int] = None) -> int:
+    """
+    Read an integer query parameter
+    
+    Values above maximum are clamped, matching the existing limit handling;
+    values that are not integers or fall below minimum are rejected.
+    
+    Args:
+        args: Request args mapping
+        name: Parameter name
+        default: Value used when the parameter is absent or empty
+        minimum: Smallest accepted value
+        maximum: Largest value returned
+        
+    Returns:
+        Parsed integer
+        
+    Raises:
+        QueryParamError: If the value is not a valid integer or below minimum
+    """
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryParamError(f"{name} must be an integer")
+    
+    if minimum is not None and number < minimum:
+        raise QueryParamError(f"{name} must be at least {minimum}")
+    
+    if maximum is not None:
+        number = min(number, maximum)
+    
+    return number
+
+
+def parse_bool_arg(args, name: str, default: bool = False) -> bool:
+    """
+    Read a boolean query parameter ("true"/"false", case-insensitive)
+    
+    Args:
+        args: Request args mapping
+        name: Parameter name
+        default: Value used when the parameter is absent
+        
+    Returns:
+        Parsed boolean
+    """
+    value = args.get(name)
+    if value is None:
+        return default
+    
+    return value.lower() == 'true'